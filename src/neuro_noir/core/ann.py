@@ -0,0 +1,206 @@
+import threading
+from typing import Any, Hashable, Sequence
+
+import numpy as np
+
+
+class VectorIndex:
+    """
+    An in-process cosine similarity index over float32 vectors, with an arbitrary item per key.
+
+    Small indexes are searched exactly with one matrix product. Once the index holds `ivf_threshold`
+    vectors, it also builds an inverted file (IVF): the vectors are clustered with k-means and a
+    search only scores the vectors in the `probes` clusters closest to the query. Vectors added
+    afterwards are assigned to the nearest existing cluster, and the clusters are retrained when
+    the index has doubled in size since they were built.
+
+    All methods are thread-safe, so writers can update the index while it is being searched.
+    """
+
+    def __init__(self, ivf_threshold: int = 50_000, probes: int = 8, lists: int = 0, seed: int = 0):
+        self.ivf_threshold = ivf_threshold
+        self.probes = probes
+        self.lists = lists
+        self.seed = seed
+        self._keys: list[Hashable] = []
+        self._items: list[Any] = []
+        self._rows: dict[Hashable, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._centroids: np.ndarray | None = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists: list[np.ndarray] | None = None
+        self._trained_size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    @property
+    def dimensions(self) -> int:
+        return self._matrix.shape[1]
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def add(self, keys: Sequence[Hashable], vectors: Sequence[Sequence[float]], items: Sequence[Any]) -> None:
+        """
+        Add or replace vectors. Keys that are already in the index get their vector and item replaced.
+
+        Args:
+            keys (Sequence[Hashable]): The unique keys of the vectors (e.g. the statement ids).
+            vectors (Sequence[Sequence[float]]): The vectors, all with the same number of dimensions.
+            items (Sequence[Any]): The items returned by `search` for the vectors.
+        """
+        if len(keys) == 0:
+            return
+        matrix = self.normalize(np.asarray([np.asarray(v, dtype=np.float32) for v in vectors], dtype=np.float32))
+        with self._lock:
+            if not self._keys:
+                self._matrix = np.zeros((0, matrix.shape[1]), dtype=np.float32)
+            if matrix.shape[1] != self.dimensions:
+                raise ValueError(f"Expected vectors with {self.dimensions} dimensions, got {matrix.shape[1]}.")
+            new = []
+            latest = {key: (vector, item) for key, vector, item in zip(keys, matrix, items)}
+            for key, (vector, item) in latest.items():
+                row = self._rows.get(key)
+                if row is None:
+                    self._rows[key] = len(self._keys) + len(new)
+                    new.append((key, vector, item))
+                else:
+                    self._matrix[row] = vector
+                    self._items[row] = item
+                    if self._centroids is not None:
+                        self._assignments[row] = self._assign(vector[None, :])[0]
+                        self._lists = None
+            if new:
+                self._keys.extend(key for key, _, _ in new)
+                self._items.extend(item for _, _, item in new)
+                added = np.stack([vector for _, vector, _ in new])
+                self._matrix = np.concatenate([self._matrix, added])
+                if self._centroids is not None:
+                    self._assignments = np.concatenate([self._assignments, self._assign(added)])
+                    self._lists = None
+            if len(self) >= self.ivf_threshold and len(self) >= 2 * self._trained_size:
+                self._train()
+
+    def remove(self, keys: Sequence[Hashable]) -> None:
+        """
+        Remove vectors by key. Unknown keys are ignored.
+        """
+        with self._lock:
+            rows = sorted({self._rows[key] for key in keys if key in self._rows})
+            if not rows:
+                return
+            keep = np.ones(len(self._keys), dtype=bool)
+            keep[rows] = False
+            self._keys = [key for key, kept in zip(self._keys, keep) if kept]
+            self._items = [item for item, kept in zip(self._items, keep) if kept]
+            self._matrix = self._matrix[keep]
+            if self._centroids is not None:
+                self._assignments = self._assignments[keep]
+                self._lists = None
+            self._rows = {key: row for row, key in enumerate(self._keys)}
+
+    def replace_items(self, items: dict[Hashable, Any]) -> None:
+        """
+        Replace the items of keys in the index, keeping their vectors. Unknown keys are ignored.
+        """
+        with self._lock:
+            for key, item in items.items():
+                row = self._rows.get(key)
+                if row is not None:
+                    self._items[row] = item
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        with self._lock:
+            return list(zip(self._keys, self._items))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys, self._items, self._rows = [], [], {}
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self._centroids = None
+            self._assignments = np.zeros(0, dtype=np.int32)
+            self._lists = None
+            self._trained_size = 0
+
+    def search(self, query: Sequence[float], k: int = 10, exact: bool = False) -> list[tuple[Any, float]]:
+        """
+        Find the k items with the vectors most similar to the query.
+
+        Args:
+            query (Sequence[float]): The query vector.
+            k (int): The number of results.
+            exact (bool): Score all vectors, even if the index has IVF clusters.
+
+        Returns:
+            A list of (item, cosine similarity) tuples, most similar first.
+        """
+        return self.search_batch([query], k, exact)[0]
+
+    def search_batch(self, queries: Sequence[Sequence[float]], k: int = 10, exact: bool = False) -> list[list[tuple[Any, float]]]:
+        """
+        Run `search` for several query vectors, scoring them together where the index is searched exactly.
+        """
+        if len(queries) == 0:
+            return []
+        matrix = self.normalize(np.asarray([np.asarray(q, dtype=np.float32) for q in queries], dtype=np.float32))
+        with self._lock:
+            if not self._keys or k <= 0:
+                return [[] for _ in queries]
+            if matrix.shape[1] != self.dimensions:
+                raise ValueError(f"Expected query vectors with {self.dimensions} dimensions, got {matrix.shape[1]}.")
+            if exact or self._centroids is None:
+                return [self._top(np.arange(len(self._keys)), scores, k) for scores in matrix @ self._matrix.T]
+            lists = self._inverted_lists()
+            results = []
+            for query, centroid_scores in zip(matrix, matrix @ self._centroids.T):
+                probes = np.argpartition(-centroid_scores, min(self.probes, len(lists)) - 1)[:self.probes]
+                rows = np.concatenate([lists[probe] for probe in probes])
+                results.append(self._top(rows, self._matrix[rows] @ query, k))
+            return results
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, k: int) -> list[tuple[Any, float]]:
+        if len(rows) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return [(self._items[rows[idx]], float(scores[idx])) for idx in order]
+
+    def _inverted_lists(self) -> list[np.ndarray]:
+        """
+        The rows of every IVF cluster, rebuilt after the index has changed.
+        """
+        if self._lists is None:
+            order = np.argsort(self._assignments, kind="stable")
+            bounds = np.searchsorted(self._assignments[order], np.arange(len(self._centroids) + 1))
+            self._lists = [order[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        return self._lists
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _train(self, iterations: int = 10, sample: int = 100_000) -> None:
+        """
+        Cluster the vectors with spherical k-means on a sample, then assign every vector to its cluster.
+        """
+        lists = self.lists or max(1, int(np.sqrt(len(self))))
+        rng = np.random.default_rng(self.seed)
+        training = self._matrix[rng.choice(len(self), min(len(self), sample), replace=False)]
+        centroids = training[rng.choice(len(training), min(lists, len(training)), replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(training @ centroids.T, axis=1)
+            for idx in range(len(centroids)):
+                members = training[labels == idx]
+                if len(members):
+                    centroids[idx] = members.sum(axis=0)
+            centroids = self.normalize(centroids)
+        self._centroids = centroids
+        self._assignments = self._assign(self._matrix)
+        self._lists = None
+        self._trained_size = len(self)
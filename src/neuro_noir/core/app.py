@@ -1,17 +1,23 @@
+import asyncio
 from typing import Any, Callable, LiteralString, Type
 
 from pydantic import BaseModel
-from neo4j import Query
+from neo4j import Driver, Query
 from neuro_noir import graph
+from neuro_noir.core.cache import SearchCache
 from neuro_noir.core.config import Settings
-from neuro_noir.core.db import connect_neo4j, delete_db, test_db
+from neuro_noir.core.db import connect_neo4j, delete_db, install_neo4j_schema, test_db
 from neuro_noir.core.store import Store
+from neuro_noir.core.vectors import Vector
 from neuro_noir.graph import chunks, documents, statements, relationships, entities
+from neuro_noir.graph.mirror import GraphMirror
+from neuro_noir.graph.writer import GraphWriter
+from neuro_noir.graph.writes import bump_generation, write_generation
 from neuro_noir.llm.extractor import extractor
 from neuro_noir.models.chunk import Chunk
 from neuro_noir.models.document import Document
 from neuro_noir.datasets import the_adventure_of_retired_colorman, load_dataset
-from neuro_noir.core.lm import embed_document, embed_query, test_dspy, test_embedding
+from neuro_noir.core.lm import aembed_query, embed_document, embed_query, test_dspy, test_embedding
 from neuro_noir.models.entity import Entity
 from neuro_noir.models.statement import Statement
 
@@ -30,11 +36,17 @@ def dummy_progress(increment: int = 1, title: str | None = None, subtitle: str |
 
 class Application:
     
-    def __init__(self):
-        self.cfg = Settings()
-        self.store = Store(base_path=self.cfg.DATA_PATH, name_prefix=self.cfg.DATA_NAME_PREFIX)
-        self.user = self.store.create_or_recent()
-        self.doc = the_adventure_of_retired_colorman()
+    def __init__(self, cfg: Settings | None = None, load_data: bool = True):
+        """
+        Args:
+            cfg (Settings | None): The configuration object, or None to read it from the environment.
+            load_data (bool): Open the file store (with its most recent user) and load the default document.
+                Without it, `store`, `user` and `doc` are None, e.g. for tests that only search or write the graph.
+        """
+        self.cfg = cfg if cfg is not None else Settings()
+        self.store = Store(base_path=self.cfg.DATA_PATH, name_prefix=self.cfg.DATA_NAME_PREFIX) if load_data else None
+        self.user = self.store.create_or_recent() if load_data else None
+        self.doc = the_adventure_of_retired_colorman() if load_data else None
         self.chunks = []
         self.statements = []
         self.entities = []
@@ -42,6 +54,69 @@ class Application:
 
         self.entity_types = []
         self.relationship_types = []
+        self.writer: GraphWriter | None = None
+        self._driver: Driver | None = None
+        self.search_cache = SearchCache(self.cfg.SEARCH_CACHE_MAX_ENTRIES)
+        self.mirror: GraphMirror | None = GraphMirror(self.cfg) if self.cfg.ANN_MIRROR_ENABLED else None
+
+    @property
+    def driver(self) -> Driver:
+        """
+        The Neo4j driver of the application. It is created on first use and its connection pool is
+        shared by all searches and writes until `close()` is called.
+        """
+        if self._driver is None:
+            self._driver = connect_neo4j(self.cfg, cache=False)
+        return self._driver
+
+    def close(self) -> None:
+        """
+        Flush and stop the background graph writer and close the Neo4j driver.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self._driver is not None:
+            self._driver.close()
+            self._driver = None
+
+    def __enter__(self) -> "Application":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def graph_writer(self) -> GraphWriter:
+        """
+        The background writer that stores extracted statements and entities while the next chunk is
+        being processed. Call `flush_graph()` to wait until everything is written.
+        """
+        if self.writer is None:
+            self.writer = GraphWriter(self.driver, self.cfg, on_write=self.mirror.sync if self.mirror is not None else None)
+        return self.writer
+
+    def vector_mirror(self) -> GraphMirror | None:
+        """
+        The in-process copy of the vector indexes that answers the `find_*` lookups, or None if
+        ANN_MIRROR_ENABLED is off. It is loaded from the graph on first use and after it was invalidated.
+        """
+        if self.mirror is not None and not self.mirror.loaded:
+            self.mirror.load(self.driver)
+        return self.mirror
+
+    def flush_graph(self) -> list[tuple[Any, Exception]]:
+        """
+        Wait until all queued graph writes are stored.
+
+        Returns:
+            A list of (model, error) tuples for the models that could not be stored.
+        """
+        if self.writer is None:
+            return []
+        failures = self.writer.flush()
+        if failures:
+            print(f"[ERROR] {len(failures)} models could not be stored in the graph.")
+        return failures
 
     def load_document(self, key: str) -> Document:
         """
@@ -70,12 +145,16 @@ class Application:
         if user is None:
             user = self.user
 
-        self.clear_db()
-        driver = connect_neo4j(self.cfg, cache=False)
-        documents.store(driver, self.doc)
+        install_neo4j_schema(self.cfg, driver=self.driver)
+        self.delete_document(self.doc.id)
+        documents.store(self.driver, self.doc)
         self.chunks = [ Chunk(index=idx + 1, document_id=self.doc.id, content=txt) for idx, txt in enumerate(func(self.doc.content)) if txt.strip() ]
         self.chunks = self.embed_chunks(self.chunks)
-        chunks.store_all(driver, self.chunks)
+        failed = chunks.store_all(self.driver, self.chunks, self.cfg)
+        if self.mirror is not None:
+            self.mirror.sync(chunks.store_all, self.chunks, failed)
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(self.chunks)} chunks of document {self.doc.id} could not be stored in the graph.")
         self.store.store_all(user, "chunk", "json", [m.model_dump_json(include={'index', 'document_id', 'content', 'embedding'}) for m in self.chunks])
         print(f"Chunked document {self.doc.id} into {len(self.chunks)} chunks for user {user}.")
         return self.chunks
@@ -84,13 +163,66 @@ class Application:
         contents = [chunk.content for chunk in models]
         embeddings = embed_document(self.cfg, contents)
         for chunk, embedding in zip(models, embeddings):
-            chunk.embedding = embedding
+            chunk.embedding = Vector(embedding)
         return models
     
-    def search_chunks(self, query: str, n: int = 5) -> list[tuple[Chunk, float]]:
-        driver = connect_neo4j(self.cfg, cache=False)
-        query_embedding = embed_query(self.cfg, query)[0]
-        results = chunks.search(driver, query_embedding, n=n)
+    def cached_search(self, index_name: str, k: int, query: str | list[float], search: Callable[[], list], include_embeddings: bool = False) -> list:
+        """
+        Run a search through the search result cache. Results are cached per index, k, query and
+        projection until the next graph write.
+        """
+        key = SearchCache.key(f"{index_name}:embeddings" if include_embeddings else index_name, k, query)
+        return self.search_cache.get_or_compute(key, write_generation(), search)
+
+    def cached_search_batch(self, index_name: str, k: int, queries: list[list[float]], search_batch: Callable[[list], list[list]], include_embeddings: bool = False) -> list[list]:
+        """
+        Run a batch of searches through the search result cache. Only the queries that are not
+        cached are searched, with a single `search_batch` call.
+        """
+        generation = write_generation()
+        keys = [SearchCache.key(f"{index_name}:embeddings" if include_embeddings else index_name, k, query) for query in queries]
+        results = [self.search_cache.get(key, generation) for key in keys]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing:
+            for idx, result in zip(missing, search_batch([queries[idx] for idx in missing])):
+                results[idx] = result
+                self.search_cache.put(keys[idx], generation, result)
+        return results
+
+    def search_chunks(self, query: str, n: int = 5, include_embeddings: bool = False) -> list[tuple[Chunk, float]]:
+        def search():
+            query_embedding = embed_query(self.cfg, query)[0]
+            return chunks.search(self.driver, query_embedding, n=n, cfg=self.cfg, include_embeddings=include_embeddings)
+        return self.cached_search("chunk_embedding_vx", n, query, search, include_embeddings)
+
+    def hybrid_search(self, module, name: str, query: str, n: int, include_embeddings: bool = False) -> list:
+        """
+        Search a graph module (chunks, statements or entities) with both its vector and its fulltext
+        index in one round trip, see `graph.hybrid`. The query text is embedded for the vector index.
+        """
+        def search():
+            query_embedding = embed_query(self.cfg, query)[0]
+            return module.hybrid_search(self.driver, query, query_embedding, n, cfg=self.cfg, include_embeddings=include_embeddings)
+        return self.cached_search(f"{name}_hybrid", n, query, search, include_embeddings)
+
+    def hybrid_search_chunks(self, query: str, n: int = 5, include_embeddings: bool = False) -> list[tuple[Chunk, float]]:
+        return self.hybrid_search(chunks, "chunk", query, n, include_embeddings)
+
+    def hybrid_search_statements(self, query: str, n: int = 5, include_embeddings: bool = False) -> list[tuple[Statement, float]]:
+        return self.hybrid_search(statements, "statement", query, n, include_embeddings)
+
+    def hybrid_search_entities(self, query: str, n: int = 5, include_embeddings: bool = False) -> list[tuple[Entity, float]]:
+        return self.hybrid_search(entities, "entity", query, n, include_embeddings)
+
+    async def asearch_chunks(self, query: str, n: int = 5, include_embeddings: bool = False) -> list[tuple[Chunk, float]]:
+        key = SearchCache.key("chunk_embedding_vx:embeddings" if include_embeddings else "chunk_embedding_vx", n, query)
+        generation = write_generation()
+        cached = self.search_cache.get(key, generation)
+        if cached is not None:
+            return cached
+        query_embedding = (await aembed_query(self.cfg, query))[0]
+        results = await asyncio.to_thread(chunks.search, self.driver, query_embedding, n, self.cfg, include_embeddings)
+        self.search_cache.put(key, generation, results)
         return results
     
     def clear_entities_and_relationships(self) -> None:
@@ -110,10 +242,9 @@ class Application:
         
     def do_extraction(self, chunk: Chunk) -> list[Statement]:
         print(f"Extracting statements for chunk {chunk.index} of document {chunk.document_id}...")
-        stmts = chunk.extract_statements(self.cfg, starting_id=len(self.statements) + 1)
+        stmts = chunk.extract_statements(self.cfg)
         self.statements.extend(stmts)
-        driver = connect_neo4j(self.cfg, cache=False)
-        statements.store_all(driver, stmts)
+        self.graph_writer().submit(statements.store_all, stmts)
         try:
             self.store.store_all(self.user, "statement", "json", [s.model_dump_json(include={'id', 'document_id', 'chunk_index', 'subject', 'predicate', 'object_', 'modality', 'sentence', 'explanation', 'name_embedding', 'profile_embedding'}, exclude_none=True) for s in stmts])
         except Exception as e:
@@ -121,6 +252,7 @@ class Application:
         return stmts
     
     def end_extraction(self) -> list[Statement]:
+        self.flush_graph()
         return self.statements
     
     def start_resolution(self) -> None:
@@ -128,15 +260,12 @@ class Application:
 
     def do_resolution(self, chunk: Chunk) -> list[Entity]:
         print(f"Resolving entities for chunk {chunk.index} of document {chunk.document_id}...")
-        ents = chunk.resolve_entities(self.cfg, self.entity_types, starting_id=len(self.entities) + 1)
+        ents = chunk.resolve_entities(self.cfg, self.entity_types)
         #for entity in ents:
         #    print(f"Resolved entity {entity.id} with name '{entity.name}' and links to {len(entity.subject_statement_ids)} subject statements and {len(entity.object_statement_ids)} object statements.")
         self.entities.extend(ents)
         # print(f"Resolved {len(ents)} entities for chunk {chunk.index} of document {chunk.document_id}.")
-        driver = connect_neo4j(self.cfg, cache=False)
-        for entity in ents:
-            print(f"Storing entity {entity.id} in the database with statement IDs {entity.subject_statement_ids} and {entity.object_statement_ids}")
-        entities.store_all(driver, ents)
+        self.graph_writer().submit(entities.store_all, ents)
         # print(f"Stored {len(ents)} entities in the database for chunk {chunk.index} of document {chunk.document_id}.")
         try:
             self.store.store_all(self.user, "entity", "json", [e.model_dump_json(include={'id', 'name', 'aliases', 'type', 'category', 'description', 'explanation', 'name_embedding', 'profile_embedding', 'statement_ids'}, exclude_none=True) for e in ents])
@@ -145,6 +274,7 @@ class Application:
         return ents
 
     def end_resolution(self) -> list[Entity]:
+        self.flush_graph()
         return self.entities
 
     def process_chunks(self, chunks: list[str], limit: int = 2, user: str | None = None, progress: Callable | None = None, clear_graph: bool = False) -> list[tuple[str, str, str]]:
@@ -203,46 +333,89 @@ class Application:
     
     def clear_db(self) -> tuple[bool, str, str]:
         """
-        Clear the Neo4j database by deleting all nodes and relationships.
+        Clear the Neo4j database by deleting all nodes and relationships. Queued graph writes are
+        flushed first, so they can't land in the graph after it was cleared.
         """
-        return delete_db(self.cfg)
+        self.flush_graph()
+        if self.mirror is not None:
+            self.mirror.invalidate()
+        return delete_db(self.cfg, driver=self.driver)
     
+    def delete_document(self, document_id: str) -> dict[str, int]:
+        """
+        Delete one document with its chunks, statements and orphaned entities from the graph,
+        leaving the other documents alone.
+
+        Returns:
+            The number of deleted nodes per label.
+        """
+        self.flush_graph()
+        deleted = documents.delete(self.driver, document_id, self.cfg)
+        if self.mirror is not None:
+            self.mirror.remove_document(document_id)
+        print(f"Deleted document {document_id} from the graph: {deleted}")
+        return deleted
+
     def embed(self, txt: str) -> list[float]:
         return embed_query(self.cfg, contents=txt)[0]
 
-    def find_chunk(self, embedding: list[float], top_k: int=5) -> list[tuple[Chunk, float]]:
-        driver = connect_neo4j(self.cfg, cache=False)
-        results = chunks.search(driver, embedding, top_k)
-        return results
+    async def aembed(self, txt: str) -> list[float]:
+        return (await aembed_query(self.cfg, contents=txt))[0]
 
-    def find_statement(self, embedding: list[float], top_k: int=5) -> list[tuple[Statement, float]]:
-        driver = connect_neo4j(self.cfg, cache=False)
-        results = statements.search(driver, embedding, top_k)
-        return results
+    def find_chunk(self, embedding: list[float], top_k: int=5, include_embeddings: bool = False) -> list[tuple[Chunk, float]]:
+        mirror = self.vector_mirror()
+        if mirror is not None and not include_embeddings:
+            return mirror.search("chunk_embedding_vx", embedding, top_k)
+        return self.cached_search("chunk_embedding_vx", top_k, embedding, lambda: chunks.search(self.driver, embedding, top_k, cfg=self.cfg, include_embeddings=include_embeddings), include_embeddings)
 
-    def find_entity(self, embedding: list[float], top_k: int=5) -> list[tuple[Entity, float]]:
-        driver = connect_neo4j(self.cfg, cache=False)
-        results = entities.search(driver, embedding, top_k)
-        return results
+    def find_statement(self, embedding: list[float], top_k: int=5, include_embeddings: bool = False) -> list[tuple[Statement, float]]:
+        mirror = self.vector_mirror()
+        if mirror is not None and not include_embeddings:
+            return mirror.search("statement_name_embedding_vx", embedding, top_k)
+        return self.cached_search("statement_name_embedding_vx", top_k, embedding, lambda: statements.search(self.driver, embedding, top_k, cfg=self.cfg, include_embeddings=include_embeddings), include_embeddings)
+
+    def find_entity(self, embedding: list[float], top_k: int=5, include_embeddings: bool = False) -> list[tuple[Entity, float]]:
+        mirror = self.vector_mirror()
+        if mirror is not None and not include_embeddings:
+            return mirror.search("entity_name_embedding_vx", embedding, top_k)
+        return self.cached_search("entity_name_embedding_vx", top_k, embedding, lambda: entities.search(self.driver, embedding, top_k, cfg=self.cfg, include_embeddings=include_embeddings), include_embeddings)
+    
+    def find_chunks(self, embeddings: list[list[float]], top_k: int=5, include_embeddings: bool = False) -> list[list[tuple[Chunk, float]]]:
+        mirror = self.vector_mirror()
+        if mirror is not None and not include_embeddings:
+            return mirror.search_batch("chunk_embedding_vx", embeddings, top_k)
+        return self.cached_search_batch("chunk_embedding_vx", top_k, embeddings, lambda batch: chunks.search_batch(self.driver, batch, top_k, cfg=self.cfg, include_embeddings=include_embeddings), include_embeddings)
+
+    def find_statements(self, embeddings: list[list[float]], top_k: int=5, include_embeddings: bool = False) -> list[list[tuple[Statement, float]]]:
+        mirror = self.vector_mirror()
+        if mirror is not None and not include_embeddings:
+            return mirror.search_batch("statement_name_embedding_vx", embeddings, top_k)
+        return self.cached_search_batch("statement_name_embedding_vx", top_k, embeddings, lambda batch: statements.search_batch(self.driver, batch, top_k, cfg=self.cfg, include_embeddings=include_embeddings), include_embeddings)
+
+    def find_entities(self, embeddings: list[list[float]], top_k: int=5, include_embeddings: bool = False) -> list[list[tuple[Entity, float]]]:
+        mirror = self.vector_mirror()
+        if mirror is not None and not include_embeddings:
+            return mirror.search_batch("entity_name_embedding_vx", embeddings, top_k)
+        return self.cached_search_batch("entity_name_embedding_vx", top_k, embeddings, lambda batch: entities.search_batch(self.driver, batch, top_k, cfg=self.cfg, include_embeddings=include_embeddings), include_embeddings)
     
     def cypher_query(self, query: LiteralString, **args) -> list[dict]:
-        driver = connect_neo4j(self.cfg, cache=False)
-        with driver.session() as session:
+        with self.driver.session() as session:
             response = session.run(query, parameters=args)
-            return [ dict(rec) for rec in response ]
+            records = [ dict(rec) for rec in response ]
+            if response.consume().counters.contains_updates:
+                bump_generation()
+                if self.mirror is not None:
+                    self.mirror.invalidate()
+            return records
         
     def find_entity_by_id(self, entity_id: int) -> Entity | None:
-        driver = connect_neo4j(self.cfg, cache=False)
-        return entities.find_by_id(driver, entity_id)
+        return entities.find_by_id(self.driver, entity_id)
     
     def find_statement_by_id(self, statement_id: int) -> Statement | None:
-        driver = connect_neo4j(self.cfg, cache=False)
-        return statements.find_by_id(driver, statement_id)
+        return statements.find_by_id(self.driver, statement_id)
     
     def find_next_entity(self, offset: int = 0) -> Entity | None:
-        driver = connect_neo4j(self.cfg, cache=False)
-        return entities.find_next(driver, offset=offset)
+        return entities.find_next(self.driver, offset=offset)
     
     def count_entities(self) -> int:
-        driver = connect_neo4j(self.cfg, cache=False)
-        return entities.count(driver)
\ No newline at end of file
+        return entities.count(self.driver)
\ No newline at end of file
@@ -0,0 +1,149 @@
+import re
+import zlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Callable
+
+import numpy as np
+from google import genai # type: ignore
+from google.genai import types
+
+from neuro_noir.core.config import Settings
+
+
+class EmbeddingBackend(ABC):
+    """
+    Base class for embedding backends. A backend turns a list of texts into a list of vectors with a
+    single request; caching and batching are handled by `neuro_noir.core.lm.embed` on top of it.
+
+    Subclasses implement `embed` and are registered under a name with `register_backend`, which
+    can then be selected with the EMBEDDING_BACKEND setting.
+    """
+
+    name: str = ""
+    rate_limited: bool = True
+
+    def __init__(self, cfg: Settings):
+        self.cfg = cfg
+
+    @property
+    def model_name(self) -> str:
+        """
+        The name of the model the vectors come from. Vectors of different models never share a cache entry.
+        """
+        return self.cfg.EMBEDDING_MODEL_NAME
+
+    @abstractmethod
+    def embed(self, contents: list[str], task_type: str = "RETRIEVAL_QUERY") -> list[list[float]]:
+        """
+        Embed the texts with a single request to the model.
+
+        Args:
+            contents (list[str]): The texts to embed.
+            task_type (str): "RETRIEVAL_QUERY" for search queries, "RETRIEVAL_DOCUMENT" for stored texts.
+
+        Returns:
+            One vector per text, in the order of the texts.
+        """
+
+    def embed_query(self, contents: str | list[str]) -> list[list[float]]:
+        contents = [contents] if isinstance(contents, str) else contents
+        return self.embed(contents, task_type="RETRIEVAL_QUERY")
+
+    def embed_document(self, contents: str | list[str]) -> list[list[float]]:
+        contents = [contents] if isinstance(contents, str) else contents
+        return self.embed(contents, task_type="RETRIEVAL_DOCUMENT")
+
+
+BACKENDS: dict[str, type[EmbeddingBackend]] = {}
+
+
+def register_backend(name: str) -> Callable[[type[EmbeddingBackend]], type[EmbeddingBackend]]:
+    """
+    Class decorator that registers an embedding backend under the given name.
+    """
+    def decorator(cls: type[EmbeddingBackend]) -> type[EmbeddingBackend]:
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def get_backend(cfg: Settings) -> EmbeddingBackend:
+    """
+    Get the embedding backend selected by the EMBEDDING_BACKEND setting.
+
+    Args:
+        cfg (Settings): The configuration object containing the embedding backend details.
+
+    Returns:
+        An instance of the selected embedding backend.
+    """
+    if cfg.EMBEDDING_BACKEND not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{cfg.EMBEDDING_BACKEND}'. Available backends: {', '.join(sorted(BACKENDS))}.")
+    return BACKENDS[cfg.EMBEDDING_BACKEND](cfg)
+
+
+@lru_cache(maxsize=4)
+def connect_genai_cached(use_vertex: bool, project: str):
+    """
+    Create and cache a Google GenAI client, so that all embedding calls reuse the same client
+    and its connection pool instead of setting up a new one for every request.
+    """
+    return genai.Client(vertexai=use_vertex, project=project)
+
+
+def connect_genai(cfg: Settings, cache: bool = True):
+    if cache:
+        return connect_genai_cached(cfg.GENAI_USE_VERTEX, cfg.GENAI_VERTEX_PROJECT)
+    else:
+        return genai.Client(vertexai=cfg.GENAI_USE_VERTEX, project=cfg.GENAI_VERTEX_PROJECT)
+
+
+@register_backend("genai")
+class GenAIBackend(EmbeddingBackend):
+    """
+    Embeds texts with a Google GenAI embedding model (e.g. gemini-embedding-001).
+    """
+
+    def embed(self, contents: list[str], task_type: str = "RETRIEVAL_QUERY") -> list[list[float]]:
+        client = connect_genai(self.cfg)
+        response = client.models.embed_content(
+            model=self.cfg.EMBEDDING_MODEL_NAME,
+            contents=contents,
+            config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=self.cfg.EMBEDDING_DIMENSIONS)
+        )
+        return [emb.values for emb in response.embeddings] if response.embeddings else []
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@register_backend("hashing")
+class HashingBackend(EmbeddingBackend):
+    """
+    A fast, deterministic, offline backend that embeds texts by feature hashing their words and
+    word pairs into EMBEDDING_DIMENSIONS buckets. Texts that share words get similar vectors, which
+    is enough to exercise chunking, graph writes and vector search without network access or quota.
+    The vectors carry no real semantics, so don't use them for anything but tests and benchmarks.
+    """
+
+    rate_limited = False
+
+    @property
+    def model_name(self) -> str:
+        return "hashing"
+
+    def embed(self, contents: list[str], task_type: str = "RETRIEVAL_QUERY") -> list[list[float]]:
+        return [self._embed_one(text).tolist() for text in contents]
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        dimensions = self.cfg.EMBEDDING_DIMENSIONS
+        words = TOKEN_PATTERN.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = np.zeros(dimensions, dtype=np.float32)
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % dimensions] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
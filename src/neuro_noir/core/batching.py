@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Callable, Sequence, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def plan_batches(sizes: Sequence[int], max_items: int, max_size: int) -> list[range]:
+    """
+    Split a sequence of items into consecutive batches that stay within the request limits of an API.
+    An item that is larger than `max_size` on its own is put in a batch of its own.
+
+    Args:
+        sizes (Sequence[int]): The size of every item (e.g. the number of characters of a text).
+        max_items (int): The maximum number of items in a batch.
+        max_size (int): The maximum total size of a batch.
+
+    Returns:
+        A list of ranges, one per batch, that together cover all items in their original order.
+    """
+    batches = []
+    start = 0
+    total = 0
+    for idx, size in enumerate(sizes):
+        if idx > start and (idx - start >= max_items or total + size > max_size):
+            batches.append(range(start, idx))
+            start = idx
+            total = 0
+        total += size
+    if start < len(sizes):
+        batches.append(range(start, len(sizes)))
+    return batches
+
+
+@lru_cache(maxsize=4)
+def batch_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Create and cache a thread pool for sending batches, so that all callers in the process share
+    the same bounded set of worker threads.
+
+    Args:
+        max_workers (int): The maximum number of batches in flight at the same time.
+
+    Returns:
+        The shared ThreadPoolExecutor for the given number of workers.
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="neuro-noir-batch")
+
+
+def map_batches(
+    func: Callable[[list[T]], list[R]],
+    items: list[T],
+    max_items: int,
+    max_size: int,
+    max_workers: int,
+    size: Callable[[T], int] = len,
+) -> list[R]:
+    """
+    Apply a batch function to a list of items. The items are split into batches with `plan_batches`,
+    the batches are processed concurrently on a bounded thread pool, and the results are put back
+    in input order.
+
+    If a batch fails, the error is raised only after the other batches in flight have finished, so
+    their side effects (e.g. cache writes) are not lost.
+
+    Args:
+        func (Callable[[list[T]], list[R]]): A function that processes one batch and returns one result per item.
+        items (list[T]): The items to process.
+        max_items (int): The maximum number of items in a batch.
+        max_size (int): The maximum total size of a batch.
+        max_workers (int): The maximum number of batches processed at the same time.
+        size (Callable[[T], int]): A function returning the size of an item.
+
+    Returns:
+        A list with one result per item, in the same order as the input.
+    """
+    batches = plan_batches([size(item) for item in items], max_items, max_size)
+    if len(batches) <= 1:
+        return func(items) if items else []
+
+    executor = batch_executor(max_workers)
+    futures = [executor.submit(func, [items[i] for i in batch]) for batch in batches]
+    wait(futures)
+
+    results: list[R] = []
+    for batch, future in zip(batches, futures):
+        batch_results = future.result()
+        if len(batch_results) != len(batch):
+            raise ValueError(f"Expected {len(batch)} results for batch {batch.start}-{batch.stop}, got {len(batch_results)}.")
+        results.extend(batch_results)
+    return results
@@ -0,0 +1,265 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Hashable, Sequence
+
+import numpy as np
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS embeddings_last_used_idx ON embeddings (last_used);
+"""
+
+
+class EmbeddingCache:
+    """
+    A persistent, content-addressed cache for embedding vectors. Vectors are stored in a SQLite
+    file keyed by the embedding model, task type, output dimensionality and a SHA-256 hash of the
+    text, so the same text is only ever sent to the embedding provider once. When the cache grows
+    beyond `max_entries` the least recently used vectors are evicted.
+    """
+
+    def __init__(self, path: str = "data/cache/embeddings.sqlite", max_entries: int = 250_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def key(model: str, task_type: str, dimensions: int, text: str) -> str:
+        """
+        Build the cache key for a text.
+
+        Args:
+            model (str): The name of the embedding model.
+            task_type (str): The embedding task type (e.g. "RETRIEVAL_DOCUMENT").
+            dimensions (int): The output dimensionality of the embedding.
+            text (str): The text that is embedded.
+
+        Returns:
+            A string key that uniquely identifies the embedding of the text.
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}:{task_type}:{dimensions}:{digest}"
+
+    def get_many(self, keys: list[str]) -> list[list[float] | None]:
+        """
+        Look up the vectors for a list of keys.
+
+        Args:
+            keys (list[str]): The cache keys to look up.
+
+        Returns:
+            A list with the cached vector for every key, or None where the key is not cached.
+        """
+        if not keys:
+            return []
+        with self._lock:
+            found: dict[str, bytes] = {}
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+                found.update(rows.fetchall())
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+                self._conn.commit()
+            results = [_unpack(found[k]) if k in found else None for k in keys]
+            hits = sum(1 for r in results if r is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+            return results
+
+    def put_many(self, items: list[tuple[str, list[float]]]) -> None:
+        """
+        Store vectors in the cache and evict the least recently used vectors if the cache is full.
+
+        Args:
+            items (list[tuple[str, list[float]]]): Pairs of cache key and embedding vector.
+        """
+        if not items:
+            return
+        with self._lock:
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(k, _pack(v), now) for k, v in items],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def stats(self) -> dict:
+        """
+        Report the hit/miss counters and the current size of the cache.
+
+        Returns:
+            A dictionary with 'hits', 'misses', 'evictions', 'hit_rate' and 'entries'.
+        """
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": count,
+        }
+
+    def clear(self) -> None:
+        """
+        Remove all vectors from the cache and reset the counters.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SearchCache:
+    """
+    An in-memory LRU cache for search results. Entries belong to a write generation (see
+    `neuro_noir.graph.writes.write_generation`): as soon as the graph is written to, the whole
+    cache is dropped, so a cached result is never older than the last ingest.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._generation: int | None = None
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(index_name: str, k: int, query: str | Sequence[float]) -> tuple[str, int, str]:
+        """
+        Build a cache key from the index, the number of results and a hash of the query text or vector.
+        """
+        if isinstance(query, str):
+            digest = "text:" + hashlib.sha256(query.encode("utf-8")).hexdigest()
+        else:
+            digest = "vector:" + hashlib.sha256(np.asarray(query, dtype=np.float32).tobytes()).hexdigest()
+        return index_name, k, digest
+
+    def get(self, key: Hashable, generation: int) -> list | None:
+        """
+        Get the cached result for a key in the given write generation, or None.
+        """
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(self._entries[key])
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, generation: int, result: list) -> None:
+        """
+        Cache a result that was computed in the given write generation. Results of an older
+        generation are dropped.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = list(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, generation: int, compute: Callable[[], list]) -> list:
+        """
+        Return the cached result for a key, or compute, cache and return it.
+
+        Args:
+            key (Hashable): The cache key (see `key`).
+            generation (int): The current write generation.
+            compute (Callable[[], list]): The function that runs the search.
+        """
+        result = self.get(key, generation)
+        if result is None:
+            result = compute()
+            self.put(key, generation, result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+@lru_cache(maxsize=4)
+def embedding_cache(path: str, max_entries: int) -> EmbeddingCache:
+    """
+    Open and cache an embedding cache, so that all callers in the process share the same
+    connection and counters.
+
+    Args:
+        path (str): The path of the SQLite file holding the cache.
+        max_entries (int): The maximum number of vectors to keep before evicting.
+
+    Returns:
+        The shared EmbeddingCache instance for the given path.
+    """
+    return EmbeddingCache(path=path, max_entries=max_entries)
@@ -11,6 +11,15 @@ class Settings(BaseSettings):
     NEO4J_URI: str = "bolt://localhost:7687"
     NEO4J_USERNAME: str = "neo4j"
     NEO4J_PASSWORD: str = "neo4j"
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = 50  # Maximum number of open connections per driver
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = 60.0  # Seconds to wait for a free connection from the pool
+    NEO4J_LIVENESS_CHECK_TIMEOUT: float | None = 30.0  # Connections idle for longer than this are checked before reuse, None to never check
+    NEO4J_INDEX_WAIT_SECONDS: int = 300  # How long schema installation waits for new indexes to come online
+    NEO4J_DELETE_BATCH_SIZE: int = 1000  # Nodes deleted per transaction, so large deletes don't have to fit in the heap at once
+    NEO4J_WRITE_BATCH_SIZE: int = 200  # Rows per UNWIND batch (and write transaction) in the graph writers
+    NEO4J_SKIP_UNCHANGED_WRITES: bool = True  # Skip statement and entity writes whose content hash matches the stored node
+    NEO4J_MAX_TRANSACTION_RETRY_SECONDS: float = 30.0  # Write transactions are retried on transient errors for up to this long
+    GRAPH_WRITER_QUEUE_SIZE: int = 16  # Pending background graph writes before extraction waits for the writer to catch up
 
     DSPY_MODEL_NAME: str = "gpt-5-mini" 
     DSPY_API_KEY: str | None = "<YOUR_LLM_API_KEY>"  # Optional: use if you want to use OpenAI instead of Google Vertex AI
@@ -23,6 +32,39 @@ class Settings(BaseSettings):
     GENAI_MODEL_NAME: str = "gemini-2.5-pro"  # Required if GENAI_USE_VERTEX is True
     GENAI_VERTEX_PROJECT: str = "semantic-bank"  # Required if GENAI_USE_VERTEX is True
 
+    EMBEDDING_BACKEND: str = "genai"  # "genai" for Google GenAI, "hashing" for a fast deterministic offline backend
+    EMBEDDING_MODEL_NAME: str = "gemini-embedding-001"
+    EMBEDDING_DIMENSIONS: int = 1536
+    EMBEDDING_BATCH_SIZE: int = 100  # Maximum number of texts per embedding request
+    EMBEDDING_BATCH_MAX_CHARS: int = 60_000  # Maximum number of characters per embedding request (~15k tokens)
+    EMBEDDING_MAX_WORKERS: int = 4  # Maximum number of embedding requests in flight at the same time
+    EMBEDDING_DISPATCH_MAX_BATCH: int = 64  # Async embedding requests are flushed when this many texts are queued...
+    EMBEDDING_DISPATCH_MAX_DELAY_MS: int = 10  # ...or this many milliseconds after the first text was queued
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 300  # Process-wide embedding request budget, 0 for no limit
+    EMBEDDING_TEXTS_PER_MINUTE: int = 0  # Process-wide budget for texts sent to the embedding model, 0 for no limit
+    EMBEDDING_MAX_RETRIES: int = 6  # Retries for throttled embedding requests (HTTP 429/503)
+    EMBEDDING_BACKOFF_BASE_SECONDS: float = 1.0  # Jittered exponential backoff starts at this delay...
+    EMBEDDING_BACKOFF_MAX_SECONDS: float = 60.0  # ...and never waits longer than this
+    EMBEDDING_CACHE_ENABLED: bool = True  # Cache embeddings on disk so the same text is only embedded once
+    EMBEDDING_CACHE_PATH: str = "data/cache/embeddings.sqlite"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 250_000  # Least recently used vectors are evicted beyond this size
+
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024  # Search results cached in memory until the next graph write, 0 to disable
+
+    VECTOR_INDEX_MODE: str = "full"  # "full", "truncated" (index only the leading dimensions) or "int8" (quantized index)
+    VECTOR_INDEX_DIMENSIONS: int = 256  # Dimensions kept in the index in "truncated" mode (Matryoshka-style prefix)
+    VECTOR_RERANK_FACTOR: int = 4  # Candidates fetched per result from a compact index, reranked at full precision
+
+    HYBRID_CANDIDATE_FACTOR: int = 4  # Candidates fetched per result from both the vector and the fulltext index
+    HYBRID_RRF_K: int = 60  # Reciprocal rank fusion constant, higher values flatten the rank differences
+    HYBRID_VECTOR_WEIGHT: float = 1.0  # Weight of the vector ranking in the fused score
+    HYBRID_FULLTEXT_WEIGHT: float = 1.0  # Weight of the fulltext ranking in the fused score
+
+    ANN_MIRROR_ENABLED: bool = False  # Answer find_chunk/find_statement/find_entity from an in-process copy of the vector indexes
+    ANN_IVF_THRESHOLD: int = 50_000  # Vectors per index from which the mirror searches IVF clusters instead of all vectors
+    ANN_IVF_PROBES: int = 8  # IVF clusters searched per query, more is slower but finds more of the exact top-k
+    ANN_IVF_LISTS: int = 0  # IVF clusters per index, 0 for the square root of the number of vectors
+
     DATA_PATH: str = "data/students"
     DATA_NAME_PREFIX: str = "student"
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import time
 from typing import Tuple, Optional
 
@@ -16,15 +17,26 @@ from functools import lru_cache
 
 from neuro_noir.core.config import Settings
 from neuro_noir.core.report import md_report
-from neuro_noir.graph.chunks import SCHEMA as CHUNK_SCHEMA
-from neuro_noir.graph.entities import SCHEMA as ENTITY_SCHEMA
-from neuro_noir.graph.statements import SCHEMA as STATEMENT_SCHEMA
-from neuro_noir.graph.relationships import SCHEMA as RELATIONSHIP_SCHEMA
+from neuro_noir.graph import chunks, entities, statements, relationships
 from neuro_noir.graph.documents import SCHEMA as DOCUMENT_SCHEMA
+from neuro_noir.graph.vectors import SHOW_VECTOR_INDEXES, vector_index_target
+from neuro_noir.graph.writes import bump_generation
+
+
+def driver_options(cfg: Settings) -> dict:
+    """
+    The connection pool and retry options for Neo4j drivers created from the configuration.
+    """
+    return {
+        "max_connection_pool_size": cfg.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        "connection_acquisition_timeout": cfg.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        "liveness_check_timeout": cfg.NEO4J_LIVENESS_CHECK_TIMEOUT,
+        "max_transaction_retry_time": cfg.NEO4J_MAX_TRANSACTION_RETRY_SECONDS,
+    }
 
 
 @lru_cache(maxsize=1)
-def connect_neo4j_cached(uri: str, user: str, pwd: str):
+def connect_neo4j_cached(uri: str, user: str, pwd: str, **options):
     """
     Create and cache a Neo4j driver connection. The cache ensures that we reuse the same 
     connection across multiple calls, which is more efficient and avoids issues with too 
@@ -34,11 +46,12 @@ def connect_neo4j_cached(uri: str, user: str, pwd: str):
         uri (str): The Bolt URI for the Neo4j server (e.g., "bolt://localhost:7687").
         user (str): The username for Neo4j authentication.
         pwd (str): The password for Neo4j authentication.
+        **options: Driver options such as the connection pool size (see `driver_options`).
 
     Returns:
         A Neo4j driver instance connected according to the provided parameters.
     """
-    return GraphDatabase.driver(uri, auth=(user, pwd))
+    return GraphDatabase.driver(uri, auth=(user, pwd), **options)
 
 
 def connect_neo4j(cfg: Settings, cache: bool = True):
@@ -48,38 +61,129 @@ def connect_neo4j(cfg: Settings, cache: bool = True):
 
     Args:
         cfg (Settings): The configuration object containing Neo4j connection details.
+        cache (bool): Whether to reuse the process-wide driver, or create a new one that the caller has to close.
 
     Returns:
         A Neo4j driver instance connected according to the provided configuration.
     """
     if cache:
-        return connect_neo4j_cached(cfg.NEO4J_URI, cfg.NEO4J_USERNAME, cfg.NEO4J_PASSWORD)
+        return connect_neo4j_cached(cfg.NEO4J_URI, cfg.NEO4J_USERNAME, cfg.NEO4J_PASSWORD, **driver_options(cfg))
     else:
-        return GraphDatabase.driver(cfg.NEO4J_URI, auth=(cfg.NEO4J_USERNAME, cfg.NEO4J_PASSWORD))
+        return GraphDatabase.driver(cfg.NEO4J_URI, auth=(cfg.NEO4J_USERNAME, cfg.NEO4J_PASSWORD), **driver_options(cfg))
 
 
-def delete_neo4j(cfg: Settings, cache: bool = True) -> None:
-    driver = connect_neo4j(cfg, cache=cache)
+DELETE_ALL = """
+MATCH (n)
+CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {batch_size} ROWS
+"""
+
+
+def delete_neo4j(cfg: Settings, cache: bool = True, driver=None) -> int:
+    """
+    Delete all nodes and relationships, NEO4J_DELETE_BATCH_SIZE nodes per transaction.
+
+    Returns:
+        The number of deleted nodes.
+    """
+    driver = driver if driver is not None else connect_neo4j(cfg, cache=cache)
     with driver.session() as session:
-        session.run("MATCH (n) DETACH DELETE n").consume()
+        summary = session.run(DELETE_ALL.format(batch_size=max(1, cfg.NEO4J_DELETE_BATCH_SIZE))).consume()
+    bump_generation()
+    return summary.counters.nodes_deleted
+
+
+SCHEMA_KEY = "neuro_noir"
+
+
+GET_SCHEMA_VERSION = """
+MATCH (v:SchemaVersion {key: $key})
+RETURN v.version AS version, v.statements AS statements
+"""
+
+
+SET_SCHEMA_VERSION = """
+MERGE (v:SchemaVersion {key: $key})
+SET v.version = $version, v.statements = $statements, v.updated_at = datetime()
+"""
 
 
-def install_neo4j_schema(cfg: Settings, cache: bool = True) -> None:
-    driver = connect_neo4j(cfg, cache=cache)
-    statements = []
-    statements.extend([s.strip() for s in CHUNK_SCHEMA.strip().split(";") if s.strip()])
-    statements.extend([s.strip() for s in ENTITY_SCHEMA.strip().split(";") if s.strip()])
-    statements.extend([s.strip() for s in STATEMENT_SCHEMA.strip().split(";") if s.strip()])
-    statements.extend([s.strip() for s in RELATIONSHIP_SCHEMA.strip().split(";") if s.strip()])
-    statements.extend([s.strip() for s in DOCUMENT_SCHEMA.strip().split(";") if s.strip()])
+def schema_statements(cfg: Settings) -> list[str]:
+    """
+    All schema statements (constraints, indexes, vector and fulltext indexes) for the configuration.
+    """
+    schema = []
+    schema.extend([s.strip() for s in chunks.schema(cfg).strip().split(";") if s.strip()])
+    schema.extend([s.strip() for s in entities.schema(cfg).strip().split(";") if s.strip()])
+    schema.extend([s.strip() for s in statements.schema(cfg).strip().split(";") if s.strip()])
+    schema.extend([s.strip() for s in relationships.schema(cfg).strip().split(";") if s.strip()])
+    schema.extend([s.strip() for s in DOCUMENT_SCHEMA.strip().split(";") if s.strip()])
+    return schema
+
+
+def statement_hash(statement: str) -> str:
+    return hashlib.sha256(" ".join(statement.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def schema_version(schema: list[str]) -> str:
+    return hashlib.sha256("\n".join(statement_hash(stmt) for stmt in schema).encode("utf-8")).hexdigest()[:16]
+
+
+def install_neo4j_schema(cfg: Settings, cache: bool = True, driver=None) -> int:
+    """
+    Install the schema if the graph doesn't have the current version yet. The applied schema
+    version and the hashes of the applied statements are recorded on a SchemaVersion node, so
+    an up-to-date graph costs a single read, and a changed schema (e.g. another vector index
+    mode) only runs the statements that are new. Vector indexes are checked against the graph
+    instead: Neo4j keeps one vector index per label and property, so the index of another mode
+    on the same property is dropped before the index for the configured mode is created. Afterwards it waits until all indexes are
+    online, for at most NEO4J_INDEX_WAIT_SECONDS, so that the first searches don't hit
+    populating indexes.
+
+    Args:
+        cfg (Settings): The configuration object containing Neo4j connection details.
+        cache (bool): Whether to use the cached driver when no driver is given.
+        driver: The driver to use instead of connecting with the configuration.
+
+    Returns:
+        The number of schema statements that were applied.
+    """
+    driver = driver if driver is not None else connect_neo4j(cfg, cache=cache)
+    schema = schema_statements(cfg)
+    version = schema_version(schema)
     with driver.session() as session:
-        for stmt in statements:
+        record = session.run(GET_SCHEMA_VERSION, {"key": SCHEMA_KEY}).single()
+        if record is not None and record["version"] == version:
+            return 0
+        applied = set(record["statements"] or []) if record is not None else set()
+        existing = {row["name"]: (row["label"], row["property"]) for row in session.run(SHOW_VECTOR_INDEXES)}
+        missing = []
+        for stmt in schema:
+            target = vector_index_target(stmt)
+            if target is None and statement_hash(stmt) not in applied:
+                missing.append(stmt)
+            elif target is not None and target[0] not in existing:
+                missing.append(stmt)
+                name, label, property = target
+                for conflict in [other for other, on in existing.items() if on == (label, property)]:
+                    print(f"Dropping the vector index {conflict} on {label}.{property} to create {name}.")
+                    session.run(f"DROP INDEX {conflict} IF EXISTS").consume()
+                    del existing[conflict]
+        for stmt in missing:
             session.run(stmt).consume()
+        if missing:
+            session.run("CALL db.awaitIndexes($timeout)", {"timeout": cfg.NEO4J_INDEX_WAIT_SECONDS}).consume()
+        session.run(SET_SCHEMA_VERSION, {
+            "key": SCHEMA_KEY,
+            "version": version,
+            "statements": sorted(applied | {statement_hash(stmt) for stmt in schema}),
+        }).consume()
+    return len(missing)
 
 
-def test_db(cfg) -> Tuple[bool, str, str]:
+def test_db(cfg, driver=None) -> Tuple[bool, str, str]:
     """
-    Test a Neo4j connection by opening a session and running a simple query.
+    Test a Neo4j connection by opening a session and running a simple query. Without a driver, a
+    new driver is connected with the configuration and closed afterwards; a given driver is left open.
 
     Returns:
         (ok, error_message, report_md)
@@ -95,9 +199,10 @@ def test_db(cfg) -> Tuple[bool, str, str]:
     uri = cfg.NEO4J_URI
     user = cfg.NEO4J_USERNAME
 
-    driver = None
+    owned = driver is None
     try:
-        driver = connect_neo4j(cfg, cache=False)
+        if owned:
+            driver = connect_neo4j(cfg, cache=False)
 
         with driver.session() as session:
             record = session.run("RETURN 1 AS test").single()
@@ -302,7 +407,7 @@ def test_db(cfg) -> Tuple[bool, str, str]:
         )
 
     finally:
-        if driver is not None:
+        if owned and driver is not None:
             try:
                 driver.close()
             except Exception:
@@ -310,20 +415,22 @@ def test_db(cfg) -> Tuple[bool, str, str]:
                 pass
 
 
-def delete_db(cfg: Settings, cache: bool = True) -> Tuple[bool, str, str]:
+def delete_db(cfg: Settings, cache: bool = True, driver=None) -> Tuple[bool, str, str]:
     """
     Delete all nodes and relationships in the Neo4j database. Use with caution, as this 
     will irreversibly remove all data.
 
     Args:
         cfg (Settings): The configuration object containing Neo4j connection details.
+        cache (bool): Whether to use the cached driver when no driver is given.
+        driver: The driver to use for the connection test, the delete and the schema installation.
     """
-    feedback = test_db(cfg)
+    feedback = test_db(cfg, driver=driver)
     if not feedback[0]:
         return False, "Cannot delete database because connection test failed: " + feedback[1], feedback[2]
     try:
-        delete_neo4j(cfg, cache=cache)
-        install_neo4j_schema(cfg, cache=cache)
+        delete_neo4j(cfg, cache=cache, driver=driver)
+        install_neo4j_schema(cfg, cache=cache, driver=driver)
         return True, "✅ Neo4j database cleared successfully", md_report(
             title="✅ Neo4j database cleared successfully",
             what_went_wrong="Nothing went wrong — the database was cleared.",
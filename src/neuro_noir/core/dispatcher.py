@@ -0,0 +1,86 @@
+import asyncio
+from typing import Callable
+
+
+class EmbeddingDispatcher:
+    """
+    Collects embedding requests from concurrent callers and sends them as one batched request.
+    A batch is flushed as soon as it holds `max_batch` texts, or `max_delay` seconds after the
+    first text was queued, whichever comes first. Every caller receives its own vector.
+
+    A dispatcher is bound to the event loop it is used on.
+    """
+
+    def __init__(self, func: Callable[[list[str], str], list[list[float]]], max_batch: int = 64, max_delay: float = 0.01):
+        self.func = func
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.requests = 0
+        self.flushes = 0
+        self._pending: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed(self, text: str, task_type: str) -> list[float]:
+        """
+        Queue a text for embedding and wait for its vector.
+
+        Args:
+            text (str): The text to embed.
+            task_type (str): The embedding task type, "RETRIEVAL_QUERY" or "RETRIEVAL_DOCUMENT".
+
+        Returns:
+            The embedding vector for the text.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(task_type, [])
+        pending.append((text, future))
+        self.requests += 1
+        if len(pending) >= self.max_batch:
+            self._flush(task_type)
+        elif len(pending) == 1:
+            self._timers[task_type] = loop.call_later(self.max_delay, self._flush, task_type)
+        return await future
+
+    async def embed_many(self, contents: list[str], task_type: str) -> list[list[float]]:
+        return list(await asyncio.gather(*[self.embed(text, task_type) for text in contents]))
+
+    def _flush(self, task_type: str) -> None:
+        timer = self._timers.pop(task_type, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(task_type, [])
+        if not batch:
+            return
+        self.flushes += 1
+        task = asyncio.get_running_loop().create_task(self._send(batch, task_type))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future]], task_type: str) -> None:
+        try:
+            vectors = await asyncio.to_thread(self.func, [text for text, _ in batch], task_type)
+            if len(vectors) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(vectors)}.")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def stats(self) -> dict:
+        """
+        Report how many requests were received and in how many batches they were sent.
+
+        Returns:
+            A dictionary with 'requests', 'flushes' and 'pending'.
+        """
+        return {
+            "requests": self.requests,
+            "flushes": self.flushes,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+        }
@@ -1,7 +1,14 @@
+import asyncio
+import weakref
+from typing import Callable
+
+from neuro_noir.core.backends import get_backend
+from neuro_noir.core.batching import map_batches
+from neuro_noir.core.cache import embedding_cache
 from neuro_noir.core.config import Settings
+from neuro_noir.core.dispatcher import EmbeddingDispatcher
+from neuro_noir.core.ratelimit import RateLimiter, rate_limiter
 import dspy
-from google import genai # type: ignore
-from google.genai import types
 
 
 def connect_dspy(cfg: Settings):
@@ -30,20 +37,104 @@ def test_dspy(cfg: Settings) -> tuple[bool, str, str]:
         return False, "", f"dspy connection failed: {str(e)}"
 
 
-def connect_genai(cfg: Settings):
-    return genai.Client(vertexai=cfg.GENAI_USE_VERTEX, project=cfg.GENAI_VERTEX_PROJECT)
-    
-
 def embed(cfg: Settings, contents: str | list[str], task_type: str = "RETRIEVAL_QUERY") -> list[list[float]]:
-    client = connect_genai(cfg)
-    response = client.models.embed_content(
-        model='gemini-embedding-001',
-        contents=contents,  
-        config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=1536)
+    """
+    Embed one or more texts. Vectors are looked up in the embedding cache first, and only the
+    texts that are not cached yet are sent to the embedding model. Large inputs are split into
+    batches that fit the API limits and sent concurrently.
+
+    Args:
+        cfg (Settings): The configuration object containing the embedding model details.
+        contents (str | list[str]): The text or texts to embed.
+        task_type (str): The embedding task type, "RETRIEVAL_QUERY" or "RETRIEVAL_DOCUMENT".
+
+    Returns:
+        A list with one embedding vector per text, in the same order as the input.
+    """
+    contents = [contents] if isinstance(contents, str) else contents
+    if not contents:
+        return []
+    if not cfg.EMBEDDING_CACHE_ENABLED:
+        return embed_remote(cfg, contents, task_type)
+
+    cache = embedding_cache(cfg.EMBEDDING_CACHE_PATH, cfg.EMBEDDING_CACHE_MAX_ENTRIES)
+    model_name = get_backend(cfg).model_name
+    keys = [cache.key(model_name, task_type, cfg.EMBEDDING_DIMENSIONS, text) for text in contents]
+    vectors = cache.get_many(keys)
+
+    missing = {keys[i]: contents[i] for i, vector in enumerate(vectors) if vector is None}
+    if missing:
+        def embed_and_cache(batch: list[tuple[str, str]]) -> list[list[float]]:
+            # Cache every batch as soon as it arrives, so a failing batch doesn't waste the others
+            embeddings = embed_request(cfg, [text for _, text in batch], task_type)
+            cache.put_many([(key, embedding) for (key, _), embedding in zip(batch, embeddings)])
+            return embeddings
+
+        items = list(missing.items())
+        fresh = dict(zip(missing.keys(), _map_batches(cfg, embed_and_cache, items, size=lambda item: len(item[1]))))
+        vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+    return vectors
+
+
+def embed_remote(cfg: Settings, contents: list[str], task_type: str) -> list[list[float]]:
+    """
+    Embed texts with the embedding model, bypassing the cache. The texts are split into batches
+    that fit the API limits, and the batches are sent concurrently.
+    """
+    return _map_batches(cfg, lambda batch: embed_request(cfg, batch, task_type), contents, size=len)
+
+
+def _map_batches(cfg: Settings, func: Callable[[list], list[list[float]]], items: list, size: Callable) -> list[list[float]]:
+    return map_batches(
+        func,
+        items,
+        max_items=cfg.EMBEDDING_BATCH_SIZE,
+        max_size=cfg.EMBEDDING_BATCH_MAX_CHARS,
+        max_workers=cfg.EMBEDDING_MAX_WORKERS,
+        size=size,
     )
-    return [emb.values for emb in response.embeddings] if response.embeddings else []
+
+
+def embed_request(cfg: Settings, contents: list[str], task_type: str) -> list[list[float]]:
+    """
+    Send a single embedding request to the embedding backend selected in the settings.
+    """
+    backend = get_backend(cfg)
+    if backend.rate_limited:
+        embeddings = embedding_rate_limiter(cfg).call(lambda: backend.embed(contents, task_type=task_type), texts=len(contents))
+    else:
+        embeddings = backend.embed(contents, task_type=task_type)
+    if len(embeddings) != len(contents):
+        raise ValueError(f"Expected {len(contents)} embeddings from {backend.model_name}, got {len(embeddings)}.")
+    return embeddings
     
 
+def embedding_rate_limiter(cfg: Settings) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for embedding requests.
+    """
+    return rate_limiter(
+        cfg.EMBEDDING_REQUESTS_PER_MINUTE,
+        cfg.EMBEDDING_TEXTS_PER_MINUTE,
+        cfg.EMBEDDING_MAX_RETRIES,
+        cfg.EMBEDDING_BACKOFF_BASE_SECONDS,
+        cfg.EMBEDDING_BACKOFF_MAX_SECONDS,
+    )
+
+
+def embedding_metrics(cfg: Settings) -> dict:
+    """
+    Report the metrics of the embedding layer: the rate limiter counters and, if enabled, the cache counters.
+
+    Returns:
+        A dictionary with a 'rate_limiter' and a 'cache' section.
+    """
+    metrics = {"rate_limiter": embedding_rate_limiter(cfg).stats(), "cache": None}
+    if cfg.EMBEDDING_CACHE_ENABLED:
+        metrics["cache"] = embedding_cache(cfg.EMBEDDING_CACHE_PATH, cfg.EMBEDDING_CACHE_MAX_ENTRIES).stats()
+    return metrics
+
+
 def embed_query(cfg: Settings, contents: str | list[str]) -> list[list[float]]:
     contents = [contents] if isinstance(contents, str) else contents
     return embed(cfg, contents, task_type="RETRIEVAL_QUERY")
@@ -54,6 +145,43 @@ def embed_document(cfg: Settings, contents: str | list[str]) -> list[list[float]
     return embed(cfg, contents, task_type="RETRIEVAL_DOCUMENT")
 
 
+_dispatchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, EmbeddingDispatcher]]" = weakref.WeakKeyDictionary()
+
+
+def embedding_dispatcher(cfg: Settings) -> EmbeddingDispatcher:
+    """
+    Get the embedding dispatcher for the running event loop. Settings with the same embedding
+    configuration share a dispatcher, so their requests end up in the same batches. Every
+    EMBEDDING_* and GENAI_* setting is part of the key, because the dispatcher embeds with the
+    settings it was created for (batch sizes, rate limits, cache, ...).
+
+    Args:
+        cfg (Settings): The configuration object containing the embedding model details.
+
+    Returns:
+        The EmbeddingDispatcher for the running event loop and embedding configuration.
+    """
+    dispatchers = _dispatchers.setdefault(asyncio.get_running_loop(), {})
+    key = tuple(sorted((name, value) for name, value in cfg.model_dump().items() if name.startswith(("EMBEDDING_", "GENAI_"))))
+    if key not in dispatchers:
+        dispatchers[key] = EmbeddingDispatcher(
+            lambda texts, task_type: embed(cfg, texts, task_type=task_type),
+            max_batch=cfg.EMBEDDING_DISPATCH_MAX_BATCH,
+            max_delay=cfg.EMBEDDING_DISPATCH_MAX_DELAY_MS / 1000,
+        )
+    return dispatchers[key]
+
+
+async def aembed_query(cfg: Settings, contents: str | list[str]) -> list[list[float]]:
+    contents = [contents] if isinstance(contents, str) else contents
+    return await embedding_dispatcher(cfg).embed_many(contents, task_type="RETRIEVAL_QUERY")
+
+
+async def aembed_document(cfg: Settings, contents: str | list[str]) -> list[list[float]]:
+    contents = [contents] if isinstance(contents, str) else contents
+    return await embedding_dispatcher(cfg).embed_many(contents, task_type="RETRIEVAL_DOCUMENT")
+
+
 def test_embedding(cfg: Settings) -> tuple[bool, str, str]:
     """
     Test the embedding function by embedding a simple string.
@@ -63,7 +191,8 @@ def test_embedding(cfg: Settings) -> tuple[bool, str, str]:
         str: An error message if the embedding fails, or a success message if it succeeds.
     """
     try:
-        embedding = embed(cfg, "Test embedding")
+        # Bypass the cache, a cached vector says nothing about the connection
+        embedding = embed_remote(cfg, ["Test embedding"], task_type="RETRIEVAL_QUERY")
         if embedding and len(embedding) > 0:
             return True, f"✅ Embedding successful. Embedding length: {len(embedding)}", ""
         else:
@@ -0,0 +1,49 @@
+from typing import Self
+
+from neuro_noir.core.config import Settings
+from neuro_noir.core.lm import embed_document
+
+
+class EmbeddingPlan:
+    """
+    Collects all strings that need a document embedding, for example the name and profile strings
+    of the statements and entities of a chunk, and embeds them in a single batched call. Strings
+    that occur more than once are only embedded once.
+    """
+
+    def __init__(self):
+        self._vectors: dict[str, list[float] | None] = {}
+
+    def add(self, text: str) -> Self:
+        """
+        Add a string to the plan. Adding a string that is already in the plan has no effect.
+        """
+        self._vectors.setdefault(text, None)
+        return self
+
+    def add_all(self, texts: list[str]) -> Self:
+        for text in texts:
+            self.add(text)
+        return self
+
+    def run(self, cfg: Settings) -> Self:
+        """
+        Embed all strings in the plan that don't have a vector yet with a single call to `embed_document`.
+        """
+        missing = [text for text, vector in self._vectors.items() if vector is None]
+        if missing:
+            for text, vector in zip(missing, embed_document(cfg, missing)):
+                self._vectors[text] = vector
+        return self
+
+    def get(self, text: str) -> list[float]:
+        """
+        Get the vector of a string after the plan has run.
+        """
+        vector = self._vectors.get(text)
+        if vector is None:
+            raise KeyError(f"No embedding planned or computed for: {text!r}")
+        return vector
+
+    def __len__(self) -> int:
+        return len(self._vectors)
@@ -0,0 +1,170 @@
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that refills at a fixed rate per minute. Callers reserve tokens and
+    are told how long to wait before their reservation is covered, so concurrent callers queue up
+    fairly instead of all retrying at the same moment.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Reserve tokens from the bucket.
+
+        Args:
+            amount (float): The number of tokens to reserve.
+
+        Returns:
+            The number of seconds to wait before the reserved tokens are available.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def drain(self) -> None:
+        """
+        Empty the bucket, e.g. after the provider reported that the quota is exhausted.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """
+    A process-wide rate limiter for embedding requests with a requests-per-minute and a
+    texts-per-minute budget. Requests that are throttled by the provider (HTTP 429 or 503) are
+    retried with jittered exponential backoff, and the buckets are drained so that other threads
+    slow down as well.
+
+    A budget of 0 means no limit.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        texts_per_minute: int = 0,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.texts = TokenBucket(texts_per_minute) if texts_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._metrics = {
+            "requests": 0,
+            "texts": 0,
+            "throttled": 0,
+            "retries": 0,
+            "failures": 0,
+            "wait_seconds": 0.0,
+            "backoff_seconds": 0.0,
+        }
+
+    def acquire(self, texts: int = 1) -> None:
+        """
+        Block until the budgets allow one more request with the given number of texts.
+        """
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.texts is not None:
+            wait = max(wait, self.texts.reserve(texts))
+        if wait > 0:
+            time.sleep(wait)
+        self._count("wait_seconds", wait)
+
+    def call(self, func: Callable[[], T], texts: int = 1) -> T:
+        """
+        Call a function within the budgets, retrying it when the provider throttles it.
+
+        Args:
+            func (Callable[[], T]): The function that sends the request.
+            texts (int): The number of texts in the request.
+
+        Returns:
+            The result of the function.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(texts)
+            self._count("requests", 1)
+            self._count("texts", texts)
+            try:
+                return func()
+            except Exception as e:
+                if not is_throttling(e):
+                    self._count("failures", 1)
+                    raise
+                self._count("throttled", 1)
+                if attempt >= self.max_retries:
+                    self._count("failures", 1)
+                    raise
+                for bucket in (self.requests, self.texts):
+                    if bucket is not None:
+                        bucket.drain()
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                self._count("retries", 1)
+                self._count("backoff_seconds", delay)
+                time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def _count(self, name: str, amount: float) -> None:
+        with self._lock:
+            self._metrics[name] += amount
+
+    def stats(self) -> dict:
+        """
+        Report the number of requests, texts, throttled requests, retries and failures, and the
+        time spent waiting for the budgets and backing off.
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+
+def is_throttling(e: Exception) -> bool:
+    """
+    Whether an error means the provider is throttling us (quota exhausted or overloaded).
+    """
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    if code in (429, 503):
+        return True
+    message = str(e)
+    return "RESOURCE_EXHAUSTED" in message or "Too Many Requests" in message
+
+
+@lru_cache(maxsize=4)
+def rate_limiter(
+    requests_per_minute: int,
+    texts_per_minute: int,
+    max_retries: int,
+    base_delay: float,
+    max_delay: float,
+) -> RateLimiter:
+    """
+    Create and cache a rate limiter, so that all threads in the process share the same budgets.
+    """
+    return RateLimiter(requests_per_minute, texts_per_minute, max_retries, base_delay, max_delay)
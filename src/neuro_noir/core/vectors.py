@@ -0,0 +1,116 @@
+from typing import Any, Iterable, Iterator, Sequence, overload
+
+import numpy as np
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema
+
+
+class Vector(Sequence[float]):
+    """
+    A compact, read-only embedding vector backed by a NumPy float32 array. A 1536-dimensional
+    vector takes about 6 KB, where a list of Python floats takes about 50 KB.
+
+    A Vector behaves like a sequence of floats and is only converted to a list when it is handed
+    to the Neo4j driver (see `to_list`) or serialized to JSON.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, values: Iterable[float] | np.ndarray = ()):
+        if isinstance(values, Vector):
+            self._data = values._data
+        else:
+            # Always copy, so the vector owns its data and nobody can change it underneath us
+            self._data = np.array(values, dtype=np.float32).reshape(-1)
+            self._data.setflags(write=False)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "Vector":
+        return cls(np.frombuffer(blob, dtype=np.float32))
+
+    def tobytes(self) -> bytes:
+        return self._data.tobytes()
+
+    def tolist(self) -> list[float]:
+        return self._data.tolist()
+
+    def numpy(self) -> np.ndarray:
+        """
+        Return the underlying read-only float32 array.
+        """
+        return self._data
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        if dtype is None or np.dtype(dtype) == self._data.dtype:
+            return self._data.copy() if copy else self._data
+        return self._data.astype(dtype)
+
+    def __len__(self) -> int:
+        return self._data.shape[0]
+
+    @overload
+    def __getitem__(self, index: int) -> float: ...
+    @overload
+    def __getitem__(self, index: slice) -> "Vector": ...
+    def __getitem__(self, index: int | slice) -> "float | Vector":
+        if isinstance(index, slice):
+            return Vector(self._data[index])
+        return float(self._data[index])
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._data.tolist())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Vector):
+            return np.array_equal(self._data, other._data)
+        if isinstance(other, (list, tuple, np.ndarray)):
+            return len(self) == len(other) and np.array_equal(self._data, np.asarray(other, dtype=np.float32))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Vector(dimensions={len(self)})"
+
+    @classmethod
+    def validate(cls, value: Any) -> "Vector":
+        if isinstance(value, Vector):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            return cls.from_bytes(bytes(value))
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return cls(value)
+        raise ValueError(f"Cannot convert {type(value).__name__} to a Vector")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda vector: vector.tolist(),
+                return_schema=core_schema.list_schema(core_schema.float_schema()),
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> JsonSchemaValue:
+        return {"type": "array", "items": {"type": "number"}}
+
+
+def empty_vector() -> Vector:
+    return Vector()
+
+
+def to_list(vector: Sequence[float] | None) -> list[float] | None:
+    """
+    Convert a vector to a plain list of floats, e.g. before handing it to the Neo4j driver.
+    """
+    if vector is None:
+        return None
+    if isinstance(vector, (Vector, np.ndarray)):
+        return vector.tolist()
+    return list(vector)
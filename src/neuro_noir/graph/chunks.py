@@ -1,4 +1,10 @@
 from neo4j import Driver
+from neuro_noir.core.config import Settings
+from neuro_noir.core.vectors import to_list
+from neuro_noir.graph.hybrid import HYBRID_SEARCH, hybrid_params
+from neuro_noir.graph.mapping import expand_attributes, projection
+from neuro_noir.graph.vectors import BATCH_VECTOR_SEARCH, batch_search_params, reranked, search_params, truncated_dimensions, vector_indexes
+from neuro_noir.graph.writes import batch_size, write_rows
 from neuro_noir.models.chunk import Chunk
 
 
@@ -16,45 +22,59 @@ FOR (c:Chunk) ON (c.index);
 CREATE FULLTEXT INDEX chunk_content_ft IF NOT EXISTS
 FOR (c:Chunk)
 ON EACH [c.content];
-
-CREATE VECTOR INDEX chunk_embedding_vx IF NOT EXISTS
-FOR (c:Chunk) ON (c.embedding)
-OPTIONS {
-  indexConfig: {
-    `vector.dimensions`: 1536,
-    `vector.similarity_function`: 'cosine'
-  }
-};
 """
 
-UPSERT_CHUNK = """
-MERGE (d:Document {document_id: $document_id})
-MERGE (c:Chunk {chunk_id: $chunk_id})
+VECTOR_INDEXES = {
+    "chunk_embedding_vx": ("Chunk", "embedding"),
+}
+
+# The properties search results return by default, and the vectors they only return on request.
+METADATA = ["chunk_id", "document_id", "index", "content"]
+EMBEDDINGS = ["embedding"]
+
+UPSERT_CHUNKS = """
+UNWIND $rows AS row
+MERGE (d:Document {document_id: row.document_id})
+MERGE (c:Chunk {chunk_id: row.chunk_id})
 SET
-  c.document_id = $document_id,
-  c.index = $index,
-  c.content = $content,
-  c.embedding = $embedding
+  c.document_id = row.document_id,
+  c.index = row.index,
+  c.content = row.content,
+  c.embedding = row.embedding,
+  c.embedding_truncated = CASE WHEN $truncated_dimensions IS NULL THEN null ELSE row.embedding[0..$truncated_dimensions] END
 MERGE (d)-[:HAS_CHUNK]->(c)
-RETURN c;
 """
 
 VECTOR_SEARCH = """
 CALL db.index.vector.queryNodes($index_name, $k, $embedding)
 YIELD node, score
-RETURN node AS c, score
+RETURN {projection} AS c, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+VECTOR_SEARCH_RERANKED = """
+CALL db.index.vector.queryNodes($index_name, $candidates, $query_embedding)
+YIELD node
+WITH node, vector.similarity.cosine(node[$property], $embedding) AS score
+RETURN {projection} AS c, score
 ORDER BY score DESC
 LIMIT $k
 """
 
 
-def params(chunk: Chunk) -> dict:
+def schema(cfg: Settings | None = None) -> str:
+    return SCHEMA + vector_indexes(VECTOR_INDEXES, cfg)
+
+
+def params(chunk: Chunk, cfg: Settings | None = None) -> dict:
     return {
         "chunk_id": f"{chunk.document_id}_{chunk.index}",
         "document_id": chunk.document_id,
         "index": chunk.index,
         "content": chunk.content,
-        "embedding": chunk.embedding
+        "embedding": to_list(chunk.embedding),
+        "truncated_dimensions": truncated_dimensions(cfg),
     }
 
 
@@ -63,34 +83,122 @@ def record_to_chunk(record: dict) -> Chunk:
         document_id=record["document_id"],
         index=record["index"],
         content=record["content"],
-        embedding=record["embedding"]
+        embedding=record.get("embedding", []),
     )
 
 
-def store(driver, chunk: Chunk):
-    with driver.session() as session:
-        session.run(UPSERT_CHUNK, params(chunk)).consume()
+def store(driver, chunk: Chunk, cfg: Settings | None = None):
+    """
+    Store a single chunk with the same query as `store_all`. Raises the error if the chunk could not be stored.
+    """
+    failed = store_all(driver, [chunk], cfg)
+    if failed:
+        raise failed[0][1]
 
 
-def store_all(driver, chunks: list[Chunk]):
-    with driver.session() as session:
-        for chunk in chunks:
-            session.run(UPSERT_CHUNK, params(chunk)).consume()
+def store_all(driver, chunks: list[Chunk], cfg: Settings | None = None) -> list[tuple[Chunk, Exception]]:
+    """
+    Store chunks in batches of NEO4J_WRITE_BATCH_SIZE, each batch with a single UNWIND query in one
+    managed write transaction that the driver retries on transient errors.
+
+    Returns:
+        A list of (chunk, error) tuples for the chunks that could not be stored.
+    """
+    rows = []
+    for chunk in chunks:
+        row = params(chunk, cfg)
+        del row["truncated_dimensions"]
+        rows.append(row)
+    failed = write_rows(driver, UPSERT_CHUNKS, rows, batch_size(cfg), {"truncated_dimensions": truncated_dimensions(cfg)})
+    for idx, e in failed:
+        print(f"[ERROR] Failed to store chunk {chunks[idx].index} of document {chunks[idx].document_id}: {e}")
+    return [(chunks[idx], e) for idx, e in failed]
 
 
 def search(
     driver: Driver,
     embedding: list[float],
     n: int = 10,
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
 ) -> list[tuple[Chunk, float]]:
+    """
+    Find the chunks closest to a query vector. Only the chunk metadata is returned unless
+    `include_embeddings` is set, so the hits don't carry their vectors over the wire.
+    """
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
     with driver.session() as session:
-        results = session.run(VECTOR_SEARCH, {
-            "index_name": "chunk_embedding_vx",
-            "k": n,
-            "embedding": embedding
-        })
+        query = VECTOR_SEARCH_RERANKED if reranked(cfg) else VECTOR_SEARCH
+        query = query.format(projection=projection("node", fields))
+        results = session.run(query, search_params("chunk_embedding_vx", "embedding", embedding, n, cfg))
 
         items = []
         for record in results:
-            items.append((record_to_chunk(dict(record["c"])), record["score"]))
-        return items
\ No newline at end of file
+            items.append((record_to_chunk(expand_attributes(dict(record["c"]))), record["score"]))
+        return items
+
+
+def search_batch(
+    driver: Driver,
+    embeddings: list[list[float]],
+    n: int = 10,
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
+) -> list[list[tuple[Chunk, float]]]:
+    """
+    Run one vector search per query vector in a single query and transaction, so a batch of
+    lookups pays for one round trip instead of one per query.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        embeddings (list[list[float]]): The query vectors.
+        n (int): The number of results per query.
+        cfg (Settings | None): The configuration object selecting the index mode.
+        include_embeddings (bool): Whether the results carry their embedding vectors.
+
+    Returns:
+        The results of every query, in the order of the query vectors.
+    """
+    if not embeddings:
+        return []
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
+    query = BATCH_VECTOR_SEARCH.format(projection=projection("node", fields), alias="c")
+    results: list[list[tuple[Chunk, float]]] = [[] for _ in embeddings]
+    with driver.session() as session:
+        for record in session.run(query, batch_search_params("chunk_embedding_vx", "embedding", embeddings, n, cfg)):
+            results[record["i"]] = [(record_to_chunk(expand_attributes(dict(node))), score) for node, score in zip(record["c"], record["scores"])]
+    return results
+
+
+def hybrid_search(
+    driver: Driver,
+    text: str,
+    embedding: list[float],
+    n: int = 10,
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
+) -> list[tuple[Chunk, float]]:
+    """
+    Find chunks by combining the vector index with the `chunk_content_ft` fulltext index in a single query.
+    The rankings of both indexes are fused on the server with reciprocal rank fusion (see
+    `graph.hybrid.hybrid_params`), so the score is a fused rank score, not a similarity.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        text (str): The query text for the fulltext index.
+        embedding (list[float]): The query vector for the vector index.
+        n (int): The number of results to return.
+        cfg (Settings | None): The configuration object with the fusion weights.
+        include_embeddings (bool): Whether the results carry their embedding vectors.
+
+    Returns:
+        A list of (chunk, score) tuples, best first.
+    """
+    if not text.strip():
+        return search(driver, embedding, n, cfg, include_embeddings)
+    _, property = VECTOR_INDEXES["chunk_embedding_vx"]
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
+    query = HYBRID_SEARCH.format(projection=projection("node", fields), alias="c")
+    with driver.session() as session:
+        results = session.run(query, hybrid_params("chunk_embedding_vx", property, "chunk_content_ft", text, embedding, n, cfg))
+        return [(record_to_chunk(expand_attributes(dict(record["c"]))), record["score"]) for record in results]
@@ -1,3 +1,5 @@
+from neuro_noir.core.config import Settings
+from neuro_noir.graph.writes import batch_size, bump_generation, write_rows
 from neuro_noir.models.document import Document
 
 
@@ -11,11 +13,45 @@ FOR (d:Document) ON (d.title);
 """
 
 
-UPSERT_DOCUMENT = """
-MERGE (d:Document {document_id: $document_id})
+UPSERT_DOCUMENTS = """
+UNWIND $rows AS row
+MERGE (d:Document {document_id: row.document_id})
 SET
-  d.title = $title
-RETURN d;
+  d.title = row.title
+"""
+
+
+# Every query runs its deletes in batches with CALL { ... } IN TRANSACTIONS, which requires an
+# implicit (auto-commit) transaction, so they are sent with session.run.
+DOCUMENT_ENTITY_IDS = """
+OPTIONAL MATCH (s:Statement {document_id: $document_id})-[:HAS_SUBJECT|HAS_OBJECT]->(e:Entity)
+WITH collect(DISTINCT e.entity_id) AS linked, collect(DISTINCT s.statement_id) AS statement_ids
+OPTIONAL MATCH (r:Entity {document_id: $document_id})
+WITH linked, statement_ids, collect(r.entity_id) AS resolved
+RETURN linked + [id IN resolved WHERE NOT id IN linked] AS entity_ids, statement_ids
+"""
+
+
+DELETE_DOCUMENT_NODES = """
+MATCH (n:{label} {{document_id: $document_id}})
+CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {batch_size} ROWS
+"""
+
+
+DELETE_ORPHAN_ENTITIES = """
+UNWIND $entity_ids AS entity_id
+MATCH (e:Entity {{entity_id: entity_id}})
+CALL {{
+  WITH e
+  WITH e, EXISTS {{ (e)<-[:HAS_SUBJECT|HAS_OBJECT]-(:Statement) }} AS linked
+  FOREACH (_ IN CASE WHEN linked THEN [1] ELSE [] END |
+    SET e.subject_statement_ids = [sid IN e.subject_statement_ids WHERE NOT sid IN $statement_ids],
+        e.object_statement_ids = [oid IN e.object_statement_ids WHERE NOT oid IN $statement_ids],
+        e.content_hash = null)
+  WITH e, linked
+  WHERE NOT linked
+  DETACH DELETE e
+}} IN TRANSACTIONS OF {batch_size} ROWS
 """
 
 
@@ -27,5 +63,50 @@ def params(document: Document) -> dict:
 
 
 def store(driver, document: Document):
+    failed = write_rows(driver, UPSERT_DOCUMENTS, [params(document)])
+    if failed:
+        raise failed[0][1]
+
+
+def store_all(driver, documents: list[Document], cfg: Settings | None = None) -> list[tuple[Document, Exception]]:
+    """
+    Store documents in batches of NEO4J_WRITE_BATCH_SIZE, each batch in one managed write transaction.
+
+    Returns:
+        A list of (document, error) tuples for the documents that could not be stored.
+    """
+    failed = write_rows(driver, UPSERT_DOCUMENTS, [params(document) for document in documents], batch_size(cfg))
+    for idx, e in failed:
+        print(f"[ERROR] Failed to store document {documents[idx].id}: {e}")
+    return [(documents[idx], e) for idx, e in failed]
+
+
+def delete(driver, document_id: str, cfg: Settings | None = None) -> dict[str, int]:
+    """
+    Delete one document with its chunks and statements, and the entities that were resolved for it
+    or mentioned by its statements once no statement mentions them anymore, so entities left
+    without statement links don't outlive their document. Entities that are still mentioned by other documents are kept,
+    and the ids of the deleted statements are removed from their statement id lists. Nodes are
+    deleted in batches of NEO4J_DELETE_BATCH_SIZE per transaction.
+
+    Args:
+        driver: The Neo4j driver.
+        document_id (str): The id of the document to delete.
+        cfg (Settings | None): The configuration object with the delete batch size.
+
+    Returns:
+        The number of deleted nodes per label.
+    """
+    size = max(1, cfg.NEO4J_DELETE_BATCH_SIZE) if cfg is not None else 1000
+    deleted = {}
     with driver.session() as session:
-        session.run(UPSERT_DOCUMENT, params(document)).consume()
\ No newline at end of file
+        record = session.run(DOCUMENT_ENTITY_IDS, {"document_id": document_id}).single()
+        entity_ids = record["entity_ids"] if record is not None else []
+        statement_ids = record["statement_ids"] if record is not None else []
+        for label in ("Statement", "Chunk", "Document"):
+            summary = session.run(DELETE_DOCUMENT_NODES.format(label=label, batch_size=size), {"document_id": document_id}).consume()
+            deleted[label] = summary.counters.nodes_deleted
+        summary = session.run(DELETE_ORPHAN_ENTITIES.format(batch_size=size), {"entity_ids": entity_ids, "statement_ids": statement_ids}).consume()
+        deleted["Entity"] = summary.counters.nodes_deleted
+    bump_generation()
+    return deleted
@@ -1,6 +1,11 @@
 from typing import Any
 from neo4j import Driver
-from neuro_noir.graph.mapping import flatten_dict
+from neuro_noir.core.config import Settings
+from neuro_noir.core.vectors import to_list
+from neuro_noir.graph.hybrid import HYBRID_SEARCH, hybrid_params
+from neuro_noir.graph.mapping import expand_attributes, flatten_dict, projection
+from neuro_noir.graph.vectors import BATCH_VECTOR_SEARCH, batch_search_params, reranked, search_params, truncated_dimensions, vector_indexes
+from neuro_noir.graph.writes import batch_size, skip_unchanged, write_changed_rows, write_rows
 from neuro_noir.models.entity import Entity
 
 
@@ -18,93 +23,100 @@ FOR (e:Entity) ON (e.type);
 CREATE INDEX entity_aliases_idx IF NOT EXISTS
 FOR (e:Entity) ON (e.aliases);
 
+CREATE INDEX entity_document_id_idx IF NOT EXISTS
+FOR (e:Entity) ON (e.document_id);
+
 CREATE FULLTEXT INDEX entity_text_ft IF NOT EXISTS
 FOR (e:Entity)
 ON EACH [e.canonical_name, e.description, e.explanation, e.aliases];
-
-CREATE VECTOR INDEX entity_name_embedding_vx IF NOT EXISTS
-FOR (e:Entity) ON (e.name_embedding)
-OPTIONS {
-  indexConfig: {
-    `vector.dimensions`: 1536,
-    `vector.similarity_function`: 'cosine'
-  }
-};
-
-CREATE VECTOR INDEX entity_profile_embedding_vx IF NOT EXISTS
-FOR (e:Entity) ON (e.profile_embedding)
-OPTIONS {
-  indexConfig: {
-    `vector.dimensions`: 1536,
-    `vector.similarity_function`: 'cosine'
-  }
-};
 """
 
+VECTOR_INDEXES = {
+    "entity_name_embedding_vx": ("Entity", "name_embedding"),
+    "entity_profile_embedding_vx": ("Entity", "profile_embedding"),
+}
 
-UPSERT_ENTITY = """
-MERGE (e:Entity {entity_id: $entity_id})
-SET
-  e.canonical_name = $canonical_name,
-  e.aliases = $aliases,
-  e.type = $type,
-  e.category = $category,
-  e.description = $description,
-  e.explanation = $explanation,
-  e.name_embedding = $name_embedding,
-  e.profile_embedding = $profile_embedding,
-  e.subject_statement_ids = $subject_statement_ids,
-  e.object_statement_ids = $object_statement_ids
-SET e += $attributes
-SET e.attribute_keys = keys($attributes)
-RETURN e
-"""
+# The properties search results return by default, and the vectors they only return on request.
+METADATA = ["entity_id", "document_id", "canonical_name", "aliases", "type", "category", "description", "explanation", "subject_statement_ids", "object_statement_ids"]
+EMBEDDINGS = ["name_embedding", "profile_embedding"]
 
 
-LINK_SUBJECT = """
-MATCH (s:Statement {statement_id: $statement_id})
-MATCH (e:Entity {entity_id: $entity_id})
-MERGE (s)-[:HAS_SUBJECT]->(e)
-RETURN e, s
+UPSERT_ENTITIES = """
+UNWIND $rows AS row
+MERGE (e:Entity {entity_id: row.entity_id})
+SET
+  e.document_id = row.document_id,
+  e.canonical_name = row.canonical_name,
+  e.aliases = row.aliases,
+  e.type = row.type,
+  e.category = row.category,
+  e.description = row.description,
+  e.explanation = row.explanation,
+  e.name_embedding = row.name_embedding,
+  e.profile_embedding = row.profile_embedding,
+  e.name_embedding_truncated = CASE WHEN $truncated_dimensions IS NULL THEN null ELSE row.name_embedding[0..$truncated_dimensions] END,
+  e.profile_embedding_truncated = CASE WHEN $truncated_dimensions IS NULL THEN null ELSE row.profile_embedding[0..$truncated_dimensions] END,
+  e.subject_statement_ids = row.subject_statement_ids,
+  e.object_statement_ids = row.object_statement_ids,
+  e.content_hash = row.content_hash
+SET e += row.attributes
+SET e.attribute_keys = keys(row.attributes)
 """
 
 
-LINK_OBJECT = """
-MATCH (s:Statement {statement_id: $statement_id})
-MATCH (e:Entity {entity_id: $entity_id})
-MERGE (s)-[:HAS_OBJECT]->(e)
-RETURN e, s
+LINK_ENTITIES = """
+UNWIND $rows AS row
+MATCH (s:Statement {statement_id: row.statement_id})
+MATCH (e:Entity {entity_id: row.entity_id})
+FOREACH (_ IN CASE WHEN row.role = 'HAS_SUBJECT' THEN [1] ELSE [] END | MERGE (s)-[:HAS_SUBJECT]->(e))
+FOREACH (_ IN CASE WHEN row.role = 'HAS_OBJECT' THEN [1] ELSE [] END | MERGE (s)-[:HAS_OBJECT]->(e))
 """
 
 
 VECTOR_SEARCH = """
 CALL db.index.vector.queryNodes($index_name, $k, $embedding)
 YIELD node, score
-RETURN node AS n, score
+RETURN {projection} AS n, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+
+VECTOR_SEARCH_RERANKED = """
+CALL db.index.vector.queryNodes($index_name, $candidates, $query_embedding)
+YIELD node
+WITH node, vector.similarity.cosine(node[$property], $embedding) AS score
+RETURN {projection} AS n, score
 ORDER BY score DESC
 LIMIT $k
 """
 
 
-def params(entity: Entity) -> dict:
+def schema(cfg: Settings | None = None) -> str:
+    return SCHEMA + vector_indexes(VECTOR_INDEXES, cfg)
+
+
+def params(entity: Entity, cfg: Settings | None = None) -> dict:
     return {
         "entity_id": int(entity.id),
+        "document_id": entity.document_id,
         "canonical_name": entity.name,
         "aliases": entity.aliases,
         "type": entity.type_,
         "category": entity.category,
         "description": entity.description,
         "explanation": entity.explanation,
-        "name_embedding": entity.name_embedding,
-        "profile_embedding": entity.profile_embedding,
+        "name_embedding": to_list(entity.name_embedding),
+        "profile_embedding": to_list(entity.profile_embedding),
         "attributes": flatten_dict(entity.attributes),
         "subject_statement_ids": [int(sid) for sid in entity.subject_statement_ids],
-        "object_statement_ids": [int(oid) for oid in entity.object_statement_ids]
+        "object_statement_ids": [int(oid) for oid in entity.object_statement_ids],
+        "truncated_dimensions": truncated_dimensions(cfg),
     }
 
 
 def record_to_entity(record: dict) -> Entity:
-    reserved = {"subject_statement_ids", "object_statement_ids", "entity_id", "canonical_name", "aliases", "type", "category", "description", "explanation", "name_embedding", "profile_embedding", "attribute_keys"}
+    reserved = {"subject_statement_ids", "object_statement_ids", "entity_id", "document_id", "canonical_name", "aliases", "type", "category", "description", "explanation", "name_embedding", "profile_embedding", "attribute_keys"}
 
     attrs = (
         {k: str(record[k]) for k in record.get("attribute_keys", []) if k not in reserved}
@@ -114,46 +126,77 @@ def record_to_entity(record: dict) -> Entity:
 
     return Entity(
         id=int(record["entity_id"]),
+        document_id=record.get("document_id") or "",
         name=record["canonical_name"],
         aliases=record["aliases"],
         type=record["type"],
         category=record.get("category", ""),
         description=record["description"],
         explanation=record["explanation"],
-        name_embedding=record["name_embedding"],
-        profile_embedding=record["profile_embedding"],
+        name_embedding=record.get("name_embedding", []),
+        profile_embedding=record.get("profile_embedding", []),
         attributes=attrs,
         subject_statement_ids=record.get("subject_statement_ids", []),
         object_statement_ids=record.get("object_statement_ids", [])
     )
 
 
-def store(driver, entity: Entity):
-    with driver.session() as session:
-        session.run(UPSERT_ENTITY, params(entity)).consume()
-        for sid in entity.subject_statement_ids:
-            print(f"Linking entity {entity.id} as subject to statement {sid}")
-            session.run(LINK_SUBJECT, {"statement_id": int(sid), "entity_id": int(entity.id)}).consume()
-        for oid in entity.object_statement_ids:
-            print(f"Linking entity {entity.id} as object to statement {oid}")
-            session.run(LINK_OBJECT, {"statement_id": int(oid), "entity_id": int(entity.id)}).consume()
-
-
-def store_all(driver, entities: list[Entity]):
-    print(f"Storing {len(entities)} entities in the database...")
-    with driver.session() as session:
-        for entity in entities:
-            try:
-                print(f" Storing entity {entity.id}")
-                session.run(UPSERT_ENTITY, params(entity)).consume()
-                for sid in entity.subject_statement_ids:
-                    print(f"    Linking entity {entity.id} as subject to statement {sid}")
-                    session.run(LINK_SUBJECT, {"statement_id": int(sid), "entity_id": int(entity.id)}).consume()
-                for oid in entity.object_statement_ids:
-                    print(f"    Linking entity {entity.id} as object to statement {oid}")
-                    session.run(LINK_OBJECT, {"statement_id": int(oid), "entity_id": int(entity.id)}).consume()
-            except Exception as e:
-                print(f"[ERROR] Failed to store entity {entity}: {e}")
+def links(entity: Entity) -> list[dict]:
+    """
+    The (entity, statement, role) rows that link an entity to the statements it is the subject or object of.
+    """
+    rows = [{"entity_id": int(entity.id), "statement_id": int(sid), "role": "HAS_SUBJECT"} for sid in entity.subject_statement_ids]
+    rows.extend({"entity_id": int(entity.id), "statement_id": int(oid), "role": "HAS_OBJECT"} for oid in entity.object_statement_ids)
+    return rows
+
+
+def store(driver, entity: Entity, cfg: Settings | None = None):
+    """
+    Store a single entity and its statement links with the same queries and content hash check as `store_all`.
+    Raises the error if the entity could not be stored.
+    """
+    failed = store_all(driver, [entity], cfg)
+    if failed:
+        raise failed[0][1]
+
+
+def store_all(driver, entities: list[Entity], cfg: Settings | None = None) -> list[tuple[Entity, Exception]]:
+    """
+    Store entities and link them to their subject and object statements. All entities are upserted
+    with one UNWIND query and all links are merged with another, in batches of NEO4J_WRITE_BATCH_SIZE
+    rows, so the number of round trips doesn't grow with the number of mentions. With
+    NEO4J_SKIP_UNCHANGED_WRITES, the upsert skips entities whose stored content hash matches,
+    but their links are always merged.
+
+    Returns:
+        A list of (entity, error) tuples for the entities that could not be stored or linked.
+    """
+    rows = []
+    for entity in entities:
+        row = params(entity, cfg)
+        del row["truncated_dimensions"]
+        rows.append(row)
+
+    size = batch_size(cfg)
+    shared = {"truncated_dimensions": truncated_dimensions(cfg)}
+    if skip_unchanged(cfg):
+        failed_rows, changed = write_changed_rows(driver, UPSERT_ENTITIES, "Entity", "entity_id", rows, size, shared)
+    else:
+        failed_rows, changed = write_rows(driver, UPSERT_ENTITIES, rows, size, shared), list(range(len(rows)))
+    failed = [(entities[idx], e) for idx, e in failed_rows]
+
+    # The links of unchanged entities are merged again as well: a link batch can fail after its
+    # entities were upserted, and a link to a statement that isn't stored yet matches nothing.
+    # MERGE makes the rewrite of existing links a no-op.
+    not_upserted = {idx for idx, _ in failed_rows}
+    link_rows = [(entity, link) for idx, entity in enumerate(entities) if idx not in not_upserted for link in links(entity)]
+    failed_links = write_rows(driver, LINK_ENTITIES, [link for _, link in link_rows], size)
+    failed.extend((link_rows[idx][0], e) for idx, e in failed_links)
+
+    for entity, e in failed:
+        print(f"[ERROR] Failed to store entity {entity.id}: {e}")
+    print(f"Stored {len(changed) - len(failed_rows)} entities and {len(link_rows) - len(failed_links)} statement links, {len(entities) - len(changed)} entities unchanged.")
+    return failed
 
 
 def search(
@@ -161,17 +204,24 @@ def search(
     embedding: list[float],
     n: int = 10,
     index_name: str = "entity_name_embedding_vx",
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
 ) -> list[tuple[Entity, float]]:
+    """
+    Find the entities closest to a query vector in one of the vector indexes. Only the metadata and
+    attributes are returned unless `include_embeddings` is set, so the hits don't carry their
+    vectors over the wire.
+    """
+    _, property = VECTOR_INDEXES[index_name]
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
     with driver.session() as session:
-        results = session.run(VECTOR_SEARCH, {
-            "index_name": index_name,
-            "k": n,
-            "embedding": embedding
-        })
+        query = VECTOR_SEARCH_RERANKED if reranked(cfg) else VECTOR_SEARCH
+        query = query.format(projection=projection("node", fields, attributes=True))
+        results = session.run(query, search_params(index_name, property, embedding, n, cfg))
 
         entities = []
         for record in results:
-            entities.append((record_to_entity(dict(record["n"])), record["score"]))
+            entities.append((record_to_entity(expand_attributes(dict(record["n"]))), record["score"]))
         return entities
     
 
@@ -179,16 +229,20 @@ def search_by_name(
     driver: Driver,
     embedding: list[float],
     n: int = 10,
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
 ) -> list[tuple[Entity, float]]:
-    return search(driver, embedding, n, index_name="entity_name_embedding_vx")
+    return search(driver, embedding, n, index_name="entity_name_embedding_vx", cfg=cfg, include_embeddings=include_embeddings)
 
 
 def search_by_profile(
     driver: Driver,
     embedding: list[float],
     n: int = 10,
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
 ) -> list[tuple[Entity, float]]:
-    return search(driver, embedding, n, index_name="entity_profile_embedding_vx")
+    return search(driver, embedding, n, index_name="entity_profile_embedding_vx", cfg=cfg, include_embeddings=include_embeddings)
 
 
 def find_by_id(driver: Driver, entity_id: int) -> Entity | None:
@@ -223,4 +277,75 @@ def count(driver: Driver) -> int:
         record = session.run(COUNT_ENTITIES_QUERY).single()
         if record is None:
             return 0
-        return record["total_entities"]
\ No newline at end of file
+        return record["total_entities"]
+
+
+def search_batch(
+    driver: Driver,
+    embeddings: list[list[float]],
+    n: int = 10,
+    index_name: str = "entity_name_embedding_vx",
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
+) -> list[list[tuple[Entity, float]]]:
+    """
+    Run one vector search per query vector in a single query and transaction, so a batch of
+    lookups pays for one round trip instead of one per query.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        embeddings (list[list[float]]): The query vectors.
+        n (int): The number of results per query.
+        index_name (str): The vector index to search.
+        cfg (Settings | None): The configuration object selecting the index mode.
+        include_embeddings (bool): Whether the results carry their embedding vectors.
+
+    Returns:
+        The results of every query, in the order of the query vectors.
+    """
+    if not embeddings:
+        return []
+    _, property = VECTOR_INDEXES[index_name]
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
+    query = BATCH_VECTOR_SEARCH.format(projection=projection("node", fields, attributes=True), alias="n")
+    results: list[list[tuple[Entity, float]]] = [[] for _ in embeddings]
+    with driver.session() as session:
+        for record in session.run(query, batch_search_params(index_name, property, embeddings, n, cfg)):
+            results[record["i"]] = [(record_to_entity(expand_attributes(dict(node))), score) for node, score in zip(record["n"], record["scores"])]
+    return results
+
+
+def hybrid_search(
+    driver: Driver,
+    text: str,
+    embedding: list[float],
+    n: int = 10,
+    index_name: str = "entity_name_embedding_vx",
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
+) -> list[tuple[Entity, float]]:
+    """
+    Find entities by combining the vector index with the `entity_text_ft` fulltext index in a single query.
+    The rankings of both indexes are fused on the server with reciprocal rank fusion (see
+    `graph.hybrid.hybrid_params`), so the score is a fused rank score, not a similarity.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        text (str): The query text for the fulltext index.
+        embedding (list[float]): The query vector for the vector index.
+        n (int): The number of results to return.
+        index_name (str): The vector index to search.
+        cfg (Settings | None): The configuration object with the fusion weights.
+        include_embeddings (bool): Whether the results carry their embedding vectors.
+
+    Returns:
+        A list of (entity, score) tuples, best first.
+    """
+    if not text.strip():
+        return search(driver, embedding, n, index_name, cfg, include_embeddings)
+    _, property = VECTOR_INDEXES[index_name]
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
+    query = HYBRID_SEARCH.format(projection=projection("node", fields, attributes=True), alias="n")
+    with driver.session() as session:
+        results = session.run(query, hybrid_params(index_name, property, "entity_text_ft", text, embedding, n, cfg))
+        return [(record_to_entity(expand_attributes(dict(record["n"]))), record["score"]) for record in results]
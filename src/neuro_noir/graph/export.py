@@ -0,0 +1,238 @@
+"""
+Export documents, chunks, statements and entities as CSV files for `neo4j-admin database import`.
+
+The offline importer builds a new database from CSV files much faster than transactional
+MERGEs, which makes it the right tool for a first load of a whole corpus. The exported
+properties are the ones the UPSERT queries in `graph/*` write (they are built from the same
+`params` functions), so the imported graph can be searched and updated by the application as
+if it had been written by it. Create the indexes afterwards with `install_neo4j_schema`.
+
+Usage:
+    paths = export_csv("data/import", documents, chunks, statements, entities, cfg)
+    print(" ".join(import_command(paths)))
+"""
+import csv
+from pathlib import Path
+from typing import Any, Iterable
+
+from neuro_noir.core.config import Settings
+from neuro_noir.graph import chunks as chunk_graph
+from neuro_noir.graph import documents as document_graph
+from neuro_noir.graph import entities as entity_graph
+from neuro_noir.graph import statements as statement_graph
+from neuro_noir.graph.vectors import truncated_dimensions
+from neuro_noir.models.chunk import Chunk
+from neuro_noir.models.document import Document
+from neuro_noir.models.entity import Entity
+from neuro_noir.models.statement import Statement
+
+
+ARRAY_DELIMITER = ";"
+
+
+def format_value(value: Any) -> str:
+    """
+    Format a property value for the importer: lists are joined with the array delimiter, None is empty.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ARRAY_DELIMITER.join(format_value(item) for item in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def value_type(value: Any) -> str:
+    """
+    The importer type of a scalar value, matching the type the value gets when it is SET by Cypher.
+    """
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "long"
+    if isinstance(value, float):
+        return "double"
+    return "string"
+
+
+def common_type(types: set[str]) -> str:
+    """
+    The type of a column that holds values of several types: integers and floats are exported as
+    doubles, any other mix as strings.
+    """
+    if len(types) == 1:
+        return next(iter(types))
+    if types == {"long", "double"}:
+        return "double"
+    return "string"
+
+
+def attribute_columns(rows: list[dict], fixed: Iterable[str] = ()) -> list[tuple[str, str]]:
+    """
+    The dynamic attribute columns of a node file, as (name, importer type) tuples. The types are
+    inferred from the values like `SET n += row.attributes` stores them, so ints, floats and bools
+    keep their type. Attributes that hold a list in any row are exported as arrays. Attributes
+    named like one of the `fixed` columns are skipped.
+    """
+    fixed = set(fixed)
+    types: dict[str, set[str]] = {}
+    arrays: set[str] = set()
+    for row in rows:
+        for key, value in row["attributes"].items():
+            if key in fixed:
+                continue
+            found = types.setdefault(key, set())
+            if isinstance(value, list):
+                arrays.add(key)
+                found.update(value_type(item) for item in value)
+            else:
+                found.add(value_type(value))
+    columns = []
+    for key, found in sorted(types.items()):
+        type_ = common_type(found) if found else "string"
+        columns.append((key, f"{type_}[]" if key in arrays else type_))
+    return columns
+
+
+def with_attributes(columns: list[tuple[str, str]], rows: list[dict]) -> list[tuple[str, str]]:
+    return columns + attribute_columns(rows, [name for name, _ in columns])
+
+
+def truncate(row: dict, properties: Iterable[str], dimensions: int | None) -> None:
+    for property in properties:
+        row[f"{property}_truncated"] = row[property][:dimensions] if dimensions is not None else None
+
+
+def write_nodes(path: Path, label: str, id_column: str, columns: list[tuple[str, str]], rows: list[dict]) -> Path:
+    """
+    Write a node file. The node ID is written to a dedicated `:ID(label)` column, and the id property
+    is written as a typed column, so integer ids stay integers in the imported graph. Attributes
+    never overwrite the value of a fixed column.
+    """
+    with open(path, "w", encoding="utf-8", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow([f":ID({label})"] + [f"{name}:{type_}" for name, type_ in columns] + [":LABEL"])
+        for row in rows:
+            properties = {**row.get("attributes", {}), **row}
+            writer.writerow([format_value(row[id_column])] + [format_value(properties.get(name)) for name, _ in columns] + [label])
+    return path
+
+
+def write_relationships(path: Path, start_label: str, end_label: str, links: list[tuple[Any, Any, str]]) -> Path:
+    with open(path, "w", encoding="utf-8", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow([f":START_ID({start_label})", f":END_ID({end_label})", ":TYPE"])
+        for start, end, type_ in links:
+            writer.writerow([format_value(start), format_value(end), type_])
+    return path
+
+
+def export_csv(
+    folder: str | Path,
+    documents: list[Document],
+    chunks: list[Chunk],
+    statements: list[Statement],
+    entities: list[Entity],
+    cfg: Settings | None = None,
+) -> dict[str, list[Path]]:
+    """
+    Write the node and relationship CSV files for `neo4j-admin database import`.
+
+    Args:
+        folder (str | Path): The folder to write the files to. It is created if it doesn't exist.
+        documents (list[Document]): The documents to export.
+        chunks (list[Chunk]): The chunks of the documents, with embeddings.
+        statements (list[Statement]): The statements extracted from the chunks, with embeddings.
+        entities (list[Entity]): The resolved entities, with embeddings and statement ids.
+        cfg (Settings | None): The configuration object, which decides whether truncated vectors are exported.
+
+    Returns:
+        A dictionary with the "nodes" and "relationships" file paths.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    dimensions = truncated_dimensions(cfg)
+
+    document_rows = [document_graph.params(document) for document in documents]
+
+    chunk_rows = [chunk_graph.params(chunk, cfg) for chunk in chunks]
+    for row in chunk_rows:
+        truncate(row, ["embedding"], dimensions)
+
+    statement_rows = [statement_graph.params(statement, cfg) for statement in statements]
+    for row in statement_rows:
+        truncate(row, ["name_embedding", "profile_embedding"], dimensions)
+        row["attribute_keys"] = list(row["attributes"])
+
+    entity_rows = [entity_graph.params(entity, cfg) for entity in entities]
+    for row in entity_rows:
+        truncate(row, ["name_embedding", "profile_embedding"], dimensions)
+        row["attribute_keys"] = list(row["attributes"])
+
+    truncated = dimensions is not None
+    nodes = [
+        write_nodes(folder / "documents.csv", "Document", "document_id", [
+            ("document_id", "string"), ("title", "string"),
+        ], document_rows),
+        write_nodes(folder / "chunks.csv", "Chunk", "chunk_id", [
+            ("chunk_id", "string"), ("document_id", "string"), ("index", "long"), ("content", "string"),
+            ("embedding", "float[]"),
+        ] + ([("embedding_truncated", "float[]")] if truncated else []), chunk_rows),
+        write_nodes(folder / "statements.csv", "Statement", "statement_id", with_attributes([
+            ("statement_id", "long"), ("document_id", "string"), ("chunk_id", "string"), ("subject", "string"),
+            ("predicate", "string"), ("object", "string"), ("modality", "string[]"), ("sentence", "string"),
+            ("explanation", "string"), ("name_embedding", "float[]"), ("profile_embedding", "float[]"),
+        ] + ([("name_embedding_truncated", "float[]"), ("profile_embedding_truncated", "float[]")] if truncated else [])
+          + [("attribute_keys", "string[]")], statement_rows), statement_rows),
+        write_nodes(folder / "entities.csv", "Entity", "entity_id", with_attributes([
+            ("entity_id", "long"), ("document_id", "string"), ("canonical_name", "string"), ("aliases", "string[]"), ("type", "string"),
+            ("category", "string"), ("description", "string"), ("explanation", "string"),
+            ("name_embedding", "float[]"), ("profile_embedding", "float[]"),
+            ("subject_statement_ids", "long[]"), ("object_statement_ids", "long[]"),
+        ] + ([("name_embedding_truncated", "float[]"), ("profile_embedding_truncated", "float[]")] if truncated else [])
+          + [("attribute_keys", "string[]")], entity_rows), entity_rows),
+    ]
+
+    document_ids = {row["document_id"] for row in document_rows}
+    chunk_ids = {row["chunk_id"] for row in chunk_rows}
+    statement_ids = {row["statement_id"] for row in statement_rows}
+    relationships = [
+        write_relationships(folder / "has_chunk.csv", "Document", "Chunk", [
+            (row["document_id"], row["chunk_id"], "HAS_CHUNK") for row in chunk_rows if row["document_id"] in document_ids
+        ]),
+        write_relationships(folder / "has_statement.csv", "Chunk", "Statement", [
+            (row["chunk_id"], row["statement_id"], "HAS_STATEMENT") for row in statement_rows if row["chunk_id"] in chunk_ids
+        ]),
+        write_relationships(folder / "has_subject.csv", "Statement", "Entity", [
+            (sid, row["entity_id"], "HAS_SUBJECT") for row in entity_rows for sid in row["subject_statement_ids"] if sid in statement_ids
+        ]),
+        write_relationships(folder / "has_object.csv", "Statement", "Entity", [
+            (oid, row["entity_id"], "HAS_OBJECT") for row in entity_rows for oid in row["object_statement_ids"] if oid in statement_ids
+        ]),
+    ]
+    return {"nodes": nodes, "relationships": relationships}
+
+
+def import_command(paths: dict[str, list[Path]], database: str = "neo4j") -> list[str]:
+    """
+    Build the `neo4j-admin database import full` command for exported files. Run it with the database
+    stopped; `--overwrite-destination` replaces the existing database.
+
+    Args:
+        paths (dict[str, list[Path]]): The paths returned by `export_csv`.
+        database (str): The name of the database to create.
+
+    Returns:
+        The command as a list of arguments.
+    """
+    command = [
+        "neo4j-admin", "database", "import", "full",
+        f"--array-delimiter={ARRAY_DELIMITER}",
+        "--multiline-fields=true",
+        "--overwrite-destination=true",
+    ]
+    command.extend(f"--nodes={path.resolve()}" for path in paths["nodes"])
+    command.extend(f"--relationships={path.resolve()}" for path in paths["relationships"])
+    command.append(database)
+    return command
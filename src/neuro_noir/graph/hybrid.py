@@ -0,0 +1,87 @@
+import re
+from typing import Sequence
+
+from neuro_noir.core.config import Settings
+from neuro_noir.graph.vectors import reranked, search_params
+
+
+HYBRID_SEARCH = """
+CALL {{
+  CALL db.index.vector.queryNodes($index_name, $index_candidates, $query_embedding)
+  YIELD node, score
+  WITH node, CASE WHEN $rerank THEN vector.similarity.cosine(node[$property], $embedding) ELSE score END AS score
+  ORDER BY score DESC
+  LIMIT $candidates
+  WITH collect(node) AS nodes
+  UNWIND range(0, size(nodes) - 1) AS rank
+  RETURN nodes[rank] AS node, $vector_weight / ($rrf_k + rank + 1) AS rrf
+  UNION ALL
+  CALL db.index.fulltext.queryNodes($fulltext_index, $text, {{limit: $candidates}})
+  YIELD node, score
+  WITH collect(node) AS nodes
+  UNWIND range(0, size(nodes) - 1) AS rank
+  RETURN nodes[rank] AS node, $fulltext_weight / ($rrf_k + rank + 1) AS rrf
+}}
+WITH node, sum(rrf) AS score
+RETURN {projection} AS {alias}, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+
+LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+LUCENE_OPERATORS = re.compile(r"\b(AND|OR|NOT)\b")
+
+
+def fulltext_query(text: str) -> str:
+    """
+    Escape the Lucene query syntax in free text, so that a user query like "Holmes (the detective)"
+    is searched as plain terms instead of failing to parse. The AND, OR and NOT operators are
+    lowercased, which the fulltext analyzer does to every term anyway.
+    """
+    text = LUCENE_SPECIAL.sub(r"\\\1", " ".join(text.split()))
+    return LUCENE_OPERATORS.sub(lambda match: match.group(1).lower(), text)
+
+
+def hybrid_params(
+    name: str,
+    property: str,
+    fulltext_index: str,
+    text: str,
+    embedding: Sequence[float],
+    n: int,
+    cfg: Settings | None,
+) -> dict:
+    """
+    Build the parameters for a hybrid search. Both indexes return HYBRID_CANDIDATE_FACTOR
+    candidates per requested result, and every candidate scores weight / (HYBRID_RRF_K + rank)
+    for each index that returned it (reciprocal rank fusion). In compact vector index modes the
+    vector candidates are reranked at full precision before they are ranked.
+
+    Args:
+        name (str): The base name of the vector index.
+        property (str): The node property holding the full-precision vector.
+        fulltext_index (str): The name of the fulltext index.
+        text (str): The query text, searched as plain terms.
+        embedding (Sequence[float]): The full-precision query vector.
+        n (int): The number of results to return.
+        cfg (Settings | None): The configuration object, or None for the defaults.
+
+    Returns:
+        A dictionary with the query parameters.
+    """
+    params = search_params(name, property, embedding, n, cfg)
+    candidates = n * (cfg.HYBRID_CANDIDATE_FACTOR if cfg is not None else 4)
+    params.update({
+        "property": property,
+        "rerank": reranked(cfg),
+        "query_embedding": params.get("query_embedding", params["embedding"]),
+        "candidates": candidates,
+        "index_candidates": candidates * cfg.VECTOR_RERANK_FACTOR if reranked(cfg) else candidates,
+        "fulltext_index": fulltext_index,
+        "text": fulltext_query(text),
+        "rrf_k": cfg.HYBRID_RRF_K if cfg is not None else 60,
+        "vector_weight": cfg.HYBRID_VECTOR_WEIGHT if cfg is not None else 1.0,
+        "fulltext_weight": cfg.HYBRID_FULLTEXT_WEIGHT if cfg is not None else 1.0,
+    })
+    return params
@@ -0,0 +1,231 @@
+"""
+Bulk loader for extracted document folders.
+
+Loads the documents in a folder like `data/documents`, where every document folder holds a
+`chunks.json` file, an optional `description.json` file and the statement files of its chunks
+(`statements-for-chunk-with-embedding-{idx}.json` written by `neuro_noir.llm.embed`, or the plain
+`statements-for-chunk-{idx}.json` files). Documents are loaded concurrently by a pool of workers,
+and chunks and statements are written in UNWIND batches with `graph.chunks.store_all` and
+`graph.statements.store_all`, so the loaded graph uses the same nodes and properties as the
+application. Each document folder keeps a checkpoint of its loaded chunks, so an interrupted load
+resumes with the first chunk that wasn't stored yet. The checkpoint is checked against the chunks
+in the graph, so a cleared graph or another database is loaded again in full.
+
+The statement files only hold a sentence embedding per statement, which is loaded as the profile
+embedding. Loaded statements have no name embedding, so they are found by `search_by_profile`,
+the hybrid and fulltext searches, but not by `find_statement` or the vector mirror, which search
+`statement_name_embedding_vx`. Extract the statements with the application to get both.
+
+Usage:
+    python -m neuro_noir.graph.loader data/documents --workers 4
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from neo4j import Driver
+
+from neuro_noir.core.config import Settings
+from neuro_noir.core.db import connect_neo4j, install_neo4j_schema
+from neuro_noir.core.vectors import Vector, empty_vector
+from neuro_noir.graph import chunks as chunk_graph
+from neuro_noir.graph import documents as document_graph
+from neuro_noir.graph import statements as statement_graph
+from neuro_noir.graph.writes import batch_size
+from neuro_noir.llm.embed import EMBED_FILE, STATEMENTS_FILE, write_atomic
+from neuro_noir.models.chunk import Chunk
+from neuro_noir.models.document import Document
+from neuro_noir.models.ids import statement_id
+from neuro_noir.models.statement import Statement
+
+
+CHECKPOINT_FILE = ".graph-load.json"
+
+
+STORED_CHUNKS = """
+MATCH (c:Chunk {document_id: $document_id})
+RETURN collect(c.index) AS indices
+"""
+
+
+def load_document(folder: Path) -> Document:
+    title = folder.name
+    description = folder / "description.json"
+    if description.exists():
+        with open(description, "r", encoding="utf-8") as fp:
+            title = json.load(fp).get("title", title)
+    return Document(id=folder.name, title=title, content="")
+
+
+def load_chunk(folder: Path, document_id: str, idx: int, content: str) -> Chunk:
+    """
+    Load a chunk and its statements from the statement file of the chunk, preferring the file with embeddings.
+    """
+    chunk = Chunk(index=idx, document_id=document_id, content=content)
+    for name in (EMBED_FILE, STATEMENTS_FILE):
+        path = folder / name.format(idx=idx)
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+            break
+    else:
+        return chunk
+
+    chunk.embedding = Vector(data["embedding"]) if data.get("embedding") else empty_vector()
+    for position, st in enumerate(data.get("statements", [])):
+        if not st.get("subject") or not st.get("object"):
+            continue
+        modality = st.get("modality") or []
+        chunk.statements.append(Statement(
+            id=statement_id(document_id, idx, position),
+            document_id=document_id,
+            chunk_index=idx,
+            subject=st["subject"],
+            predicate=st.get("predicate", ""),
+            object=st["object"],
+            modality=[modality] if isinstance(modality, str) else modality,
+            sentence=st.get("sentence", ""),
+            explanation=st.get("explanation", ""),
+            profile_embedding=st.get("embedding") or empty_vector(),
+        ))
+    return chunk
+
+
+class Checkpoint:
+    """
+    The indices of the chunks of a document folder that are stored in the graph.
+    """
+
+    def __init__(self, folder: Path):
+        self.path = folder / CHECKPOINT_FILE
+        self.loaded: set[int] = set()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as fp:
+                self.loaded = set(json.load(fp).get("loaded", []))
+
+    def verify(self, driver: Driver, document_id: str) -> None:
+        """
+        Forget the checkpointed chunks that aren't in the graph (e.g. after the graph was cleared).
+        """
+        with driver.session() as session:
+            record = session.run(STORED_CHUNKS, {"document_id": document_id}).single()
+        self.loaded &= set(record["indices"] if record is not None else [])
+
+    def save(self, indices: list[int]) -> None:
+        self.loaded.update(indices)
+        write_atomic(self.path, {"loaded": sorted(self.loaded)})
+
+
+class BulkLoader:
+    """
+    Loads document folders into the graph with `workers` concurrent workers. Chunks are written in
+    batches that hold at most NEO4J_WRITE_BATCH_SIZE statements, and every stored batch is added to
+    the checkpoint of its document.
+    """
+
+    def __init__(self, cfg: Settings, driver: Driver, workers: int = 4):
+        self.cfg = cfg
+        self.driver = driver
+        self.workers = workers
+        self.nodes = 0
+        self.failed: list[Path] = []
+        self._lock = threading.Lock()
+
+    def plan(self, chunks: list[Chunk]) -> list[list[Chunk]]:
+        size = batch_size(self.cfg)
+        batches: list[list[Chunk]] = []
+        batch: list[Chunk] = []
+        count = 0
+        for chunk in chunks:
+            if batch and count + len(chunk.statements) > size:
+                batches.append(batch)
+                batch, count = [], 0
+            batch.append(chunk)
+            count += len(chunk.statements)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def load_folder(self, folder: Path) -> int:
+        """
+        Load the pending chunks of one document folder.
+
+        Returns:
+            The number of nodes written.
+        """
+        with open(folder / "chunks.json", "r", encoding="utf-8") as fp:
+            contents = json.load(fp)
+        document = load_document(folder)
+        checkpoint = Checkpoint(folder)
+        if checkpoint.loaded:
+            checkpoint.verify(self.driver, document.id)
+        pending = [idx for idx in range(len(contents)) if idx not in checkpoint.loaded]
+        if not pending:
+            return 0
+
+        document_graph.store(self.driver, document)
+        nodes = 1
+        chunks = [load_chunk(folder, document.id, idx, contents[idx]) for idx in pending]
+        for batch in self.plan(chunks):
+            stmts = [statement for chunk in batch for statement in chunk.statements]
+            failed = chunk_graph.store_all(self.driver, batch, self.cfg) + statement_graph.store_all(self.driver, stmts, self.cfg)
+            if failed:
+                raise RuntimeError(f"{len(failed)} nodes of chunks {batch[0].index}-{batch[-1].index} could not be stored")
+            checkpoint.save([chunk.index for chunk in batch])
+            nodes += len(batch) + len(stmts)
+            with self._lock:
+                self.nodes += len(batch) + len(stmts)
+        return nodes
+
+    def run(self, folders: list[Path]) -> bool:
+        """
+        Load the document folders and report progress and throughput.
+
+        Returns:
+            True if all folders were loaded, False if some failed.
+        """
+        print(f"Loading {len(folders)} documents with {self.workers} workers...")
+        start = time.perf_counter()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.load_folder, folder): folder for folder in folders}
+            for future in as_completed(futures):
+                folder = futures[future]
+                try:
+                    nodes = future.result()
+                    done += 1
+                    print(f"[{done}/{len(folders)}] {folder.name}: {nodes} nodes")
+                except Exception as e:
+                    self.failed.append(folder)
+                    print(f"[ERROR] Failed to load {folder.name}: {e}")
+        elapsed = time.perf_counter() - start
+        print(f"Loaded {self.nodes} nodes in {elapsed:.1f}s ({self.nodes / elapsed if elapsed else 0:.1f} nodes/s), {len(self.failed)} documents failed.")
+        return not self.failed
+
+
+def document_folders(root: Path) -> list[Path]:
+    return sorted(folder for folder in root.iterdir() if folder.is_dir() and (folder / "chunks.json").exists())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load extracted document folders into the graph.")
+    parser.add_argument("folder", type=Path, help="The folder holding one folder per document.")
+    parser.add_argument("--workers", type=int, default=4, help="The number of documents loaded concurrently.")
+    args = parser.parse_args(argv)
+
+    cfg = Settings()
+    driver = connect_neo4j(cfg, cache=False)
+    try:
+        install_neo4j_schema(cfg, driver=driver)
+        loader = BulkLoader(cfg, driver, workers=args.workers)
+        return 0 if loader.run(document_folders(args.folder)) else 1
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
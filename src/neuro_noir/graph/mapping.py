@@ -16,4 +16,36 @@ def flatten_list(arg: Any) -> str | int | float | list[float | str | float]:
 
 
 def flatten_dict(d: dict) -> dict:
-    return {k:flatten_list(v) for k,v in d.items()}
\ No newline at end of file
+    return {k:flatten_list(v) for k,v in d.items()}
+
+
+def projection(variable: str, properties: list[str], attributes: bool = False) -> str:
+    """
+    Build a Cypher map projection that returns only the given node properties, so search results
+    don't ship properties (like 1536-float vectors) the caller doesn't need.
+
+    Args:
+        variable (str): The node variable (e.g. "node").
+        properties (list[str]): The properties to return.
+        attributes (bool): Whether to return the dynamic attributes listed in `attribute_keys`,
+            as an `attribute_values` list that `expand_attributes` turns back into properties.
+
+    Returns:
+        A map projection such as `node {.chunk_id, .content}`.
+    """
+    items = [f".{p}" for p in properties]
+    if attributes:
+        items.append(".attribute_keys")
+        items.append(f"attribute_values: [key IN coalesce({variable}.attribute_keys, []) | {variable}[key]]")
+    return f"{variable} {{{', '.join(items)}}}"
+
+
+def expand_attributes(data: dict) -> dict:
+    """
+    Turn the `attribute_values` list of a projected node back into properties keyed by `attribute_keys`.
+    Properties the node doesn't have are projected as null; they are dropped, like in a full node.
+    """
+    values = data.pop("attribute_values", None)
+    if values is not None:
+        data.update(zip(data.get("attribute_keys") or [], values))
+    return {k: v for k, v in data.items() if v is not None}
\ No newline at end of file
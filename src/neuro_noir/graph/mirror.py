@@ -0,0 +1,193 @@
+"""
+An in-process mirror of the chunk, statement and entity vector indexes.
+
+Every `find_*` lookup against Neo4j costs a round trip. With ANN_MIRROR_ENABLED the application
+keeps the same vectors in a `core.ann.VectorIndex` per index, loaded from the graph on first use
+and kept in sync by the graph writes of the application, and answers the lookups locally. The
+mirrored models carry no embeddings, like the default search projection, so the mirror only holds
+each vector once (as a row of the index matrix).
+
+Writes the application doesn't know about (e.g. a Cypher query with updates, or another process
+writing to the same graph) can't be mirrored: `invalidate()` the mirror, and it is reloaded on
+the next lookup.
+"""
+import threading
+from typing import Any, Callable, Sequence
+
+import numpy as np
+from neo4j import Driver
+
+from neuro_noir.core.ann import VectorIndex
+from neuro_noir.core.config import Settings
+from neuro_noir.core.vectors import empty_vector
+from neuro_noir.graph import chunks, entities, statements
+from neuro_noir.graph.mapping import expand_attributes, projection
+
+
+LOAD_NODES = """
+MATCH (node:{label})
+WHERE node.{property} IS NOT NULL
+RETURN {projection} AS node
+"""
+
+
+# The mirrored vector indexes: (graph module, label, vector property, model key, model vector)
+MIRRORED: dict[str, tuple[Any, str, str, Callable[[Any], Any], Callable[[Any], Any]]] = {
+    "chunk_embedding_vx": (chunks, "Chunk", "embedding", lambda c: f"{c.document_id}_{c.index}", lambda c: c.embedding),
+    "statement_name_embedding_vx": (statements, "Statement", "name_embedding", lambda s: s.id, lambda s: s.name_embedding),
+    "entity_name_embedding_vx": (entities, "Entity", "name_embedding", lambda e: e.id, lambda e: e.name_embedding),
+}
+
+RECORDS = {
+    "chunk_embedding_vx": chunks.record_to_chunk,
+    "statement_name_embedding_vx": statements.record_to_statement,
+    "entity_name_embedding_vx": entities.record_to_entity,
+}
+
+WRITERS = {
+    chunks.store_all: "chunk_embedding_vx",
+    statements.store_all: "statement_name_embedding_vx",
+    entities.store_all: "entity_name_embedding_vx",
+}
+
+
+def strip_embeddings(model: Any) -> Any:
+    """
+    A copy of a chunk, statement or entity without its embedding vectors.
+    """
+    fields = [name for name in ("embedding", "name_embedding", "profile_embedding") if name in type(model).model_fields]
+    return model.model_copy(update={name: empty_vector() for name in fields})
+
+
+class GraphMirror:
+    """
+    Local vector indexes for `find_chunk`, `find_statement` and `find_entity`.
+    """
+
+    def __init__(self, cfg: Settings):
+        self.cfg = cfg
+        self.indexes = {
+            name: VectorIndex(cfg.ANN_IVF_THRESHOLD, cfg.ANN_IVF_PROBES, cfg.ANN_IVF_LISTS)
+            for name in MIRRORED
+        }
+        self.loaded = False
+        self._lock = threading.RLock()
+
+    def load(self, driver: Driver) -> dict[str, int]:
+        """
+        (Re)load all mirrored vectors from the graph.
+
+        Returns:
+            The number of vectors loaded per index.
+        """
+        with self._lock:
+            counts = {}
+            for name, (module, label, property, key, vector) in MIRRORED.items():
+                fields = module.METADATA + [property]
+                query = LOAD_NODES.format(label=label, property=property, projection=projection("node", fields, attributes=module is not chunks))
+                with driver.session() as session:
+                    models = [RECORDS[name](expand_attributes(dict(record["node"]))) for record in session.run(query)]
+                self.indexes[name].clear()
+                self.update(name, models)
+                counts[name] = len(self.indexes[name])
+            self.loaded = True
+            print(f"Loaded {counts['chunk_embedding_vx']} chunk, {counts['statement_name_embedding_vx']} statement and {counts['entity_name_embedding_vx']} entity vectors into the vector mirror.")
+            return counts
+
+    def invalidate(self) -> None:
+        """
+        Mark the mirror as out of date, so it is reloaded before it is searched again.
+        """
+        self.loaded = False
+
+    def update(self, name: str, models: list[Any]) -> None:
+        """
+        Add or replace the vectors of models in one of the mirrored indexes. Models without a vector are skipped.
+        """
+        _, _, _, key, vector = MIRRORED[name]
+        models = [model for model in models if vector(model) is not None and len(vector(model))]
+        with self._lock:
+            self.indexes[name].add([key(model) for model in models], [np.asarray(vector(model), dtype=np.float32) for model in models], [strip_embeddings(model) for model in models])
+
+    def sync(self, store_all: Callable, items: list[Any], failed: list[tuple[Any, Exception]] | None = None) -> None:
+        """
+        Mirror the models a `graph.*.store_all` call has stored. This is the `on_write` hook of the
+        `GraphWriter`; writes with other functions are ignored.
+
+        Args:
+            store_all (Callable): The function that stored the models.
+            items (list[Any]): The models passed to it.
+            failed (list[tuple[Any, Exception]] | None): The (model, error) tuples it returned.
+        """
+        name = WRITERS.get(store_all)
+        if name is None:
+            return
+        failed_ids = {id(model) for model, _ in failed or []}
+        with self._lock:
+            self.update(name, [model for model in items if id(model) not in failed_ids])
+
+    def remove_document(self, document_id: str) -> None:
+        """
+        Remove the chunks and statements of a deleted document, and prune their statements from the
+        entities like `graph.documents.delete` does, dropping entities that are left without statements
+        (including the entities resolved for the document that had none).
+        """
+        with self._lock:
+            removed: set[int] = set()
+            for name in ("chunk_embedding_vx", "statement_name_embedding_vx"):
+                index = self.indexes[name]
+                keys = [key for key, model in index.items() if model.document_id == document_id]
+                if name == "statement_name_embedding_vx":
+                    removed.update(keys)
+                index.remove(keys)
+            index = self.indexes["entity_name_embedding_vx"]
+            pruned, orphans = {}, []
+            for key, entity in index.items():
+                if entity.document_id != document_id and removed.isdisjoint(entity.subject_statement_ids) and removed.isdisjoint(entity.object_statement_ids):
+                    continue
+                subject_ids = [sid for sid in entity.subject_statement_ids if sid not in removed]
+                object_ids = [oid for oid in entity.object_statement_ids if oid not in removed]
+                if subject_ids or object_ids:
+                    pruned[key] = entity.model_copy(update={"subject_statement_ids": subject_ids, "object_statement_ids": object_ids})
+                else:
+                    orphans.append(key)
+            index.replace_items(pruned)
+            index.remove(orphans)
+
+    def search(self, name: str, embedding: Sequence[float], k: int = 10) -> list[tuple[Any, float]]:
+        return self.search_batch(name, [embedding], k)[0]
+
+    def search_batch(self, name: str, embeddings: Sequence[Sequence[float]], k: int = 10) -> list[list[tuple[Any, float]]]:
+        """
+        Search one of the mirrored indexes. The results are copies, so callers can't change the mirror.
+        The scores are (1 + cosine) / 2 in [0, 1], like the scores of the Neo4j vector indexes.
+        """
+        results = self.indexes[name].search_batch(embeddings, k)
+        return [[(model.model_copy(), (1 + score) / 2) for model, score in hits] for hits in results]
+
+    def recall_at_k(self, driver: Driver, name: str, embeddings: list[Sequence[float]], k: int = 10) -> float:
+        """
+        Measure the recall of the mirror against the Neo4j vector index: the fraction of the top-k
+        results of the graph search that the local search returns as well.
+
+        Args:
+            driver (Driver): The Neo4j driver.
+            name (str): The name of the mirrored vector index.
+            embeddings (list[Sequence[float]]): The query vectors to measure with.
+            k (int): The number of results per query.
+
+        Returns:
+            The average recall@k over all query vectors.
+        """
+        if not embeddings:
+            return 0.0
+        module, _, _, key, _ = MIRRORED[name]
+        options = {} if module is chunks else {"index_name": name}
+        expected = module.search_batch(driver, embeddings, k, cfg=self.cfg, **options)
+        found = self.search_batch(name, embeddings, k)
+        total = 0.0
+        for graph_hits, local_hits in zip(expected, found):
+            graph_keys = {key(model) for model, _ in graph_hits}
+            local_keys = {key(model) for model, _ in local_hits}
+            total += len(graph_keys & local_keys) / len(graph_keys) if graph_keys else 1.0
+        return total / len(embeddings)
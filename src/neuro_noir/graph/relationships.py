@@ -1,3 +1,6 @@
+from neuro_noir.core.config import Settings
+from neuro_noir.core.vectors import to_list
+from neuro_noir.graph.vectors import truncated_dimensions, vector_indexes
 from neuro_noir.models.relationship import Relationship
 
 
@@ -15,26 +18,13 @@ FOR (r:Relationship) ON (r.aliases);
 CREATE FULLTEXT INDEX relationship_text_ft IF NOT EXISTS
 FOR (r:Relationship)
 ON EACH [r.canonical_name, r.description, r.explanation, r.aliases];
-
-CREATE VECTOR INDEX relationship_name_embedding_vx IF NOT EXISTS
-FOR (r:Relationship) ON (r.name_embedding)
-OPTIONS {
-  indexConfig: {
-    `vector.dimensions`: 1536,
-    `vector.similarity_function`: 'cosine'
-  }
-};
-
-CREATE VECTOR INDEX relationship_profile_embedding_vx IF NOT EXISTS
-FOR (r:Relationship) ON (r.profile_embedding)
-OPTIONS {
-  indexConfig: {
-    `vector.dimensions`: 1536,
-    `vector.similarity_function`: 'cosine'
-  }
-};
 """
 
+VECTOR_INDEXES = {
+    "relationship_name_embedding_vx": ("Relationship", "name_embedding"),
+    "relationship_profile_embedding_vx": ("Relationship", "profile_embedding"),
+}
+
 UPSERT_RELATIONSHIP = """
 MERGE (r:Relationship {relationship_id: $relationship_id})
 SET
@@ -43,21 +33,28 @@ SET
   r.description = $description,
   r.explanation = $explanation,
   r.name_embedding = $name_embedding,
-  r.profile_embedding = $profile_embedding
+  r.profile_embedding = $profile_embedding,
+  r.name_embedding_truncated = CASE WHEN $truncated_dimensions IS NULL THEN null ELSE $name_embedding[0..$truncated_dimensions] END,
+  r.profile_embedding_truncated = CASE WHEN $truncated_dimensions IS NULL THEN null ELSE $profile_embedding[0..$truncated_dimensions] END
 SET r += $attributes
 SET r.attribute_keys = keys($attributes)
 RETURN r;
 """
 
 
-def params(relationship: Relationship) -> dict:
+def schema(cfg: Settings | None = None) -> str:
+    return SCHEMA + vector_indexes(VECTOR_INDEXES, cfg)
+
+
+def params(relationship: Relationship, cfg: Settings | None = None) -> dict:
     return {
         "relationship_id": relationship.id,
         "canonical_name": relationship.name,
         "aliases": relationship.aliases,
         "description": relationship.description,
         "explanation": relationship.explanation,
-        "name_embedding": relationship.name_embedding,
-        "profile_embedding": relationship.profile_embedding,
-        "attributes": relationship.attributes
+        "name_embedding": to_list(relationship.name_embedding),
+        "profile_embedding": to_list(relationship.profile_embedding),
+        "attributes": relationship.attributes,
+        "truncated_dimensions": truncated_dimensions(cfg),
     }
\ No newline at end of file
@@ -3,7 +3,12 @@ from __future__ import annotations
 from typing import Any
 from neo4j import Driver
 
-from neuro_noir.graph.mapping import flatten_dict
+from neuro_noir.core.config import Settings
+from neuro_noir.core.vectors import to_list
+from neuro_noir.graph.hybrid import HYBRID_SEARCH, hybrid_params
+from neuro_noir.graph.mapping import expand_attributes, flatten_dict, projection
+from neuro_noir.graph.vectors import BATCH_VECTOR_SEARCH, batch_search_params, reranked, search_params, truncated_dimensions, vector_indexes
+from neuro_noir.graph.writes import batch_size, skip_unchanged, write_changed_rows, write_rows
 from neuro_noir.models.statement import Statement
 
 
@@ -21,50 +26,50 @@ FOR (s:Statement) ON (s.predicate);
 CREATE INDEX statement_object_idx IF NOT EXISTS
 FOR (s:Statement) ON (s.object);
 
-CREATE VECTOR INDEX statement_name_embedding_vx IF NOT EXISTS
-FOR (s:Statement) ON (s.name_embedding)
-OPTIONS {
-  indexConfig: {
-    `vector.dimensions`: 1536,
-    `vector.similarity_function`: 'cosine'
-  }
-};
-
-CREATE VECTOR INDEX statement_profile_embedding_vx IF NOT EXISTS
-FOR (s:Statement) ON (s.profile_embedding)
-OPTIONS {
-  indexConfig: {
-    `vector.dimensions`: 1536,
-    `vector.similarity_function`: 'cosine'
-  }
-};
+CREATE FULLTEXT INDEX statement_text_ft IF NOT EXISTS
+FOR (s:Statement)
+ON EACH [s.sentence, s.subject, s.predicate, s.object];
 """
 
+VECTOR_INDEXES = {
+    "statement_name_embedding_vx": ("Statement", "name_embedding"),
+    "statement_profile_embedding_vx": ("Statement", "profile_embedding"),
+}
+
+# The properties search results return by default, and the vectors they only return on request.
+METADATA = ["statement_id", "document_id", "chunk_id", "subject", "predicate", "object", "modality", "sentence", "explanation"]
+EMBEDDINGS = ["name_embedding", "profile_embedding"]
+
 
-UPSERT_STATEMENT = """
-MERGE (c:Chunk {chunk_id: $chunk_id})
-MERGE (s:Statement {statement_id: $statement_id})
+UPSERT_STATEMENTS = """
+UNWIND $rows AS row
+MERGE (c:Chunk {chunk_id: row.chunk_id})
+MERGE (s:Statement {statement_id: row.statement_id})
 SET
-  s.document_id = $document_id,
-  s.chunk_id = $chunk_id,
-  s.subject = $subject,
-  s.predicate = $predicate,
-  s.object = $object,
-  s.modality = $modality,
-  s.sentence = $sentence,
-  s.explanation = $explanation,
-  s.name_embedding = $name_embedding,
-  s.profile_embedding = $profile_embedding
-// expand dynamic attributes onto the node (key/value -> node properties)
-SET s += $attributes
-// (optional) keep track of which dynamic keys were set
-SET s.attribute_keys = keys($attributes)
+  s.document_id = row.document_id,
+  s.chunk_id = row.chunk_id,
+  s.subject = row.subject,
+  s.predicate = row.predicate,
+  s.object = row.object,
+  s.modality = row.modality,
+  s.sentence = row.sentence,
+  s.explanation = row.explanation,
+  s.name_embedding = row.name_embedding,
+  s.profile_embedding = row.profile_embedding,
+  s.name_embedding_truncated = CASE WHEN $truncated_dimensions IS NULL THEN null ELSE row.name_embedding[0..$truncated_dimensions] END,
+  s.profile_embedding_truncated = CASE WHEN $truncated_dimensions IS NULL THEN null ELSE row.profile_embedding[0..$truncated_dimensions] END,
+  s.content_hash = row.content_hash
+SET s += row.attributes
+SET s.attribute_keys = keys(row.attributes)
 MERGE (c)-[:HAS_STATEMENT]->(s)
-RETURN s;
 """
 
 
-def params(statement: Statement) -> dict:
+def schema(cfg: Settings | None = None) -> str:
+    return SCHEMA + vector_indexes(VECTOR_INDEXES, cfg)
+
+
+def params(statement: Statement, cfg: Settings | None = None) -> dict:
     return {
         "statement_id": int(statement.id),
         "document_id": statement.document_id,
@@ -75,9 +80,10 @@ def params(statement: Statement) -> dict:
         "modality": statement.modality,
         "sentence": statement.sentence,
         "explanation": statement.explanation,
-        "name_embedding": statement.name_embedding,
-        "profile_embedding": statement.profile_embedding,
+        "name_embedding": to_list(statement.name_embedding),
+        "profile_embedding": to_list(statement.profile_embedding),
         "attributes": flatten_dict(statement.attributes),
+        "truncated_dimensions": truncated_dimensions(cfg),
     }
 
 
@@ -102,23 +108,38 @@ def record_to_statement(data: dict[str, Any]) -> Statement:
     return statement
 
 
-def store(driver: Driver, statement: Statement):
+def store(driver: Driver, statement: Statement, cfg: Settings | None = None):
     """
-    Store a statement in the Neo4j database using the provided driver and the UPSERT_STATEMENT Cypher query.
-    The function takes a Statement object, converts it to a dictionary, and executes the query to create or update the corresponding node in the database.
-    It returns the stored statement as a dictionary if successful, or raises an exception if the operation fails.
+    Store a single statement in the Neo4j database with the same query and content hash check as `store_all`.
+    Raises the error if the statement could not be stored.
     """
-    with driver.session() as session:
-        session.run(UPSERT_STATEMENT, params(statement))
+    failed = store_all(driver, [statement], cfg)
+    if failed:
+        raise failed[0][1]
 
 
-def store_all(driver, statements: list[Statement]):
-    with driver.session() as session:
-        for statement in statements:
-            try:
-                session.run(UPSERT_STATEMENT, params(statement)).consume()
-            except Exception as e:
-                print(f"[ERROR] Failed to store statement {statement}: {e}")
+def store_all(driver: Driver, statements: list[Statement], cfg: Settings | None = None) -> list[tuple[Statement, Exception]]:
+    """
+    Store statements in batches of NEO4J_WRITE_BATCH_SIZE, each batch with a single UNWIND query
+    in one managed write transaction. Statements that can't be stored are reported and returned.
+    With NEO4J_SKIP_UNCHANGED_WRITES, statements whose stored content hash matches are skipped.
+
+    Returns:
+        A list of (statement, error) tuples for the statements that could not be stored.
+    """
+    rows = []
+    for statement in statements:
+        row = params(statement, cfg)
+        del row["truncated_dimensions"]
+        rows.append(row)
+    shared = {"truncated_dimensions": truncated_dimensions(cfg)}
+    if skip_unchanged(cfg):
+        failed, _ = write_changed_rows(driver, UPSERT_STATEMENTS, "Statement", "statement_id", rows, batch_size(cfg), shared)
+    else:
+        failed = write_rows(driver, UPSERT_STATEMENTS, rows, batch_size(cfg), shared)
+    for idx, e in failed:
+        print(f"[ERROR] Failed to store statement {statements[idx].id}: {e}")
+    return [(statements[idx], e) for idx, e in failed]
 
 
 FIND_STATEMENT_BY_ID = """
@@ -130,7 +151,16 @@ RETURN s
 VECTOR_SEARCH_BY_NAME = """
 CALL db.index.vector.queryNodes($index_name, $k, $embedding)
 YIELD node, score
-RETURN node AS s, score
+RETURN {projection} AS s, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+VECTOR_SEARCH_RERANKED = """
+CALL db.index.vector.queryNodes($index_name, $candidates, $query_embedding)
+YIELD node
+WITH node, vector.similarity.cosine(node[$property], $embedding) AS score
+RETURN {projection} AS s, score
 ORDER BY score DESC
 LIMIT $k
 """
@@ -155,7 +185,7 @@ def find_by_id(driver: Driver, statement_id: int) -> Statement | None:
         record = session.run(FIND_STATEMENT_BY_ID, {"statement_id": statement_id}).single() 
         if record is None:
             return None
-        return record_to_statement(dict(record["s"]))
+        return record_to_statement(expand_attributes(dict(record["s"])))
     
 
 def search(
@@ -163,17 +193,24 @@ def search(
     embedding: list[float],
     n: int = 10,
     index_name: str = "statement_name_embedding_vx",
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
 ) -> list[tuple[Statement, float]]:
+    """
+    Find the statements closest to a query vector in one of the vector indexes. Only the metadata and
+    attributes are returned unless `include_embeddings` is set, so the hits don't carry their
+    vectors over the wire.
+    """
+    _, property = VECTOR_INDEXES[index_name]
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
     with driver.session() as session:
-        results = session.run(VECTOR_SEARCH_BY_NAME, {
-            "index_name": index_name,
-            "k": n,
-            "embedding": embedding
-        })
+        query = VECTOR_SEARCH_RERANKED if reranked(cfg) else VECTOR_SEARCH_BY_NAME
+        query = query.format(projection=projection("node", fields, attributes=True))
+        results = session.run(query, search_params(index_name, property, embedding, n, cfg))
 
         statements = []
         for record in results:
-            statements.append((record_to_statement(dict(record["s"])), record["score"]))
+            statements.append((record_to_statement(expand_attributes(dict(record["s"]))), record["score"]))
         return statements
     
 
@@ -181,16 +218,20 @@ def search_by_name(
     driver: Driver,
     embedding: list[float],
     n: int = 10,
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
 ) -> list[tuple[Statement, float]]:
-    return search(driver, embedding, n, index_name="statement_name_embedding_vx")
+    return search(driver, embedding, n, index_name="statement_name_embedding_vx", cfg=cfg, include_embeddings=include_embeddings)
 
 
 def search_by_profile(
     driver: Driver,
     embedding: list[float],
     n: int = 10,
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
 ) -> list[tuple[Statement, float]]:
-    return search(driver, embedding, n, index_name="statement_profile_embedding_vx")
+    return search(driver, embedding, n, index_name="statement_profile_embedding_vx", cfg=cfg, include_embeddings=include_embeddings)
 
 
 def search_by_entity(
@@ -201,5 +242,76 @@ def search_by_entity(
         results = session.run(FIND_STATEMENTS_BY_ENTITY, {"entity_id": entity_id})
         statements = []
         for record in results:
-            statements.append((record_to_statement(dict(record["s"])), 1.0))  # Assuming score of 1.0 for entity-based search
-        return statements
\ No newline at end of file
+            statements.append((record_to_statement(expand_attributes(dict(record["s"]))), 1.0))  # Assuming score of 1.0 for entity-based search
+        return statements
+
+
+def search_batch(
+    driver: Driver,
+    embeddings: list[list[float]],
+    n: int = 10,
+    index_name: str = "statement_name_embedding_vx",
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
+) -> list[list[tuple[Statement, float]]]:
+    """
+    Run one vector search per query vector in a single query and transaction, so a batch of
+    lookups pays for one round trip instead of one per query.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        embeddings (list[list[float]]): The query vectors.
+        n (int): The number of results per query.
+        index_name (str): The vector index to search.
+        cfg (Settings | None): The configuration object selecting the index mode.
+        include_embeddings (bool): Whether the results carry their embedding vectors.
+
+    Returns:
+        The results of every query, in the order of the query vectors.
+    """
+    if not embeddings:
+        return []
+    _, property = VECTOR_INDEXES[index_name]
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
+    query = BATCH_VECTOR_SEARCH.format(projection=projection("node", fields, attributes=True), alias="s")
+    results: list[list[tuple[Statement, float]]] = [[] for _ in embeddings]
+    with driver.session() as session:
+        for record in session.run(query, batch_search_params(index_name, property, embeddings, n, cfg)):
+            results[record["i"]] = [(record_to_statement(expand_attributes(dict(node))), score) for node, score in zip(record["s"], record["scores"])]
+    return results
+
+
+def hybrid_search(
+    driver: Driver,
+    text: str,
+    embedding: list[float],
+    n: int = 10,
+    index_name: str = "statement_name_embedding_vx",
+    cfg: Settings | None = None,
+    include_embeddings: bool = False,
+) -> list[tuple[Statement, float]]:
+    """
+    Find statements by combining the vector index with the `statement_text_ft` fulltext index in a single query.
+    The rankings of both indexes are fused on the server with reciprocal rank fusion (see
+    `graph.hybrid.hybrid_params`), so the score is a fused rank score, not a similarity.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        text (str): The query text for the fulltext index.
+        embedding (list[float]): The query vector for the vector index.
+        n (int): The number of results to return.
+        index_name (str): The vector index to search.
+        cfg (Settings | None): The configuration object with the fusion weights.
+        include_embeddings (bool): Whether the results carry their embedding vectors.
+
+    Returns:
+        A list of (statement, score) tuples, best first.
+    """
+    if not text.strip():
+        return search(driver, embedding, n, index_name, cfg, include_embeddings)
+    _, property = VECTOR_INDEXES[index_name]
+    fields = METADATA + EMBEDDINGS if include_embeddings else METADATA
+    query = HYBRID_SEARCH.format(projection=projection("node", fields, attributes=True), alias="s")
+    with driver.session() as session:
+        results = session.run(query, hybrid_params(index_name, property, "statement_text_ft", text, embedding, n, cfg))
+        return [(record_to_statement(expand_attributes(dict(record["s"]))), record["score"]) for record in results]
@@ -0,0 +1,239 @@
+import re
+from typing import Sequence
+
+from neo4j import Driver
+
+from neuro_noir.core.config import Settings
+from neuro_noir.core.vectors import to_list
+
+
+VECTOR_INDEX_MODES = ("full", "truncated", "int8")
+
+
+VECTOR_INDEX = """
+CREATE VECTOR INDEX {name} IF NOT EXISTS
+FOR (n:{label}) ON (n.{property})
+OPTIONS {{
+  indexConfig: {{
+    `vector.dimensions`: {dimensions},
+    `vector.similarity_function`: 'cosine'{options}
+  }}
+}};
+"""
+
+
+VECTOR_INDEX_TARGET = re.compile(r"CREATE VECTOR INDEX (\w+) IF NOT EXISTS\s+FOR \(n:(\w+)\) ON \(n\.(\w+)\)")
+
+
+SHOW_VECTOR_INDEXES = """
+SHOW VECTOR INDEXES YIELD name, labelsOrTypes, properties
+RETURN name, labelsOrTypes[0] AS label, properties[0] AS property
+"""
+
+
+EXACT_SEARCH = """
+MATCH (n:{label})
+WHERE n[$property] IS NOT NULL
+WITH n, vector.similarity.cosine(n[$property], $embedding) AS score
+RETURN elementId(n) AS id, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+
+INDEX_SEARCH_IDS = """
+CALL db.index.vector.queryNodes($index_name, $candidates, $query_embedding)
+YIELD node, score
+WITH node, CASE WHEN $rerank THEN vector.similarity.cosine(node[$property], $embedding) ELSE score END AS score
+RETURN elementId(node) AS id, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+
+BATCH_VECTOR_SEARCH = """
+UNWIND range(0, size($queries) - 1) AS i
+CALL {{
+  WITH i
+  CALL db.index.vector.queryNodes($index_name, $candidates, $queries[i].query_embedding)
+  YIELD node, score
+  WITH node, CASE WHEN $rerank THEN vector.similarity.cosine(node[$property], $queries[i].embedding) ELSE score END AS score
+  ORDER BY score DESC
+  LIMIT $k
+  RETURN collect({projection}) AS nodes, collect(score) AS scores
+}}
+RETURN i, nodes AS {alias}, scores
+ORDER BY i
+"""
+
+
+def vector_index_mode(cfg: Settings | None) -> str:
+    mode = cfg.VECTOR_INDEX_MODE if cfg is not None else "full"
+    if mode not in VECTOR_INDEX_MODES:
+        raise ValueError(f"Unknown vector index mode '{mode}'. Available modes: {', '.join(VECTOR_INDEX_MODES)}.")
+    return mode
+
+
+def reranked(cfg: Settings | None) -> bool:
+    """
+    Whether searches go through a compact index and are reranked against the full-precision vectors.
+    """
+    return vector_index_mode(cfg) != "full"
+
+
+def index_name(name: str, cfg: Settings | None) -> str:
+    """
+    The name of the vector index for the configured mode. Every mode has its own index name. Neo4j
+    allows only one vector index per label and property, and skips a CREATE ... IF NOT EXISTS for
+    a property that already has one, so `core.db.install_neo4j_schema` drops the index of another
+    mode on the same property before it creates this one.
+    """
+    mode = vector_index_mode(cfg)
+    if mode == "truncated":
+        return f"{name}_{cfg.VECTOR_INDEX_DIMENSIONS}"
+    if mode == "int8":
+        return f"{name}_int8"
+    return name
+
+
+def index_property(property: str, cfg: Settings | None) -> str:
+    """
+    The node property the vector index is built on. In truncated mode the index is built on a
+    separate property holding the leading dimensions of the full vector.
+    """
+    return f"{property}_truncated" if vector_index_mode(cfg) == "truncated" else property
+
+
+def truncated_dimensions(cfg: Settings | None) -> int | None:
+    """
+    The number of leading dimensions to store for the truncated index, or None if no truncated
+    copy of the vectors should be stored.
+    """
+    return cfg.VECTOR_INDEX_DIMENSIONS if vector_index_mode(cfg) == "truncated" else None
+
+
+def vector_index(name: str, label: str, property: str, cfg: Settings | None) -> str:
+    """
+    Build the CREATE VECTOR INDEX statement for a vector property in the configured mode.
+
+    Args:
+        name (str): The base name of the index (e.g. "chunk_embedding_vx").
+        label (str): The node label (e.g. "Chunk").
+        property (str): The node property holding the full-precision vector (e.g. "embedding").
+        cfg (Settings | None): The configuration object, or None for full-precision indexes.
+
+    Returns:
+        A Cypher statement that creates the index if it doesn't exist.
+    """
+    mode = vector_index_mode(cfg)
+    dimensions = cfg.EMBEDDING_DIMENSIONS if cfg is not None else 1536
+    if mode == "truncated":
+        dimensions = cfg.VECTOR_INDEX_DIMENSIONS
+    options = ",\n    `vector.quantization.enabled`: true" if mode == "int8" else ""
+    return VECTOR_INDEX.format(
+        name=index_name(name, cfg),
+        label=label,
+        property=index_property(property, cfg),
+        dimensions=dimensions,
+        options=options,
+    )
+
+
+def vector_index_target(statement: str) -> tuple[str, str, str] | None:
+    """
+    The (name, label, property) of a CREATE VECTOR INDEX statement built by `vector_index`, or
+    None for other schema statements.
+    """
+    match = VECTOR_INDEX_TARGET.search(statement)
+    return match.groups() if match else None
+
+
+def vector_indexes(indexes: dict[str, tuple[str, str]], cfg: Settings | None) -> str:
+    return "".join(vector_index(name, label, property, cfg) for name, (label, property) in indexes.items())
+
+
+def search_params(name: str, property: str, embedding: Sequence[float], n: int, cfg: Settings | None) -> dict:
+    """
+    Build the parameters for a vector search in the configured mode. Compact modes fetch
+    VECTOR_RERANK_FACTOR candidates per requested result from the compact index, which are then
+    reranked against the full-precision vectors on the nodes.
+
+    Args:
+        name (str): The base name of the vector index.
+        property (str): The node property holding the full-precision vector.
+        embedding (Sequence[float]): The full-precision query vector.
+        n (int): The number of results to return.
+        cfg (Settings | None): The configuration object, or None for full-precision search.
+
+    Returns:
+        A dictionary with the query parameters.
+    """
+    embedding = to_list(embedding)
+    params = {"index_name": index_name(name, cfg), "k": n, "embedding": embedding}
+    if reranked(cfg):
+        dimensions = truncated_dimensions(cfg)
+        params.update({
+            "property": property,
+            "candidates": n * cfg.VECTOR_RERANK_FACTOR,
+            "query_embedding": embedding[:dimensions] if dimensions else embedding,
+        })
+    return params
+
+
+def batch_search_params(name: str, property: str, embeddings: list[Sequence[float]], n: int, cfg: Settings | None) -> dict:
+    """
+    Build the parameters for BATCH_VECTOR_SEARCH, which runs one vector search per query vector
+    in a single query, like `search_params` does for a single search.
+    """
+    queries = [search_params(name, property, embedding, n, cfg) for embedding in embeddings]
+    return {
+        "index_name": index_name(name, cfg),
+        "property": property,
+        "k": n,
+        "candidates": n * cfg.VECTOR_RERANK_FACTOR if reranked(cfg) else n,
+        "rerank": reranked(cfg),
+        "queries": [{"embedding": q["embedding"], "query_embedding": q.get("query_embedding", q["embedding"])} for q in queries],
+    }
+
+
+def recall_at_k(
+    driver: Driver,
+    name: str,
+    label: str,
+    property: str,
+    embeddings: list[Sequence[float]],
+    k: int,
+    cfg: Settings | None,
+    rerank: bool = True,
+) -> float:
+    """
+    Measure the recall of a vector index against an exact brute-force search over the
+    full-precision vectors: the fraction of the exact top-k that the index search returns.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        name (str): The base name of the vector index.
+        label (str): The node label of the indexed nodes.
+        property (str): The node property holding the full-precision vector.
+        embeddings (list[Sequence[float]]): The query vectors to measure with.
+        k (int): The number of results per query.
+        cfg (Settings | None): The configuration object selecting the index mode.
+        rerank (bool): Whether to rerank the compact candidates, or measure the compact index on its own.
+
+    Returns:
+        The average recall@k over all query vectors.
+    """
+    if not embeddings:
+        return 0.0
+    total = 0.0
+    with driver.session() as session:
+        for embedding in embeddings:
+            params = search_params(name, property, embedding, k, cfg)
+            params.setdefault("property", property)
+            params.setdefault("candidates", k)
+            params.setdefault("query_embedding", params["embedding"])
+            params["rerank"] = rerank and reranked(cfg)
+            found = {record["id"] for record in session.run(INDEX_SEARCH_IDS, params)}
+            exact = [record["id"] for record in session.run(EXACT_SEARCH.format(label=label), {"property": property, "embedding": params["embedding"], "k": k})]
+            total += len(found.intersection(exact)) / len(exact) if exact else 1.0
+    return total / len(embeddings)
@@ -0,0 +1,135 @@
+import queue
+import threading
+from typing import Any, Callable
+
+from neo4j import Driver
+
+from neuro_noir.core.config import Settings
+
+
+StoreAll = Callable[[Driver, list[Any], Settings | None], list[tuple[Any, Exception]] | None]
+OnWrite = Callable[[StoreAll, list[Any], list[tuple[Any, Exception]]], None]
+
+
+class GraphWriter:
+    """
+    Writes models to the graph on a background thread, so that callers can go on with the next
+    LLM call while the previous results are being stored.
+
+    Writes are queued as (store_all function, items) jobs and run in submission order. Consecutive
+    jobs for the same function that are waiting in the queue are coalesced into a single call, so a
+    backlog of small per-chunk writes turns into a few large batches. The queue is bounded: when the
+    writer falls behind by GRAPH_WRITER_QUEUE_SIZE jobs, `submit` blocks until it catches up.
+
+    Call `flush()` to wait until everything submitted so far is stored, and `close()` to stop the
+    thread. Failures are collected and returned by `flush()` instead of being raised on the thread.
+    After every write, `on_write` (if given) is called on the writer thread with the store_all
+    function, the items and the failures, e.g. to keep an in-process copy of the graph in sync.
+    """
+
+    def __init__(self, driver: Driver, cfg: Settings | None = None, max_queue: int | None = None, on_write: OnWrite | None = None):
+        self.driver = driver
+        self.cfg = cfg
+        self.on_write = on_write
+        max_queue = max_queue if max_queue is not None else (cfg.GRAPH_WRITER_QUEUE_SIZE if cfg is not None else 16)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._failures: list[tuple[Any, Exception]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.jobs = 0
+        self.writes = 0
+        self._thread = threading.Thread(target=self._run, name="graph-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, store_all: StoreAll, items: list[Any]) -> None:
+        """
+        Queue items to be stored with a store_all function (e.g. `graph.statements.store_all`).
+
+        Args:
+            store_all (StoreAll): The function that stores the items, called as store_all(driver, items, cfg).
+            items (list[Any]): The models to store.
+        """
+        if self._closed:
+            raise RuntimeError("The graph writer is closed.")
+        if items:
+            self._queue.put((store_all, list(items)))
+
+    def flush(self) -> list[tuple[Any, Exception]]:
+        """
+        Wait until all submitted items are stored.
+
+        Returns:
+            A list of (item, error) tuples for the items that failed since the last flush.
+        """
+        self._queue.join()
+        with self._lock:
+            failures, self._failures = self._failures, []
+        return failures
+
+    def close(self) -> list[tuple[Any, Exception]]:
+        """
+        Flush the queue and stop the writer thread. The driver is left open.
+        """
+        if self._closed:
+            return self.flush()
+        failures = self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        return failures
+
+    def __enter__(self) -> "GraphWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            jobs = [job]
+            stop = False
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                jobs.append(job)
+            for store_all, items in self._coalesce(jobs):
+                self._write(store_all, items)
+            for _ in range(len(jobs) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    @staticmethod
+    def _coalesce(jobs: list[tuple[StoreAll, list[Any]]]) -> list[tuple[StoreAll, list[Any]]]:
+        coalesced: list[tuple[StoreAll, list[Any]]] = []
+        for store_all, items in jobs:
+            if coalesced and coalesced[-1][0] is store_all:
+                coalesced[-1][1].extend(items)
+            else:
+                coalesced.append((store_all, list(items)))
+        return coalesced
+
+    def _write(self, store_all: StoreAll, items: list[Any]) -> None:
+        try:
+            failed = store_all(self.driver, items, self.cfg) or []
+        except Exception as e:
+            print(f"[ERROR] Failed to store {len(items)} items with {store_all.__module__}.{store_all.__name__}: {e}")
+            failed = [(item, e) for item in items]
+        if self.on_write is not None:
+            try:
+                self.on_write(store_all, items, failed)
+            except Exception as e:
+                print(f"[ERROR] Failed to run the write hook for {len(items)} items: {e}")
+        with self._lock:
+            self.jobs += 1
+            self.writes += len(items) - len(failed)
+            self._failures.extend(failed)
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import threading
+from typing import Any, Iterator, Sequence
+
+from neo4j import Driver, ManagedTransaction
+
+from neuro_noir.core.config import Settings
+
+
+DEFAULT_BATCH_SIZE = 200
+
+
+STORED_HASHES = """
+MATCH (n:{label})
+WHERE n.{key} IN $ids
+RETURN n.{key} AS id, n.content_hash AS content_hash
+"""
+
+
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def write_generation() -> int:
+    """
+    A counter that is incremented by every graph write in this process. Cached search results
+    are only valid for the generation they were computed in.
+    """
+    return _generation
+
+
+def bump_generation() -> int:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+def batch_size(cfg: Settings | None) -> int:
+    return max(1, cfg.NEO4J_WRITE_BATCH_SIZE) if cfg is not None else DEFAULT_BATCH_SIZE
+
+
+def skip_unchanged(cfg: Settings | None) -> bool:
+    return cfg.NEO4J_SKIP_UNCHANGED_WRITES if cfg is not None else True
+
+
+def batches(rows: Sequence[Any], size: int) -> Iterator[tuple[int, Sequence[Any]]]:
+    """
+    Split rows into consecutive batches of at most `size` rows.
+
+    Returns:
+        An iterator of (offset, batch) tuples, where offset is the index of the first row of the batch.
+    """
+    for start in range(0, len(rows), size):
+        yield start, rows[start:start + size]
+
+
+def _run(tx: ManagedTransaction, query: str, rows: Sequence[dict], params: dict) -> None:
+    tx.run(query, {**params, "rows": list(rows)}).consume()
+
+
+def write_rows(
+    driver: Driver,
+    query: str,
+    rows: Sequence[dict],
+    size: int = DEFAULT_BATCH_SIZE,
+    params: dict | None = None,
+) -> list[tuple[int, Exception]]:
+    """
+    Write rows with an `UNWIND $rows AS row ...` query, one managed write transaction per batch.
+    Managed transactions are retried by the driver on transient errors (deadlocks, leader
+    switches, ...). When a batch still fails, its rows are written one at a time so that a single
+    bad row doesn't take the rest of the batch down with it, and the failing rows are reported.
+    Afterwards the write generation is bumped, which invalidates cached search results.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        query (str): The Cypher query, which receives the batch as the $rows parameter.
+        rows (Sequence[dict]): The rows to write.
+        size (int): The maximum number of rows per transaction.
+        params (dict | None): Extra query parameters shared by all rows.
+
+    Returns:
+        A list of (row index, error) tuples for the rows that could not be written.
+    """
+    params = params or {}
+    failed: list[tuple[int, Exception]] = []
+    if not rows:
+        return failed
+    try:
+        with driver.session() as session:
+            for offset, batch in batches(rows, size):
+                try:
+                    session.execute_write(_run, query, batch, params)
+                    continue
+                except Exception as e:
+                    if len(batch) == 1:
+                        failed.append((offset, e))
+                        continue
+                for idx, row in enumerate(batch, start=offset):
+                    try:
+                        session.execute_write(_run, query, [row], params)
+                    except Exception as e:
+                        failed.append((idx, e))
+    finally:
+        bump_generation()
+    return failed
+
+
+def content_hash(row: dict, params: dict | None = None) -> str:
+    """
+    A hash of the properties a row writes, including the shared query parameters (e.g. the
+    truncated dimensions, which decide what else is written).
+    """
+    data = json.dumps([row, params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def write_changed_rows(
+    driver: Driver,
+    query: str,
+    label: str,
+    key: str,
+    rows: Sequence[dict],
+    size: int = DEFAULT_BATCH_SIZE,
+    params: dict | None = None,
+) -> tuple[list[tuple[int, Exception]], list[int]]:
+    """
+    Like `write_rows`, but skips rows whose nodes already hold the same content. Each row gets a
+    `content_hash` that the query must store on the node; the stored hashes are fetched with one
+    small query per thousand rows, and only rows for new or changed nodes are sent and written.
+
+    Args:
+        driver (Driver): The Neo4j driver.
+        query (str): The UNWIND query, which must set `n.content_hash = row.content_hash`.
+        label (str): The label of the written nodes.
+        key (str): The unique key property of the nodes, which must be a column of the rows.
+        rows (Sequence[dict]): The rows to write.
+        size (int): The maximum number of rows per transaction.
+        params (dict | None): Extra query parameters shared by all rows.
+
+    Returns:
+        The (row index, error) tuples of the rows that failed, and the indices of the rows that were sent.
+    """
+    for row in rows:
+        row.pop("content_hash", None)
+        row["content_hash"] = content_hash(row, params)
+    stored: dict[Any, str] = {}
+    with driver.session() as session:
+        for _, batch in batches(rows, max(size, 1000)):
+            result = session.run(STORED_HASHES.format(label=label, key=key), {"ids": [row[key] for row in batch]})
+            stored.update((record["id"], record["content_hash"]) for record in result)
+    changed = [idx for idx, row in enumerate(rows) if stored.get(row[key]) != row["content_hash"]]
+    failed = write_rows(driver, query, [rows[idx] for idx in changed], size, params)
+    return [(changed[idx], e) for idx, e in failed], changed
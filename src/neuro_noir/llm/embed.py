@@ -1,50 +1,166 @@
-from google import genai
-from google.genai import types
-
-
-client = genai.Client(
-        vertexai=True, project='neologic-9-feb-2026', location='europe-west4'
-    )
-
-
-response = client.models.embed_content(
-        model='gemini-embedding-001',
-        contents=['why is the sky blue?', 'What is your age?'],  
-        config=types.EmbedContentConfig(task_type=TASK_DOC, output_dimensionality=1536)
-    )
-
-
-def embed(idx, chunk):
-        if idx != chunk["index"]:
-            raise ValueError("Index mismatch")
-        if chunk["chunk"]:
-            _response = client.models.embed_content(model='gemini-embedding-001',
-                contents=chunk["chunk"],  
-                config=types.EmbedContentConfig(task_type=TASK_DOC, output_dimensionality=1536)
-            )
-            chunk["embedding"] = _response.embeddings[0].values
-        else:
-            chunk["embedding"] = []
-        if chunk["statements"]:
-            _response = client.models.embed_content(model='gemini-embedding-001',
-                contents=[st["sentence"] for st in chunk["statements"]],  
-                config=types.EmbedContentConfig(task_type=TASK_DOC, output_dimensionality=1536)
-            )
-            _embeddings = [ emb.values for emb in _response.embeddings]
-            for st, emb in zip(chunk["statements"], _embeddings):
-                st["embedding"] = emb
-        else:
-            for st in chunk["statements"]:
-                st["embedding"] = []
-        return chunk
-
-
-max_n = 691
-for idx in range(max_n):
-    print(f"Reading file {idx + 1}/{max_n}")
-    with open(STATEMENTS_FILE.format(idx=idx), "r", encoding="utf-8") as _statements_fp:
-        _chunk_data = json.load(_statements_fp)
-    _chunk_with_embed = embed(idx, _chunk_data)
-    print(f"Writing file {idx + 1}/{max_n}")
-    with open(EMBED_FILE.format(idx=idx), "w", encoding="utf-8") as _embed_fp:
-        _chunk_with_embed = json.dump(_chunk_with_embed, _embed_fp)
\ No newline at end of file
+"""
+Batch embedding job for extracted statement files.
+
+Embeds the chunk text and the statement sentences of every `statements-for-chunk-{idx}.json` file in
+a document folder and writes the result to `statements-for-chunk-with-embedding-{idx}.json`, the
+files `graph/loader.py` loads. Texts of many files are embedded together in large batches by
+concurrent workers. Files that already have an output file are skipped, and outputs are written
+atomically, so an interrupted job can simply be restarted.
+
+Usage:
+    python -m neuro_noir.llm.embed data/documents/the-five-orange-pips --workers 4 --batch-size 500
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from neuro_noir.core.config import Settings
+from neuro_noir.core.lm import embed_document
+
+
+STATEMENTS_FILE = "statements-for-chunk-{idx}.json"
+EMBED_FILE = "statements-for-chunk-with-embedding-{idx}.json"
+STATEMENTS_PATTERN = re.compile(r"statements-for-chunk-(\d+)\.json$")
+
+
+def pending_files(folder: Path) -> list[tuple[int, Path, Path]]:
+    """
+    List the statement files in a folder that don't have an embedded output file yet.
+
+    Returns:
+        A list of (index, input path, output path) tuples, sorted by chunk index.
+    """
+    pending = []
+    for path in folder.iterdir():
+        match = STATEMENTS_PATTERN.match(path.name)
+        if not match:
+            continue
+        idx = int(match.group(1))
+        output = folder / EMBED_FILE.format(idx=idx)
+        if not output.exists():
+            pending.append((idx, path, output))
+    return sorted(pending)
+
+
+def texts_of(chunk: dict) -> list[str]:
+    texts = [chunk["chunk"]] if chunk.get("chunk") else []
+    texts.extend(st["sentence"] for st in chunk.get("statements", []) if st.get("sentence"))
+    return texts
+
+
+def apply_embeddings(chunk: dict, vectors: dict[str, list[float]]) -> dict:
+    chunk["embedding"] = vectors[chunk["chunk"]] if chunk.get("chunk") else []
+    for st in chunk.get("statements", []):
+        st["embedding"] = vectors[st["sentence"]] if st.get("sentence") else []
+    return chunk
+
+
+def write_atomic(path: Path, data: dict) -> None:
+    """
+    Write JSON to a temporary file next to the target and move it into place, so a crash never
+    leaves a half-written output file behind.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            json.dump(data, fp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class EmbeddingJob:
+    """
+    Embeds the pending statement files of a document folder. Files are grouped into batches of
+    at least `batch_size` texts, and the batches are embedded by `workers` concurrent workers.
+    """
+
+    def __init__(self, cfg: Settings, folder: Path, batch_size: int = 500, workers: int = 4):
+        self.cfg = cfg
+        self.folder = folder
+        self.batch_size = batch_size
+        self.workers = workers
+        self.files_done = 0
+        self.texts_done = 0
+        self.failed: list[Path] = []
+
+    def plan(self, pending: list[tuple[int, Path, Path]]) -> list[list[tuple[int, Path, Path]]]:
+        batches: list[list[tuple[int, Path, Path]]] = []
+        batch: list[tuple[int, Path, Path]] = []
+        count = 0
+        for item in pending:
+            with open(item[1], "r", encoding="utf-8") as fp:
+                count += len(texts_of(json.load(fp)))
+            batch.append(item)
+            if count >= self.batch_size:
+                batches.append(batch)
+                batch = []
+                count = 0
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def embed_batch(self, batch: list[tuple[int, Path, Path]]) -> tuple[int, int]:
+        chunks = []
+        for idx, input_path, output_path in batch:
+            with open(input_path, "r", encoding="utf-8") as fp:
+                chunk = json.load(fp)
+            if idx != chunk["index"]:
+                raise ValueError(f"Index mismatch in {input_path.name}: expected {idx}, found {chunk['index']}")
+            chunks.append((chunk, output_path))
+
+        texts = list(dict.fromkeys(text for chunk, _ in chunks for text in texts_of(chunk)))
+        vectors = dict(zip(texts, embed_document(self.cfg, texts))) if texts else {}
+        for chunk, output_path in chunks:
+            write_atomic(output_path, apply_embeddings(chunk, vectors))
+        return len(chunks), len(texts)
+
+    def run(self) -> bool:
+        """
+        Run the job and report progress and throughput.
+
+        Returns:
+            True if all files were embedded, False if some batches failed.
+        """
+        pending = pending_files(self.folder)
+        total = len(pending)
+        print(f"Embedding {total} pending files in {self.folder} with {self.workers} workers...")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.embed_batch, batch): batch for batch in self.plan(pending)}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    files, texts = future.result()
+                    self.files_done += files
+                    self.texts_done += texts
+                except Exception as e:
+                    self.failed.extend(input_path for _, input_path, _ in batch)
+                    print(f"[ERROR] Failed to embed {len(batch)} files starting at {batch[0][1].name}: {e}")
+                elapsed = time.perf_counter() - start
+                print(f"[{self.files_done}/{total}] files, {self.texts_done} texts, {self.texts_done / elapsed if elapsed else 0:.1f} texts/s")
+        elapsed = time.perf_counter() - start
+        print(f"Embedded {self.files_done} files ({self.texts_done} texts) in {elapsed:.1f}s, {len(self.failed)} files failed.")
+        return not self.failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Embed the chunks and statements of extracted statement files.")
+    parser.add_argument("folder", type=Path, help="The document folder holding statements-for-chunk-{idx}.json files.")
+    parser.add_argument("--workers", type=int, default=4, help="The number of batches embedded concurrently.")
+    parser.add_argument("--batch-size", type=int, default=500, help="The minimum number of texts per batch.")
+    args = parser.parse_args(argv)
+
+    job = EmbeddingJob(Settings(), args.folder, batch_size=args.batch_size, workers=args.workers)
+    return 0 if job.run() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,31 @@ from pydantic import BaseModel, Field, ValidationError
 
 from neuro_noir.core.config import Settings
 from neuro_noir.core.lm import embed_document
-from neuro_noir.core.lm import embed_document
+from neuro_noir.core.plan import EmbeddingPlan
+from neuro_noir.core.vectors import Vector, empty_vector
 from neuro_noir.llm.resolver import resolver
 from neuro_noir.llm.disambiguator import disambiguator
 from neuro_noir.llm.extractor import extractor
 from neuro_noir.models.entity import Entity
+from neuro_noir.models.ids import entity_id, statement_id
 from neuro_noir.models.relationship import Relationship
 from neuro_noir.models.statement import Statement
 
 
+def embed_names_and_profiles(cfg: Settings, models: list[Statement] | list[Entity]) -> None:
+    """
+    Embed the name and profile strings of statements or entities in a single deduplicated pass
+    and store the vectors in their name_embedding and profile_embedding fields.
+    """
+    plan = EmbeddingPlan()
+    for model in models:
+        plan.add(model.name_string()).add(model.profile_string())
+    plan.run(cfg)
+    for model in models:
+        model.name_embedding = Vector(plan.get(model.name_string()))
+        model.profile_embedding = Vector(plan.get(model.profile_string()))
+
+
 class Chunk(BaseModel):
     index: int = Field(default=0, description="The index of the chunk within the document. This should be a sequential number starting from 0 for the first chunk, 1 for the second chunk, and so on.")
     document_id: str = Field(default="", description="The ID of the document this chunk belongs to.")
@@ -20,7 +36,7 @@ class Chunk(BaseModel):
     statements: list[Statement] = Field(default_factory=list)
     entities: list[Entity] = Field(default_factory=list)
     relationships: list[Relationship] = Field(default_factory=list)
-    embedding: list[float] = Field(default_factory=list, exclude=True, description="An embedding vector for the chunk content. This can be used for chunk linking or clustering based on content similarity.")
+    embedding: Vector = Field(default_factory=empty_vector, exclude=True, description="An embedding vector for the chunk content. This can be used for chunk linking or clustering based on content similarity.")
 
 
     def embed(self, cfg: Settings) -> Self:
@@ -28,18 +44,19 @@ class Chunk(BaseModel):
         Generate an embedding vector for the chunk content using the provided embedding function and store it in the embedding field.
         The embedding function should take a string input and return a list of floats representing the embedding vector.
         """
-        self.embedding = embed_document(cfg, [self.content])[0] if self.content else []
+        self.embedding = Vector(embed_document(cfg, [self.content])[0]) if self.content else empty_vector()
         return self
 
-    def extract_statements(self, cfg: Settings, starting_id: int = 1) -> list[Statement]:
+    def extract_statements(self, cfg: Settings) -> list[Statement]:
         """
         Extract statements from the chunk content using the provided extractor function and store them in the statements field.
         The extractor function should take a string input and return a list of Statement objects extracted from the text.
+        Statement ids are derived from the document, the chunk index and the position of the statement.
         """
         result = extractor(text=self.content)
         for idx, statement_dict in enumerate(result.statements):
             try:
-                statement = Statement(**statement_dict, id=starting_id + idx, document_id=self.document_id, chunk_index=self.index)
+                statement = Statement(**statement_dict, id=statement_id(self.document_id, self.index, idx), document_id=self.document_id, chunk_index=self.index)
                 if statement.object_ is None:
                     statement.object_ = ""
                 if statement.modality is None:
@@ -57,29 +74,29 @@ class Chunk(BaseModel):
             except Exception as e:
                 print(f"[ERROR] Unexpected error processing statement {idx}: {e}")
 
-        name_strings = [s.name_string() for s in self.statements]
-
-        profile_strings = [s.profile_string() for s in self.statements]
-        name_embeddings = embed_document(cfg, name_strings) if name_strings else []
-        profile_embeddings = embed_document(cfg, profile_strings) if profile_strings else []
-        for statement, name_embedding, profile_embedding in zip(self.statements, name_embeddings, profile_embeddings):
-            statement.name_embedding = name_embedding
-            statement.profile_embedding = profile_embedding
+        embed_names_and_profiles(cfg, self.statements)
         return self.statements
     
-    def resolve_entities(self, cfg: Settings, entity_types: list[Type[BaseModel]], starting_id: int = 1) -> list[Entity]:
+    def resolve_entities(self, cfg: Settings, entity_types: list[Type[BaseModel]]) -> list[Entity]:
         """
         Resolve entities in the chunk.
+        The resolver sees the statements numbered 1..n, and the statement ids it returns are mapped back to the
+        statement ids; ids it made up are dropped. Entity ids are derived from the document, the chunk index and
+        the position of the entity.
         """
-        statements = [s.model_dump(include={'id', 'subject', 'predicate', 'object_', 'modality', 'sentence', 'explanation'}) for s in self.statements]
+        local_ids = {position + 1: s.id for position, s in enumerate(self.statements)}
+        statements = [{**s.model_dump(include={'subject', 'predicate', 'object_', 'modality', 'sentence', 'explanation'}), 'id': position + 1} for position, s in enumerate(self.statements)]
         categories = [ f"Category: {et.__name__}\nDescription: {json.dumps(et.model_json_schema(),indent=2)}" for et in entity_types ] if entity_types else []
         response = resolver(text=self.content, statements=statements, categories=categories)
 
         for idx, entity_dict in enumerate(response.entities):
             try:
                 base_fields = {k:v for k, v in entity_dict.items() if k in {"name", "aliases", "type", "category", "description", "explanation", "name_embedding", "profile_embedding", "statement_ids", "subject_statement_ids", "object_statement_ids"}}
-                entity = Entity(**base_fields, id=starting_id + idx)
-                entity.attributes = {k: v for k, v in entity_dict.items() if k not in {"name", "aliases", "type", "category", "description", "explanation", "name_embedding", "profile_embedding", "id"}}
+                for field in ("subject_statement_ids", "object_statement_ids"):
+                    if field in base_fields:
+                        base_fields[field] = [local_ids[sid] for sid in base_fields[field] if sid in local_ids]
+                entity = Entity(**base_fields, id=entity_id(self.document_id, self.index, idx), document_id=self.document_id)
+                entity.attributes = {k: v for k, v in entity_dict.items() if k not in {"name", "aliases", "type", "category", "description", "explanation", "name_embedding", "profile_embedding", "id", "document_id", "statement_ids", "subject_statement_ids", "object_statement_ids"}}
                 self.entities.append(entity)
             except ValidationError as e:
                 print(f"[ERROR] Could not parse entity {idx}-{entity_dict}: {e}")
@@ -88,13 +105,7 @@ class Chunk(BaseModel):
             except Exception as e:
                 print(f"[ERROR] Unexpected error processing entity {idx}-{entity_dict}: {e}")
 
-        name_strings = [e.name_string() for e in self.entities]
-        profile_strings = [e.profile_string() for e in self.entities]
-        name_embeddings = embed_document(cfg, name_strings) if name_strings else []
-        profile_embeddings = embed_document(cfg, profile_strings) if profile_strings else []
-        for entity, name_embedding, profile_embedding in zip(self.entities, name_embeddings, profile_embeddings):
-            entity.name_embedding = name_embedding
-            entity.profile_embedding = profile_embedding
+        embed_names_and_profiles(cfg, self.entities)
         return self.entities
 
     def disambiguate_entities(self, cfg: Settings, ) -> Self:
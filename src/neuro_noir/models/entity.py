@@ -1,8 +1,10 @@
+import asyncio
 from typing import Self
 from pydantic import BaseModel, Field
 
 from neuro_noir.core.config import Settings
-from neuro_noir.core.lm import embed_document
+from neuro_noir.core.lm import aembed_document, embed_document
+from neuro_noir.core.vectors import Vector, empty_vector
 
 
 class Entity(BaseModel):
@@ -13,9 +15,10 @@ class Entity(BaseModel):
     category: str = Field(default="", description="The category of the entity based on the context in which it appears in the text. based on the list of posible categories provided in the input.")
     description: str = Field(default="", description="A brief description of the entity based on the context in which it appears in the text. This should be a concise summary of who or what the entity is, based on the information provided in the text.")
     explanation: str = Field(default="", description="An explanation of how the entity was identified and why the name and aliases were chosen. This should include any reasoning or evidence from the text that supports the identification of the entity and the choice of its canonical name and aliases.")
-    name_embedding: list[float] | None = Field(default_factory=list, exclude=True, description="An embedding vector for the entity name. This can be used for entity linking or clustering based on name similarity.")
-    profile_embedding: list[float] | None = Field(default_factory=list, exclude=True, description="An embedding vector for the entity profile, which can be derived from the statements and relationships associated with the entity. This can be used for entity linking or clustering based on profile similarity.")
+    name_embedding: Vector | None = Field(default_factory=empty_vector, exclude=True, description="An embedding vector for the entity name. This can be used for entity linking or clustering based on name similarity.")
+    profile_embedding: Vector | None = Field(default_factory=empty_vector, exclude=True, description="An embedding vector for the entity profile, which can be derived from the statements and relationships associated with the entity. This can be used for entity linking or clustering based on profile similarity.")
     attributes: dict[str, str] = Field(default_factory=dict, exclude=True, description="A dictionary of additional attributes.")
+    document_id: str = Field(default="", exclude=True, description="The ID of the document the entity was resolved from.")
     subject_statement_ids: list[int] = Field(default_factory=list, exclude=True, description="A list of statement IDs where the entity is the subject.")
     object_statement_ids: list[int] = Field(default_factory=list, exclude=True, description="A list of statement IDs where the entity is the object.")
     
@@ -40,7 +43,22 @@ class Entity(BaseModel):
         The embedding function should take a string input and return a list of floats representing the embedding vector.
         """
         if self.name:
-            self.name_embedding = embed_document(cfg=cfg, contents=self.name_string())[0]
+            self.name_embedding = Vector(embed_document(cfg=cfg, contents=self.name_string())[0])
         if self.name or self.aliases or self.description or self.explanation:
-            self.profile_embedding = embed_document(cfg=cfg, contents=self.profile_string())[0]
-        return self
\ No newline at end of file
+            self.profile_embedding = Vector(embed_document(cfg=cfg, contents=self.profile_string())[0])
+        return self
+
+    async def aembed(self, cfg: Settings) -> Self:
+        """
+        Asynchronous version of `embed`. The name and profile strings are queued on the embedding dispatcher,
+        so concurrent callers share batched embedding requests.
+        """
+        name_task = aembed_document(cfg, self.name_string()) if self.name else None
+        profile_task = aembed_document(cfg, self.profile_string()) if self.name or self.aliases or self.description or self.explanation else None
+        tasks = [task for task in (name_task, profile_task) if task is not None]
+        results = iter(await asyncio.gather(*tasks))
+        if name_task is not None:
+            self.name_embedding = Vector(next(results)[0])
+        if profile_task is not None:
+            self.profile_embedding = Vector(next(results)[0])
+        return self
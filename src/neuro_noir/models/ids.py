@@ -0,0 +1,22 @@
+import hashlib
+
+
+def position_id(kind: str, document_id: str, chunk_index: int, position: int) -> int:
+    digest = hashlib.sha256(f"{kind}{document_id}:{chunk_index}:{position}".encode("utf-8")).hexdigest()
+    return int(digest[:15], 16)
+
+
+def statement_id(document_id: str, chunk_index: int, position: int) -> int:
+    """
+    A stable statement id derived from the position of the statement in its document, so reloading
+    a chunk updates its statements instead of adding new ones, and statements of different
+    documents never share a node.
+    """
+    return position_id("", document_id, chunk_index, position)
+
+
+def entity_id(document_id: str, chunk_index: int, position: int) -> int:
+    """
+    A stable entity id derived from the position of the entity among the entities resolved for its chunk.
+    """
+    return position_id("entity:", document_id, chunk_index, position)
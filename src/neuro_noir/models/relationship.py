@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field
 
 from neuro_noir.core.config import Settings
 from neuro_noir.core.lm import embed_document
+from neuro_noir.core.vectors import Vector, empty_vector
 
 
 class Relationship(BaseModel):
@@ -11,8 +12,8 @@ class Relationship(BaseModel):
     aliases: list[str] = Field(default_factory=list, description="A list of aliases for the relationship. These can be different forms of the name, tense variations, or synonyms, like 'works at' and 'employed at' could be aliases for the same relationship.")
     description: str = Field(default="", description="A brief description of the relationship based on the context in which it appears in the text. This should be a concise summary of what kind of relationship it is, based on the information provided in the text.")
     explanation: str = Field(default="", description="An explanation of how the relationship was identified and why the name and aliases were chosen. This should include any reasoning or evidence from the text that supports the identification of the relationship and the choice of its canonical name and aliases.")
-    name_embedding: list[float] | None = Field(default_factory=list, exclude=True, description="An embedding vector for the relationship name. This can be used for relationship linking or clustering based on name similarity.")
-    profile_embedding: list[float] | None = Field(default_factory=list, exclude=True, description="An embedding vector for the relationship profile, which can be derived from the statements and relationships associated with the relationship. This can be used for relationship linking or clustering based on profile similarity.")
+    name_embedding: Vector | None = Field(default_factory=empty_vector, exclude=True, description="An embedding vector for the relationship name. This can be used for relationship linking or clustering based on name similarity.")
+    profile_embedding: Vector | None = Field(default_factory=empty_vector, exclude=True, description="An embedding vector for the relationship profile, which can be derived from the statements and relationships associated with the relationship. This can be used for relationship linking or clustering based on profile similarity.")
     attributes: dict[str, str] = Field(default_factory=dict, exclude=True, description="A dictionary of additional attributes.")
     
     def embed(self, cfg: Settings) -> Self:
@@ -1,8 +1,10 @@
+import asyncio
 from typing import Self
 from pydantic import BaseModel, Field
 
 from neuro_noir.core.config import Settings
-from neuro_noir.core.lm import embed_document
+from neuro_noir.core.lm import aembed_document, embed_document
+from neuro_noir.core.vectors import Vector, empty_vector
 
 
 class Statement(BaseModel):
@@ -15,8 +17,8 @@ class Statement(BaseModel):
         modality: list[str] = Field(default_factory=list, description="The modality of the statement, which can be one or more of the following: 'assertion', 'negation', 'possibility', 'speculation', 'question', 'hypothetical', or others. This indicate how the predicate relates the subject and object. For example, if the statement is 'The cat is on the mat', the modality would be 'assertion'. If the statement is 'The cat might be on the mat', the modality would be 'possibility'. If the statement is 'Is the cat on the mat?', the modality would be 'question'.")
         sentence: str = Field(default="", description="The sentence from the text the statement appears in.")
         explanation: str = Field(default="", description="An explanation of the statement and how the subject, predicate and object were derived from it.")
-        name_embedding: list[float] | None = Field(default_factory=list, exclude=True, description="An embedding vector for the statement name. This can be used for statement linking or clustering based on name similarity.")
-        profile_embedding: list[float] | None = Field(default_factory=list, exclude=True, description="An embedding vector for the statement profile, which can be derived from the statements and relationships associated with the statement. This can be used for statement linking or clustering based on profile similarity.")
+        name_embedding: Vector | None = Field(default_factory=empty_vector, exclude=True, description="An embedding vector for the statement name. This can be used for statement linking or clustering based on name similarity.")
+        profile_embedding: Vector | None = Field(default_factory=empty_vector, exclude=True, description="An embedding vector for the statement profile, which can be derived from the statements and relationships associated with the statement. This can be used for statement linking or clustering based on profile similarity.")
 
         attributes: dict[str, str] = Field(default_factory=dict, exclude=True, description="A dictionary of additional attributes.")
         
@@ -41,7 +43,22 @@ class Statement(BaseModel):
                 The embedding function should take a string input and return a list of floats representing the embedding vector.
                 """
                 if self.subject or self.predicate or self.object_:
-                        self.name_embedding = embed_document(cfg=cfg, contents=self.name_string())[0]
+                        self.name_embedding = Vector(embed_document(cfg=cfg, contents=self.name_string())[0])
                 if self.subject or self.predicate or self.object_ or self.modality or self.sentence or self.explanation:
-                        self.profile_embedding = embed_document(cfg=cfg, contents=self.profile_string())[0]
-                return self
\ No newline at end of file
+                        self.profile_embedding = Vector(embed_document(cfg=cfg, contents=self.profile_string())[0])
+                return self
+
+        async def aembed(self, cfg: Settings) -> Self:
+                """
+                Asynchronous version of `embed`. The name and profile strings are queued on the embedding dispatcher,
+                so concurrent callers share batched embedding requests.
+                """
+                name_task = aembed_document(cfg, self.name_string()) if self.subject or self.predicate or self.object_ else None
+                profile_task = aembed_document(cfg, self.profile_string()) if self.subject or self.predicate or self.object_ or self.modality or self.sentence or self.explanation else None
+                tasks = [task for task in (name_task, profile_task) if task is not None]
+                results = iter(await asyncio.gather(*tasks))
+                if name_task is not None:
+                        self.name_embedding = Vector(next(results)[0])
+                if profile_task is not None:
+                        self.profile_embedding = Vector(next(results)[0])
+                return self
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+def test_vector_index_finds_nearest_vectors():
+    from neuro_noir.core.ann import VectorIndex
+    index = VectorIndex()
+    index.add(["a", "b", "c"], [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]], ["A", "B", "C"])
+
+    assert [item for item, _ in index.search([1.0, 0.1], k=2)] == ["A", "C"]
+    index.add(["a"], [[0.0, -1.0]], ["A2"])
+    index.remove(["c", "missing"])
+    assert len(index) == 2
+    assert [item for item, _ in index.search([1.0, 0.1], k=2)] == ["B", "A2"]
+    assert index.search_batch([], k=2) == []
+
+
+def test_vector_index_ivf_recall():
+    from neuro_noir.core.ann import VectorIndex
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(20, 32))
+    vectors = centers[rng.integers(0, 20, 4000)] + 0.3 * rng.normal(size=(4000, 32))
+    queries = centers[rng.integers(0, 20, 50)] + 0.3 * rng.normal(size=(50, 32))
+    index = VectorIndex(ivf_threshold=1000, probes=8)
+    index.add(list(range(4000)), vectors, list(range(4000)))
+
+    approximate = index.search_batch(queries, k=10)
+    exact = index.search_batch(queries, k=10, exact=True)
+    recall = np.mean([len({i for i, _ in a} & {i for i, _ in e}) / 10 for a, e in zip(approximate, exact)])
+    assert index._centroids is not None
+    assert recall >= 0.9
+
+
+class FakeMirrorSession:
+    def __init__(self, records):
+        self.records = records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, params=None):
+        label = query.split(":", 1)[1].split(")", 1)[0]
+        return iter([{"node": node} for node in self.records.get(label, [])])
+
+
+class FakeMirrorDriver:
+    def __init__(self, records):
+        self.records = records
+
+    def session(self):
+        return FakeMirrorSession(self.records)
+
+
+def test_graph_mirror_loads_syncs_and_removes_documents():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import statements
+    from neuro_noir.graph.mirror import GraphMirror
+    from neuro_noir.models.entity import Entity
+    from neuro_noir.models.statement import Statement
+    driver = FakeMirrorDriver({
+        "Chunk": [{"chunk_id": "doc_1", "document_id": "doc", "index": 1, "content": "Holmes", "embedding": [1.0, 0.0]}],
+        "Statement": [{"statement_id": 1, "document_id": "doc", "subject": "Holmes", "predicate": "plays", "object": "violin", "name_embedding": [1.0, 0.0], "attribute_keys": [], "attribute_values": []}],
+        "Entity": [{"entity_id": 7, "canonical_name": "Holmes", "aliases": [], "type": "Person", "description": "", "explanation": "", "name_embedding": [1.0, 0.0], "subject_statement_ids": [1, 2], "object_statement_ids": []}],
+    })
+    mirror = GraphMirror(Settings(ANN_MIRROR_ENABLED=True))
+
+    assert mirror.load(driver) == {"chunk_embedding_vx": 1, "statement_name_embedding_vx": 1, "entity_name_embedding_vx": 1}
+    [(chunk, score)] = mirror.search("chunk_embedding_vx", [1.0, 0.0], 5)
+    assert chunk.content == "Holmes" and len(chunk.embedding) == 0 and score > 0.99
+    [(_, score)] = mirror.search("chunk_embedding_vx", [-1.0, 0.0], 5)
+    assert abs(score) < 1e-6
+    [(_, score)] = mirror.search("chunk_embedding_vx", [0.0, 1.0], 5)
+    assert abs(score - 0.5) < 1e-6
+
+    stored = Statement(id=2, document_id="other", subject="Watson", predicate="writes", object="notes", name_embedding=[0.0, 1.0])
+    failed = Statement(id=3, document_id="other", subject="Lestrade", predicate="arrests", object="nobody", name_embedding=[0.0, 1.0])
+    mirror.sync(statements.store_all, [stored, failed], [(failed, RuntimeError("boom"))])
+    assert [s.id for s, _ in mirror.search("statement_name_embedding_vx", [0.0, 1.0], 5)] == [2, 1]
+
+    [(_, mirrored)] = mirror.indexes["entity_name_embedding_vx"].items()
+    mirror.update("entity_name_embedding_vx", [Entity(id=8, document_id="doc", name="Mrs. Hudson", name_embedding=[0.0, 1.0])])
+    mirror.remove_document("doc")
+    assert mirrored.subject_statement_ids == [1, 2]
+    assert len(mirror.indexes["chunk_embedding_vx"]) == 0
+    assert [s.id for s, _ in mirror.search("statement_name_embedding_vx", [0.0, 1.0], 5)] == [2]
+    [(entity, _)] = mirror.search("entity_name_embedding_vx", [1.0, 0.0], 5)
+    assert entity.subject_statement_ids == [2]
+
+
+def test_graph_mirror_recall_against_graph_index(monkeypatch):
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import chunks
+    from neuro_noir.graph.mirror import GraphMirror
+    from neuro_noir.models.chunk import Chunk
+    mirror = GraphMirror(Settings(ANN_MIRROR_ENABLED=True))
+    models = [Chunk(index=i, document_id="doc", content=str(i), embedding=[1.0, float(i)]) for i in range(4)]
+    mirror.update("chunk_embedding_vx", models)
+    # The graph index returns chunks 0 and 2 for the first query, and chunk 3 for the second
+    graph_hits = [[(models[0], 1.0), (models[2], 0.9)], [(models[3], 1.0)]]
+    monkeypatch.setattr(chunks, "search_batch", lambda driver, embeddings, n, cfg=None: graph_hits)
+
+    recall = mirror.recall_at_k(object(), "chunk_embedding_vx", [[1.0, 0.0], [1.0, 3.0]], k=2)
+    assert recall == (0.5 + 1.0) / 2
+
+
+def test_vector_index_replaces_items_and_keeps_vectors():
+    from neuro_noir.core.ann import VectorIndex
+    index = VectorIndex()
+    index.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], ["first", "second"])
+    index.replace_items({"a": "changed", "unknown": "ignored"})
+    assert index.search([1.0, 0.1], 2)[0][0] == "changed"
+    assert len(index) == 2 and "unknown" not in index
@@ -0,0 +1,31 @@
+def test_hashing_backend_is_deterministic_and_normalized():
+    import numpy as np
+    from neuro_noir.core.backends import get_backend
+    from neuro_noir.core.config import Settings
+    backend = get_backend(Settings(EMBEDDING_BACKEND="hashing"))
+    first, second = backend.embed_document(["Holmes lit his pipe.", "Holmes lit his pipe."])
+    assert len(first) == 1536
+    assert first == second
+    assert abs(np.linalg.norm(first) - 1.0) < 1e-5
+
+def test_hashing_backend_similar_texts_score_higher():
+    import numpy as np
+    from neuro_noir.core.backends import get_backend
+    from neuro_noir.core.config import Settings
+    backend = get_backend(Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_DIMENSIONS=256))
+    query, related, unrelated = backend.embed_query(["the retired colourman", "Josiah Amberley, the retired colourman", "a bicycle in the fog"])
+    assert np.dot(query, related) > np.dot(query, unrelated)
+
+def test_unknown_backend_is_rejected():
+    import pytest
+    from neuro_noir.core.backends import get_backend
+    from neuro_noir.core.config import Settings
+    with pytest.raises(ValueError):
+        get_backend(Settings(EMBEDDING_BACKEND="carrier-pigeon"))
+
+def test_embed_uses_selected_backend(tmp_path):
+    from neuro_noir.core.config import Settings
+    from neuro_noir.core.lm import embed_document, embed_query
+    cfg = Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_CACHE_PATH=str(tmp_path / "embeddings.sqlite"))
+    assert len(embed_document(cfg, ["Watson", "Lestrade"])) == 2
+    assert len(embed_query(cfg, "Watson")[0]) == 1536
@@ -0,0 +1,21 @@
+def test_plan_batches_respects_item_and_size_limits():
+    from neuro_noir.core.batching import plan_batches
+    batches = plan_batches([10, 10, 10, 50, 10, 10, 10], max_items=3, max_size=40)
+    assert batches == [range(0, 3), range(3, 4), range(4, 7)]
+
+def test_plan_batches_puts_oversized_item_in_own_batch():
+    from neuro_noir.core.batching import plan_batches
+    assert plan_batches([5, 100, 5], max_items=10, max_size=20) == [range(0, 1), range(1, 2), range(2, 3)]
+    assert plan_batches([], max_items=10, max_size=20) == []
+
+def test_map_batches_keeps_input_order():
+    from neuro_noir.core.batching import map_batches
+    items = [f"text-{i}" for i in range(25)]
+    calls = []
+
+    def upper(batch):
+        calls.append(len(batch))
+        return [item.upper() for item in batch]
+
+    assert map_batches(upper, items, max_items=4, max_size=1000, max_workers=3) == [item.upper() for item in items]
+    assert sorted(calls) == [1, 4, 4, 4, 4, 4, 4]
@@ -0,0 +1,113 @@
+"""
+Throughput benchmarks for the embedding layer, run against the offline hashing backend so they
+measure our own overhead (batching, caching, model plumbing, serialization) and not the provider.
+
+The benchmarks are skipped unless NEURO_NOIR_BENCHMARK=1 is set, so the normal test run stays quick
+and quiet. Results are printed as JSON at the end of the session (run with `-s` to see them), and
+written to the file named by the NEURO_NOIR_BENCHMARK_JSON environment variable if it is set:
+
+    NEURO_NOIR_BENCHMARK=1 pytest -s tests/test_benchmark_embedding.py
+"""
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+pytestmark = pytest.mark.skipif(os.environ.get("NEURO_NOIR_BENCHMARK") != "1", reason="set NEURO_NOIR_BENCHMARK=1 to run the benchmarks")
+
+TEXTS = [f"Holmes examined clue number {i} while Watson took notes on the case." for i in range(200)]
+RESULTS: dict[str, dict] = {}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def report():
+    yield
+    output = json.dumps(RESULTS, indent=2, sort_keys=True)
+    print(output)
+    path = os.environ.get("NEURO_NOIR_BENCHMARK_JSON")
+    if path:
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(output)
+
+
+@pytest.fixture
+def cfg():
+    from neuro_noir.core.config import Settings
+    return Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_CACHE_ENABLED=False)
+
+
+def measure(name: str, func, calls: int, vectors_per_call: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - start
+    RESULTS[name] = {
+        "calls": calls,
+        "vectors": calls * vectors_per_call,
+        "seconds": elapsed,
+        "calls_per_sec": calls / elapsed,
+        "vectors_per_sec": calls * vectors_per_call / elapsed,
+    }
+    return RESULTS[name]
+
+
+def test_benchmark_embed_document(cfg):
+    from neuro_noir.core.lm import embed_document
+    result = measure("embed_document", lambda: embed_document(cfg, TEXTS), calls=5, vectors_per_call=len(TEXTS))
+    assert result["vectors"] == 1000
+
+
+def test_benchmark_embed_document_cached(cfg, tmp_path):
+    from neuro_noir.core.lm import embed_document
+    cached = cfg.model_copy(update={"EMBEDDING_CACHE_ENABLED": True, "EMBEDDING_CACHE_PATH": str(tmp_path / "embeddings.sqlite")})
+    embed_document(cached, TEXTS)
+    result = measure("embed_document_cached", lambda: embed_document(cached, TEXTS), calls=5, vectors_per_call=len(TEXTS))
+    assert result["vectors"] == 1000
+
+
+def test_benchmark_chunk_embed(cfg):
+    from neuro_noir.models.chunk import Chunk
+    chunks = [Chunk(index=i, document_id="benchmark", content=text) for i, text in enumerate(TEXTS[:50])]
+    result = measure("Chunk.embed", lambda: [chunk.embed(cfg) for chunk in chunks], calls=2, vectors_per_call=len(chunks))
+    assert all(len(chunk.embedding) == 1536 for chunk in chunks)
+    assert result["vectors"] == 100
+
+
+def test_benchmark_extract_statements_embedding_phase(cfg, monkeypatch):
+    from neuro_noir.models import chunk as chunk_module
+    statements = [
+        {"subject": "Holmes", "predicate": "examine", "object": f"clue {i % 10}", "modality": ["assertion"], "sentence": TEXTS[i], "explanation": "Holmes examines a clue."}
+        for i in range(40)
+    ]
+    monkeypatch.setattr(chunk_module, "extractor", lambda text: SimpleNamespace(statements=statements))
+
+    def extract():
+        chunk = chunk_module.Chunk(index=1, document_id="benchmark", content=" ".join(TEXTS[:5]))
+        chunk.extract_statements(cfg)
+        return chunk
+
+    result = measure("Chunk.extract_statements", extract, calls=5, vectors_per_call=2 * len(statements))
+    assert all(len(s.name_embedding) == 1536 for s in extract().statements)
+    assert result["vectors"] == 400
+
+
+def test_benchmark_application_embed_chunks(cfg):
+    from neuro_noir.core.app import Application
+    from neuro_noir.models.chunk import Chunk
+    app = Application(cfg, load_data=False)
+    chunks = [Chunk(index=i, document_id="benchmark", content=text) for i, text in enumerate(TEXTS)]
+    result = measure("Application.embed_chunks", lambda: app.embed_chunks(chunks), calls=3, vectors_per_call=len(chunks))
+    assert result["vectors"] == 600
+
+
+def test_benchmark_vector_serialization(cfg):
+    from neuro_noir.core.lm import embed_document
+    from neuro_noir.core.vectors import Vector, to_list
+    vectors = [Vector(v) for v in embed_document(cfg, TEXTS)]
+    measure("serialize.to_list", lambda: [to_list(v) for v in vectors], calls=5, vectors_per_call=len(vectors))
+    result = measure("serialize.json", lambda: json.dumps([to_list(v) for v in vectors]), calls=5, vectors_per_call=len(vectors))
+    RESULTS["serialize.json"]["bytes_per_vector"] = len(json.dumps(to_list(vectors[0])))
+    assert result["vectors"] == 1000
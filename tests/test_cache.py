@@ -0,0 +1,74 @@
+def test_cache_roundtrip(tmp_path):
+    from neuro_noir.core.cache import EmbeddingCache
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite"), max_entries=10)
+    key = cache.key("model", "RETRIEVAL_DOCUMENT", 3, "Sherlock Holmes")
+    assert cache.get_many([key]) == [None]
+    cache.put_many([(key, [0.5, -0.25, 1.0])])
+    assert cache.get_many([key]) == [[0.5, -0.25, 1.0]]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_cache_key_depends_on_task_type_and_dimensions():
+    from neuro_noir.core.cache import EmbeddingCache
+    query = EmbeddingCache.key("model", "RETRIEVAL_QUERY", 1536, "Watson")
+    document = EmbeddingCache.key("model", "RETRIEVAL_DOCUMENT", 1536, "Watson")
+    smaller = EmbeddingCache.key("model", "RETRIEVAL_QUERY", 256, "Watson")
+    assert len({query, document, smaller}) == 3
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    from neuro_noir.core.cache import EmbeddingCache
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite"), max_entries=2)
+    cache.put_many([("a", [1.0])])
+    cache.put_many([("b", [2.0])])
+    cache.get_many(["a"])
+    cache.put_many([("c", [3.0])])
+    assert cache.get_many(["a", "b", "c"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["evictions"] == 1
+
+def test_embed_only_sends_missing_texts(tmp_path, monkeypatch):
+    from neuro_noir.core import lm
+    from neuro_noir.core.config import Settings
+    cfg = Settings(EMBEDDING_CACHE_PATH=str(tmp_path / "embeddings.sqlite"))
+    sent = []
+
+    def fake_request(cfg, contents, task_type):
+        sent.append(list(contents))
+        return [[float(len(text))] for text in contents]
+
+    monkeypatch.setattr(lm, "embed_request", fake_request)
+    assert lm.embed_document(cfg, ["Holmes", "Watson"]) == [[6.0], [6.0]]
+    assert lm.embed_document(cfg, ["Watson", "Lestrade", "Lestrade"]) == [[6.0], [8.0], [8.0]]
+    assert sent == [["Holmes", "Watson"], ["Lestrade"]]
+
+
+def test_search_cache_is_invalidated_by_graph_writes(monkeypatch):
+    from neuro_noir.core.app import Application
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import chunks
+    from neuro_noir.graph.writes import bump_generation
+    calls = []
+    monkeypatch.setattr(chunks, "search", lambda driver, embedding, n, cfg=None, include_embeddings=False: calls.append(n) or [("chunk", 0.9)])
+    app = Application(Settings(SEARCH_CACHE_MAX_ENTRIES=2, ANN_MIRROR_ENABLED=False), load_data=False)
+    app._driver = object()
+
+    assert app.find_chunk([0.1, 0.2], top_k=3) == [("chunk", 0.9)]
+    assert app.find_chunk([0.1, 0.2], top_k=3) == [("chunk", 0.9)]
+    assert calls == [3]
+    app.find_chunk([0.1, 0.2], top_k=4)
+    assert calls == [3, 4]
+
+    bump_generation()
+    app.find_chunk([0.1, 0.2], top_k=3)
+    assert calls == [3, 4, 3]
+    assert app.search_cache.stats()["hits"] == 1
+
+
+def test_search_cache_evicts_least_recently_used():
+    from neuro_noir.core.cache import SearchCache
+    cache = SearchCache(max_entries=2)
+    cache.get("a", 0)
+    for key in ("a", "b", "c"):
+        cache.put(key, 0, [key])
+    assert cache.get("a", 0) is None
+    assert cache.get("c", 0) == ["c"]
+    assert cache.get("c", 1) is None
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+
+def test_application_owns_one_pooled_driver():
+    from neuro_noir.core.app import Application
+    from neuro_noir.core.config import Settings
+    app = Application(Settings(NEO4J_MAX_CONNECTION_POOL_SIZE=7, NEO4J_CONNECTION_ACQUISITION_TIMEOUT=5.0), load_data=False)
+    with app:
+        driver = app.driver
+        assert app.driver is driver
+        assert driver._pool.pool_config.max_connection_pool_size == 7
+        assert driver._pool.workspace_config.connection_acquisition_timeout == 5.0
+    assert app._driver is None
+
+
+class FakeResult:
+    def __init__(self, record=None):
+        self.record = record
+
+    def single(self):
+        return self.record
+
+    def consume(self):
+        return SimpleNamespace(counters=SimpleNamespace(nodes_deleted=3))
+
+
+class FakeSchemaDriver:
+    def __init__(self):
+        self.version = None
+        self.queries = []
+        self.vector_indexes = {}
+
+    def session(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, params=None):
+        from neuro_noir.graph.vectors import vector_index_target
+        self.queries.append(query)
+        if "MATCH (v:SchemaVersion" in query:
+            return FakeResult(self.version)
+        if "MERGE (v:SchemaVersion" in query:
+            self.version = {"version": params["version"], "statements": params["statements"]}
+        if query == "RETURN 1 AS test":
+            return FakeResult({"test": 1})
+        if "SHOW VECTOR INDEXES" in query:
+            return [{"name": name, "label": label, "property": property} for name, (label, property) in self.vector_indexes.items()]
+        if query.startswith("DROP INDEX"):
+            self.vector_indexes.pop(query.split()[2], None)
+        target = vector_index_target(query)
+        if target is not None and not any(on == target[1:] for on in self.vector_indexes.values()):
+            self.vector_indexes[target[0]] = target[1:]
+        return FakeResult()
+
+    def close(self):
+        raise AssertionError("a driver passed in must not be closed")
+
+
+def test_install_schema_applies_only_missing_statements():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.core.db import install_neo4j_schema, schema_statements
+    driver = FakeSchemaDriver()
+    cfg = Settings()
+    assert install_neo4j_schema(cfg, driver=driver) == len(schema_statements(cfg))
+    assert any("db.awaitIndexes" in query for query in driver.queries)
+
+    driver.queries = []
+    assert install_neo4j_schema(cfg, driver=driver) == 0
+    assert len(driver.queries) == 1
+
+    assert install_neo4j_schema(Settings(VECTOR_INDEX_MODE="int8"), driver=driver) == 7
+    assert "DROP INDEX chunk_embedding_vx IF EXISTS" in driver.queries
+    assert "chunk_embedding_vx_int8" in driver.vector_indexes and "chunk_embedding_vx" not in driver.vector_indexes
+
+
+def test_install_schema_replaces_the_vector_indexes_of_another_mode():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.core.db import install_neo4j_schema
+    driver = FakeSchemaDriver()
+    install_neo4j_schema(Settings(VECTOR_INDEX_MODE="truncated", VECTOR_INDEX_DIMENSIONS=256), driver=driver)
+    assert install_neo4j_schema(Settings(VECTOR_INDEX_MODE="truncated", VECTOR_INDEX_DIMENSIONS=512), driver=driver) == 7
+    assert "chunk_embedding_vx_512" in driver.vector_indexes and "chunk_embedding_vx_256" not in driver.vector_indexes
+
+    install_neo4j_schema(Settings(VECTOR_INDEX_MODE="int8"), driver=driver)
+    assert install_neo4j_schema(Settings(), driver=driver) == 7
+    assert "chunk_embedding_vx" in driver.vector_indexes and not any(name.endswith("_int8") for name in driver.vector_indexes)
+
+
+def test_delete_db_uses_the_given_driver(monkeypatch):
+    from neuro_noir.core import db
+    from neuro_noir.core.config import Settings
+    def connect_neo4j(*args, **kwargs):
+        raise AssertionError("connected a new driver")
+    monkeypatch.setattr(db, "connect_neo4j", connect_neo4j)
+    driver = FakeSchemaDriver()
+    ok, message, _ = db.delete_db(Settings(), driver=driver)
+    assert ok, message
+    assert driver.queries[0] == "RETURN 1 AS test"
+    assert any("DETACH DELETE" in query for query in driver.queries)
+    assert any("MERGE (v:SchemaVersion" in query for query in driver.queries)
@@ -0,0 +1,49 @@
+import asyncio
+
+
+def test_dispatcher_batches_concurrent_requests():
+    from neuro_noir.core.dispatcher import EmbeddingDispatcher
+    calls = []
+
+    def fake_embed(texts, task_type):
+        calls.append((list(texts), task_type))
+        return [[float(len(text))] for text in texts]
+
+    async def run():
+        dispatcher = EmbeddingDispatcher(fake_embed, max_batch=3, max_delay=0.01)
+        results = await asyncio.gather(*[dispatcher.embed(text, "RETRIEVAL_QUERY") for text in ["a", "bb", "ccc", "dddd"]])
+        return results, dispatcher.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == [[1.0], [2.0], [3.0], [4.0]]
+    assert calls == [(["a", "bb", "ccc"], "RETRIEVAL_QUERY"), (["dddd"], "RETRIEVAL_QUERY")]
+    assert stats == {"requests": 4, "flushes": 2, "pending": 0}
+
+def test_dispatcher_propagates_errors_to_every_caller():
+    from neuro_noir.core.dispatcher import EmbeddingDispatcher
+
+    def failing_embed(texts, task_type):
+        raise RuntimeError("quota exceeded")
+
+    async def run():
+        dispatcher = EmbeddingDispatcher(failing_embed, max_batch=10, max_delay=0.001)
+        return await asyncio.gather(dispatcher.embed("a", "RETRIEVAL_QUERY"), dispatcher.embed("b", "RETRIEVAL_QUERY"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_embedding_dispatcher_is_shared_only_by_identical_embedding_settings():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.core.lm import embedding_dispatcher
+    cfg = Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_CACHE_ENABLED=False)
+
+    async def run():
+        same = embedding_dispatcher(cfg) is embedding_dispatcher(cfg.model_copy())
+        other_batch = embedding_dispatcher(cfg.model_copy(update={"EMBEDDING_BATCH_SIZE": 7}))
+        other_dispatch = embedding_dispatcher(cfg.model_copy(update={"EMBEDDING_DISPATCH_MAX_BATCH": 5}))
+        return same, other_batch is embedding_dispatcher(cfg), other_dispatch.max_batch
+
+    same, shared, max_batch = asyncio.run(run())
+    assert same and not shared
+    assert max_batch == 5
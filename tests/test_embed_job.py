@@ -0,0 +1,41 @@
+import json
+
+
+def write_statements(folder, idx, chunk, sentences):
+    with open(folder / f"statements-for-chunk-{idx}.json", "w", encoding="utf-8") as fp:
+        json.dump({"index": idx, "chunk": chunk, "statements": [{"sentence": s} for s in sentences]}, fp)
+
+
+def test_embedding_job_embeds_and_resumes(tmp_path):
+    from neuro_noir.core.config import Settings
+    from neuro_noir.llm.embed import EmbeddingJob, pending_files
+    cfg = Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_CACHE_PATH=str(tmp_path / "cache" / "embeddings.sqlite"))
+    folder = tmp_path / "doc"
+    folder.mkdir()
+    for idx in range(5):
+        write_statements(folder, idx, f"Chunk {idx} about Holmes.", [f"Holmes said {idx}.", "Watson listened."])
+
+    assert EmbeddingJob(cfg, folder, batch_size=4, workers=2).run()
+    assert pending_files(folder) == []
+    with open(folder / "statements-for-chunk-with-embedding-3.json", encoding="utf-8") as fp:
+        data = json.load(fp)
+    assert len(data["embedding"]) == 1536
+    assert all(len(st["embedding"]) == 1536 for st in data["statements"])
+
+    write_statements(folder, 5, "A new chunk.", [])
+    job = EmbeddingJob(cfg, folder, batch_size=4, workers=2)
+    assert job.run()
+    assert job.files_done == 1
+
+def test_embedding_job_reports_failed_files(tmp_path):
+    from neuro_noir.core.config import Settings
+    from neuro_noir.llm.embed import EmbeddingJob
+    cfg = Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_CACHE_ENABLED=False)
+    write_statements(tmp_path, 0, "Chunk.", ["Sentence."])
+    with open(tmp_path / "statements-for-chunk-1.json", "w", encoding="utf-8") as fp:
+        json.dump({"index": 7, "chunk": "Wrong index.", "statements": []}, fp)
+
+    job = EmbeddingJob(cfg, tmp_path, batch_size=1, workers=1)
+    assert not job.run()
+    assert [p.name for p in job.failed] == ["statements-for-chunk-1.json"]
+    assert (tmp_path / "statements-for-chunk-with-embedding-0.json").exists()
@@ -0,0 +1,48 @@
+def test_export_csv_writes_import_files(tmp_path):
+    import csv
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph.export import export_csv, import_command
+    from neuro_noir.models.chunk import Chunk
+    from neuro_noir.models.document import Document
+    from neuro_noir.models.entity import Entity
+    from neuro_noir.models.statement import Statement
+    cfg = Settings(VECTOR_INDEX_MODE="truncated", VECTOR_INDEX_DIMENSIONS=2)
+    document = Document(id="doc", title="A Study", content="...")
+    chunk = Chunk(index=1, document_id="doc", content="Holmes saw Watson,\nand smiled.", embedding=[0.1, 0.2, 0.3])
+    statement = Statement(id=7, document_id="doc", chunk_index=1, subject="Holmes", predicate="see", object="Watson", modality=["assertion"], name_embedding=[1.0, 0.0, 0.0], profile_embedding=[0.0, 1.0, 0.0])
+    statement.attributes = {"tense": "past", "confidence": 0.9, "page": 12, "negated": False, "lines": [3, 4]}
+    entity = Entity(id=3, name="Sherlock Holmes", aliases=["Holmes"], subject_statement_ids=[7, 99], name_embedding=[1.0, 0.0, 0.0], profile_embedding=[0.0, 0.0, 1.0])
+    entity.attributes = {"subject_statement_ids": [1, 2], "occupation": "detective"}
+
+    paths = export_csv(tmp_path, [document], [chunk], [statement], [entity], cfg)
+
+    with open(tmp_path / "chunks.csv", newline="") as fp:
+        header, row = list(csv.reader(fp))
+    assert header[:3] == [":ID(Chunk)", "chunk_id:string", "document_id:string"]
+    assert [round(float(x), 6) for x in dict(zip(header, row))["embedding_truncated:float[]"].split(";")] == [0.1, 0.2]
+    assert dict(zip(header, row))["content:string"] == "Holmes saw Watson,\nand smiled."
+    with open(tmp_path / "statements.csv", newline="") as fp:
+        header, row = list(csv.reader(fp))
+    assert dict(zip(header, row))["statement_id:long"] == "7"
+    assert dict(zip(header, row))["tense:string"] == "past"
+    assert dict(zip(header, row))["confidence:double"] == "0.9"
+    assert dict(zip(header, row))["page:long"] == "12"
+    assert dict(zip(header, row))["negated:boolean"] == "false"
+    assert dict(zip(header, row))["lines:long[]"] == "3;4"
+    with open(tmp_path / "entities.csv", newline="") as fp:
+        header, row = list(csv.reader(fp))
+    assert header.count("subject_statement_ids:long[]") == 1 and "occupation:string" in header
+    assert dict(zip(header, row))["subject_statement_ids:long[]"] == "7;99"
+    with open(tmp_path / "has_subject.csv", newline="") as fp:
+        assert list(csv.reader(fp)) == [[":START_ID(Statement)", ":END_ID(Entity)", ":TYPE"], ["7", "3", "HAS_SUBJECT"]]
+
+    command = import_command(paths)
+    assert command[:4] == ["neo4j-admin", "database", "import", "full"]
+    assert sum(arg.startswith("--nodes=") for arg in command) == 4
+    assert sum(arg.startswith("--relationships=") for arg in command) == 4
+
+
+def test_attribute_columns_widen_mixed_types():
+    from neuro_noir.graph.export import attribute_columns
+    rows = [{"attributes": {"score": 1, "label": "a", "mixed": 1}}, {"attributes": {"score": 0.5, "label": ["b"], "mixed": True}}]
+    assert attribute_columns(rows) == [("label", "string[]"), ("mixed", "string"), ("score", "double")]
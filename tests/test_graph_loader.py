@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+
+class FakeSession:
+    def __init__(self, fail_chunk=None):
+        self.rows = []
+        self.fail_chunk = fail_chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute_write(self, func, *args):
+        return func(self, *args)
+
+    def run(self, query, params):
+        if "ids" in params:
+            return []
+        if "rows" not in params:
+            indices = [row["index"] for row in self.rows if "content" in row and row["document_id"] == params["document_id"]]
+            return SimpleNamespace(single=lambda: {"indices": indices})
+        if self.fail_chunk and any(row.get("chunk_id") == self.fail_chunk for row in params["rows"]):
+            raise RuntimeError("bad chunk")
+        self.rows.extend(params["rows"])
+        return self
+
+    def consume(self):
+        return None
+
+
+class FakeDriver:
+    def __init__(self, fail_chunk=None):
+        self.fake_session = FakeSession(fail_chunk)
+
+    def session(self, **kwargs):
+        return self.fake_session
+
+
+def make_document(folder):
+    import json
+    folder.mkdir()
+    (folder / "chunks.json").write_text(json.dumps(["First chunk.", "Second chunk.", "Third chunk."]))
+    for idx in range(3):
+        statements = [{"subject": "Holmes", "predicate": "see", "object": f"clue {i}", "modality": "assertion", "sentence": f"Holmes saw clue {i}.", "embedding": [0.1, 0.2]} for i in range(2)]
+        (folder / f"statements-for-chunk-with-embedding-{idx}.json").write_text(json.dumps({"index": idx, "chunk": "...", "embedding": [0.3, 0.4], "statements": statements}))
+
+
+def test_loader_resumes_from_the_checkpoint(tmp_path):
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph.loader import BulkLoader, document_folders
+    make_document(tmp_path / "a-study")
+    cfg = Settings(NEO4J_WRITE_BATCH_SIZE=2)
+
+    failing = FakeDriver(fail_chunk="a-study_2")
+    assert not BulkLoader(cfg, failing, workers=2).run(document_folders(tmp_path))
+    assert {row["chunk_id"] for row in failing.fake_session.rows if "content" in row} == {"a-study_0", "a-study_1"}
+
+    failing.fake_session.fail_chunk = None
+    written = len(failing.fake_session.rows)
+    loader = BulkLoader(cfg, failing, workers=2)
+    assert loader.run(document_folders(tmp_path))
+    chunk_rows = [row for row in failing.fake_session.rows[written:] if "content" in row]
+    statement_rows = [row for row in failing.fake_session.rows[written:] if "statement_id" in row]
+    assert [row["chunk_id"] for row in chunk_rows] == ["a-study_2"]
+    assert len(statement_rows) == 2 and statement_rows[0]["modality"] == ["assertion"]
+    assert loader.nodes == 3
+
+    written = len(failing.fake_session.rows)
+    assert BulkLoader(cfg, failing, workers=2).run(document_folders(tmp_path))
+    assert len(failing.fake_session.rows) == written
+
+
+def test_loader_reloads_chunks_missing_from_the_graph(tmp_path):
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph.loader import BulkLoader, document_folders
+    make_document(tmp_path / "a-study")
+    cfg = Settings(NEO4J_WRITE_BATCH_SIZE=2)
+    assert BulkLoader(cfg, FakeDriver(), workers=2).run(document_folders(tmp_path))
+
+    cleared = FakeDriver()
+    assert BulkLoader(cfg, cleared, workers=2).run(document_folders(tmp_path))
+    assert [row["chunk_id"] for row in cleared.fake_session.rows if "content" in row] == ["a-study_0", "a-study_1", "a-study_2"]
@@ -0,0 +1,120 @@
+class FakeSearchSession:
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, params=None):
+        self.queries.append((query, params))
+        return iter(self.records)
+
+
+class FakeSearchDriver:
+    def __init__(self, records):
+        self.session_ = FakeSearchSession(records)
+
+    def session(self):
+        return self.session_
+
+
+def test_search_returns_metadata_without_embeddings():
+    from neuro_noir.graph import chunks
+    record = {"c": {"chunk_id": "doc_0", "document_id": "doc", "index": 0, "content": "Holmes"}, "score": 0.9}
+    driver = FakeSearchDriver([record])
+
+    [(chunk, score)] = chunks.search(driver, [0.1, 0.2], 1)
+
+    query, _ = driver.session_.queries[0]
+    assert "node {.chunk_id, .document_id, .index, .content}" in query
+    assert "embedding" not in query.split("RETURN")[1]
+    assert chunk.content == "Holmes" and len(chunk.embedding) == 0 and score == 0.9
+
+    chunks.search(driver, [0.1, 0.2], 1, include_embeddings=True)
+    query, _ = driver.session_.queries[1]
+    assert ".embedding}" in query
+
+
+def test_search_expands_projected_attributes():
+    from neuro_noir.graph import entities
+    record = {"n": {
+        "entity_id": 7, "canonical_name": "Sherlock Holmes", "aliases": ["Holmes"], "type": "Person",
+        "category": None, "description": "A detective", "explanation": "",
+        "subject_statement_ids": [1], "object_statement_ids": [],
+        "attribute_keys": ["occupation"], "attribute_values": ["detective"],
+    }, "score": 0.8}
+    driver = FakeSearchDriver([record])
+
+    [(entity, _)] = entities.search(driver, [0.1, 0.2], 1)
+
+    query, _ = driver.session_.queries[0]
+    assert "attribute_values: [key IN coalesce(node.attribute_keys, []) | node[key]]" in query
+    assert "name_embedding" not in query.split("RETURN")[1]
+    assert entity.attributes == {"occupation": "detective"}
+    assert entity.category == "" and len(entity.name_embedding) == 0
+
+
+def test_hybrid_search_fuses_both_indexes_in_one_query():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import statements
+    from neuro_noir.graph.hybrid import fulltext_query
+    cfg = Settings(HYBRID_RRF_K=10, HYBRID_FULLTEXT_WEIGHT=0.5)
+    record = {"s": {"statement_id": 3, "subject": "Holmes", "predicate": "plays", "object": "violin", "attribute_keys": [], "attribute_values": []}, "score": 0.15}
+    driver = FakeSearchDriver([record])
+
+    [(statement, score)] = statements.hybrid_search(driver, "Holmes (violin)", [0.1, 0.2], 5, cfg=cfg)
+
+    [(query, params)] = driver.session_.queries
+    assert "db.index.vector.queryNodes" in query and "db.index.fulltext.queryNodes" in query
+    assert "RETURN node {.statement_id" in query and " AS s, score" in query
+    assert params["fulltext_index"] == "statement_text_ft"
+    assert params["text"] == fulltext_query("Holmes (violin)") == "Holmes \\(violin\\)"
+    assert (params["rrf_k"], params["vector_weight"], params["fulltext_weight"]) == (10, 1.0, 0.5)
+    assert params["candidates"] == 5 * cfg.HYBRID_CANDIDATE_FACTOR and params["k"] == 5
+    assert statement.id == 3 and score == 0.15
+
+
+def test_fulltext_query_keeps_operator_words_as_terms():
+    from neuro_noir.graph.hybrid import fulltext_query
+    assert fulltext_query("Holmes AND Watson OR NOT Lestrade") == "Holmes and Watson or not Lestrade"
+    assert fulltext_query("NOT") == "not"
+    assert fulltext_query("ANDERSON NOTES") == "ANDERSON NOTES"
+    assert fulltext_query("tea && (milk)") == "tea \\&\\& \\(milk\\)"
+
+
+def test_search_batch_runs_all_queries_in_one_round_trip():
+    from neuro_noir.graph import chunks
+    records = [
+        {"i": 0, "c": [{"chunk_id": "doc_0", "document_id": "doc", "index": 0, "content": "Holmes"}], "scores": [0.9]},
+        {"i": 2, "c": [], "scores": []},
+    ]
+    driver = FakeSearchDriver(records)
+
+    results = chunks.search_batch(driver, [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]], 2)
+
+    [(query, params)] = driver.session_.queries
+    assert "UNWIND range(0, size($queries) - 1) AS i" in query
+    assert [q["embedding"] for q in params["queries"]] == [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]
+    assert params["k"] == 2 and params["rerank"] is False
+    assert [[(chunk.content, score) for chunk, score in hits] for hits in results] == [[("Holmes", 0.9)], [], []]
+
+
+def test_find_entities_only_searches_uncached_queries(monkeypatch):
+    from neuro_noir.core.app import Application
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import entities
+    batches = []
+    def search_batch(driver, embeddings, n, cfg=None, include_embeddings=False):
+        batches.append(embeddings)
+        return [[(f"entity-{embedding[0]}", 1.0)] for embedding in embeddings]
+    monkeypatch.setattr(entities, "search_batch", search_batch)
+    app = Application(Settings(SEARCH_CACHE_MAX_ENTRIES=8, ANN_MIRROR_ENABLED=False), load_data=False)
+    app._driver = object()
+
+    assert app.find_entities([[1.0], [2.0]]) == [[("entity-1.0", 1.0)], [("entity-2.0", 1.0)]]
+    assert app.find_entities([[2.0], [3.0]]) == [[("entity-2.0", 1.0)], [("entity-3.0", 1.0)]]
+    assert batches == [[[1.0], [2.0]], [[3.0]]]
@@ -0,0 +1,29 @@
+def test_full_mode_keeps_original_index():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import chunks
+    schema = chunks.schema(Settings())
+    assert "CREATE VECTOR INDEX chunk_embedding_vx IF NOT EXISTS" in schema
+    assert "ON (n.embedding)" in schema
+    assert "`vector.dimensions`: 1536" in schema
+
+def test_truncated_mode_indexes_leading_dimensions():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import entities
+    from neuro_noir.graph.vectors import search_params
+    cfg = Settings(VECTOR_INDEX_MODE="truncated", VECTOR_INDEX_DIMENSIONS=256, VECTOR_RERANK_FACTOR=4)
+    schema = entities.schema(cfg)
+    assert "CREATE VECTOR INDEX entity_name_embedding_vx_256 IF NOT EXISTS" in schema
+    assert "ON (n.profile_embedding_truncated)" in schema
+    assert "`vector.dimensions`: 256" in schema
+    params = search_params("entity_name_embedding_vx", "name_embedding", [0.1] * 1536, 10, cfg)
+    assert params["index_name"] == "entity_name_embedding_vx_256"
+    assert len(params["query_embedding"]) == 256
+    assert len(params["embedding"]) == 1536
+    assert params["candidates"] == 40
+
+def test_int8_mode_enables_quantization():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import statements
+    schema = statements.schema(Settings(VECTOR_INDEX_MODE="int8"))
+    assert "CREATE VECTOR INDEX statement_name_embedding_vx_int8 IF NOT EXISTS" in schema
+    assert "`vector.quantization.enabled`: true" in schema
@@ -0,0 +1,43 @@
+def test_writer_coalesces_queued_writes_in_order():
+    import threading
+    from neuro_noir.graph.writer import GraphWriter
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def store_statements(driver, items, cfg):
+        started.set()
+        release.wait(5)
+        calls.append(("statements", list(items)))
+        return []
+
+    def store_entities(driver, items, cfg):
+        calls.append(("entities", list(items)))
+        return [(items[0], ValueError("bad entity"))]
+
+    writer = GraphWriter(driver=None, max_queue=8)
+    writer.submit(store_statements, [1])
+    started.wait(5)
+    writer.submit(store_statements, [2, 3])
+    writer.submit(store_statements, [4])
+    writer.submit(store_entities, ["a", "b"])
+    release.set()
+    failures = writer.flush()
+    assert calls == [("statements", [1]), ("statements", [2, 3, 4]), ("entities", ["a", "b"])]
+    assert [item for item, _ in failures] == ["a"]
+    assert writer.writes == 5
+    writer.close()
+    assert writer.flush() == []
+
+
+def test_writer_reports_exceptions_without_stopping():
+    from neuro_noir.graph.writer import GraphWriter
+
+    def broken(driver, items, cfg):
+        raise RuntimeError("connection lost")
+
+    with GraphWriter(driver=None) as writer:
+        writer.submit(broken, [1, 2])
+        failures = writer.flush()
+        assert [item for item, _ in failures] == [1, 2]
+        writer.submit(lambda driver, items, cfg: [], [3])
+        assert writer.flush() == []
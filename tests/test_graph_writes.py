@@ -0,0 +1,242 @@
+class FakeTx:
+    def __init__(self, session):
+        self.session = session
+
+    def run(self, query, params):
+        if any(row.get("fail") for row in params["rows"]):
+            raise RuntimeError("bad row")
+        self.session.written.append((query, params))
+        for label, key in (("Statement", "statement_id"), ("Entity", "entity_id")):
+            if f"MERGE (s:{label}" in query or f"MERGE (e:{label}" in query:
+                self.session.hashes.update(((label, row[key]), row.get("content_hash")) for row in params["rows"])
+        return self
+
+    def consume(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self):
+        self.written = []
+        self.transactions = 0
+        self.hashes = {}
+
+    def run(self, query, params):
+        label = "Statement" if "MATCH (n:Statement)" in query else "Entity"
+        return [{"id": id, "content_hash": self.hashes[(label, id)]} for id in params["ids"] if (label, id) in self.hashes]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute_write(self, func, *args):
+        self.transactions += 1
+        return func(FakeTx(self), *args)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.fake_session = FakeSession()
+
+    def session(self, **kwargs):
+        return self.fake_session
+
+
+def test_write_rows_batches_and_reports_failed_rows():
+    from neuro_noir.graph.writes import write_rows
+    driver = FakeDriver()
+    rows = [{"id": i, "fail": i == 3} for i in range(5)]
+    failed = write_rows(driver, "UNWIND $rows AS row RETURN row", rows, size=2, params={"x": 1})
+    assert [idx for idx, _ in failed] == [3]
+    written = [row["id"] for _, params in driver.fake_session.written for row in params["rows"]]
+    assert written == [0, 1, 2, 4]
+    assert all(params["x"] == 1 for _, params in driver.fake_session.written)
+
+
+def test_store_all_statements_uses_one_transaction_per_batch():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import statements
+    from neuro_noir.models.statement import Statement
+    driver = FakeDriver()
+    stmts = [Statement(id=i, document_id="doc", chunk_index=1, subject="Holmes", predicate="see", object="Watson") for i in range(5)]
+    failed = statements.store_all(driver, stmts, Settings(NEO4J_WRITE_BATCH_SIZE=2))
+    assert failed == []
+    assert driver.fake_session.transactions == 3
+    query, params = driver.fake_session.written[0]
+    assert query == statements.UPSERT_STATEMENTS
+    assert params["truncated_dimensions"] is None
+    assert params["rows"][0]["chunk_id"] == "doc_1"
+    assert "truncated_dimensions" not in params["rows"][0]
+
+
+def test_store_all_entities_is_a_constant_number_of_queries():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import entities
+    from neuro_noir.models.entity import Entity
+    driver = FakeDriver()
+    ents = [Entity(id=i, name=f"Entity {i}", subject_statement_ids=list(range(30)), object_statement_ids=[100 + i]) for i in range(3)]
+    failed = entities.store_all(driver, ents, Settings())
+    assert failed == []
+    assert driver.fake_session.transactions == 2
+    (upsert, upsert_params), (link, link_params) = driver.fake_session.written
+    assert upsert == entities.UPSERT_ENTITIES and len(upsert_params["rows"]) == 3
+    assert link == entities.LINK_ENTITIES and len(link_params["rows"]) == 93
+    assert {"entity_id": 0, "statement_id": 100, "role": "HAS_OBJECT"} in link_params["rows"]
+
+
+def test_store_all_chunks_and_documents_use_unwind_batches():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import chunks, documents
+    from neuro_noir.models.chunk import Chunk
+    from neuro_noir.models.document import Document
+    driver = FakeDriver()
+    documents.store(driver, Document(id="doc", title="Doc", content="..."))
+    failed = chunks.store_all(driver, [Chunk(index=i, document_id="doc", content=f"Chunk {i}") for i in range(250)], Settings(NEO4J_WRITE_BATCH_SIZE=100))
+    assert failed == []
+    assert driver.fake_session.transactions == 4
+    assert [len(params["rows"]) for _, params in driver.fake_session.written] == [1, 100, 100, 50]
+    assert driver.fake_session.written[1][0] == chunks.UPSERT_CHUNKS
+
+
+class FakeDeleteSession(FakeSession):
+    def run(self, query, params=None):
+        from types import SimpleNamespace
+        self.written.append((query, params))
+        record = {"entity_ids": [3], "statement_ids": [7, 8]}
+        return SimpleNamespace(single=lambda: record, consume=lambda: SimpleNamespace(counters=SimpleNamespace(nodes_deleted=2)))
+
+
+def test_delete_document_is_scoped_and_batched():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import documents
+    driver = FakeDriver()
+    driver.fake_session = FakeDeleteSession()
+    deleted = documents.delete(driver, "doc", Settings(NEO4J_DELETE_BATCH_SIZE=250))
+    assert deleted == {"Statement": 2, "Chunk": 2, "Document": 2, "Entity": 2}
+    queries = [query for query, _ in driver.fake_session.written[1:]]
+    assert all("IN TRANSACTIONS OF 250 ROWS" in query for query in queries)
+    assert "MATCH (n:Chunk {document_id: $document_id})" in queries[1]
+    assert "(r:Entity {document_id: $document_id})" in driver.fake_session.written[0][0]
+    assert driver.fake_session.written[-1][1] == {"entity_ids": [3], "statement_ids": [7, 8]}
+
+
+def test_unchanged_statements_and_entities_are_skipped():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import entities, statements
+    from neuro_noir.models.entity import Entity
+    from neuro_noir.models.statement import Statement
+    driver = FakeDriver()
+    cfg = Settings()
+    stmts = [Statement(id=i, document_id="doc", chunk_index=1, subject="Holmes", predicate="see", object="Watson") for i in range(3)]
+    ents = [Entity(id=1, name="Holmes", subject_statement_ids=[0, 1, 2])]
+    statements.store_all(driver, stmts, cfg)
+    entities.store_all(driver, ents, cfg)
+    written = len(driver.fake_session.written)
+
+    stmts[1].predicate = "follow"
+    statements.store_all(driver, stmts, cfg)
+    entities.store_all(driver, ents, cfg)
+    (statement_query, statement_params), (link_query, _) = driver.fake_session.written[written:]
+    assert statement_query == statements.UPSERT_STATEMENTS and [row["statement_id"] for row in statement_params["rows"]] == [1]
+    assert link_query == entities.LINK_ENTITIES
+
+    statements.store_all(driver, stmts, Settings(NEO4J_SKIP_UNCHANGED_WRITES=False))
+    assert len(driver.fake_session.written[-1][1]["rows"]) == 3
+
+
+def test_entity_links_are_retried_after_a_failed_link_write():
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import entities
+    from neuro_noir.models.entity import Entity
+
+    class LinkFailingTx(FakeTx):
+        def run(self, query, params):
+            if query == entities.LINK_ENTITIES and self.session.fail_links:
+                raise RuntimeError("link failed")
+            return super().run(query, params)
+
+    driver = FakeDriver()
+    driver.fake_session.fail_links = True
+    driver.fake_session.execute_write = lambda func, *args: func(LinkFailingTx(driver.fake_session), *args)
+    ents = [Entity(id=1, name="Holmes", subject_statement_ids=[1, 2])]
+    assert [entity.id for entity, _ in entities.store_all(driver, ents, Settings())] == [1, 1]
+
+    driver.fake_session.fail_links = False
+    assert entities.store_all(driver, ents, Settings()) == []
+    (query, params) = driver.fake_session.written[-1]
+    assert query == entities.LINK_ENTITIES and len(params["rows"]) == 2
+
+
+def test_store_raises_when_the_entity_write_fails():
+    import pytest
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import entities
+    from neuro_noir.models.entity import Entity
+
+    class FailingSession(FakeSession):
+        def execute_write(self, func, *args):
+            raise RuntimeError("database unavailable")
+
+    driver = FakeDriver()
+    driver.fake_session = FailingSession()
+    with pytest.raises(RuntimeError, match="database unavailable"):
+        entities.store(driver, Entity(id=1, name="Holmes", subject_statement_ids=[1]), Settings(NEO4J_SKIP_UNCHANGED_WRITES=False))
+
+
+def test_statement_and_entity_ids_are_unique_across_documents(monkeypatch):
+    from types import SimpleNamespace
+    from neuro_noir.core.config import Settings
+    from neuro_noir.models import chunk as chunk_module
+
+    statements = [{"subject": "Holmes", "predicate": "see", "object": f"clue {i}", "modality": ["assertion"], "sentence": f"Holmes saw clue {i}.", "explanation": ""} for i in range(2)]
+    entities = [{"name": "Holmes", "type": "Person", "subject_statement_ids": [1, 2, 99], "object_statement_ids": []}]
+    monkeypatch.setattr(chunk_module, "extractor", lambda text: SimpleNamespace(statements=statements))
+    monkeypatch.setattr(chunk_module, "resolver", lambda text, statements, categories: SimpleNamespace(entities=entities))
+    cfg = Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_CACHE_ENABLED=False)
+
+    chunks = [chunk_module.Chunk(index=0, document_id=document_id, content="Holmes saw the clues.") for document_id in ("first", "second")]
+    for chunk in chunks:
+        chunk.extract_statements(cfg)
+        chunk.resolve_entities(cfg, [])
+
+    statement_ids = [s.id for chunk in chunks for s in chunk.statements]
+    entity_ids = [e.id for chunk in chunks for e in chunk.entities]
+    assert len(set(statement_ids)) == 4
+    assert len(set(entity_ids)) == 2
+    for chunk in chunks:
+        assert chunk.entities[0].subject_statement_ids == [s.id for s in chunk.statements]
+
+
+def test_resolved_statement_ids_are_not_stored_as_attributes(monkeypatch):
+    from types import SimpleNamespace
+    from neuro_noir.core.config import Settings
+    from neuro_noir.graph import entities as entity_graph
+    from neuro_noir.models import chunk as chunk_module
+
+    statements = [{"subject": "Holmes", "predicate": "see", "object": "clue", "modality": ["assertion"], "sentence": "Holmes saw the clue.", "explanation": ""}]
+    entities = [{"name": "Holmes", "type": "Person", "occupation": "detective", "statement_ids": [1], "subject_statement_ids": [1], "object_statement_ids": []}]
+    monkeypatch.setattr(chunk_module, "extractor", lambda text: SimpleNamespace(statements=statements))
+    monkeypatch.setattr(chunk_module, "resolver", lambda text, statements, categories: SimpleNamespace(entities=entities))
+    cfg = Settings(EMBEDDING_BACKEND="hashing", EMBEDDING_CACHE_ENABLED=False)
+
+    chunk = chunk_module.Chunk(index=0, document_id="doc", content="Holmes saw the clue.")
+    chunk.extract_statements(cfg)
+    [entity] = chunk.resolve_entities(cfg, [])
+    row = entity_graph.params(entity)
+    assert row["document_id"] == "doc"
+    assert row["subject_statement_ids"] == [chunk.statements[0].id]
+    assert row["attributes"] == {"occupation": "detective"}
+
+
+def test_store_chunk_goes_through_store_all():
+    from neuro_noir.graph import chunks
+    from neuro_noir.graph.writes import write_generation
+    from neuro_noir.models.chunk import Chunk
+    driver = FakeDriver()
+    generation = write_generation()
+    chunks.store(driver, Chunk(index=1, document_id="doc", content="Holmes"))
+    [(query, params)] = driver.fake_session.written
+    assert query == chunks.UPSERT_CHUNKS and params["rows"][0]["chunk_id"] == "doc_1"
+    assert write_generation() > generation
@@ -0,0 +1,38 @@
+def test_plan_embeds_each_string_once(monkeypatch):
+    from neuro_noir.core import plan as plan_module
+    from neuro_noir.core.config import Settings
+    calls = []
+
+    def fake_embed_document(cfg, contents):
+        calls.append(list(contents))
+        return [[float(len(text))] for text in contents]
+
+    monkeypatch.setattr(plan_module, "embed_document", fake_embed_document)
+    plan = plan_module.EmbeddingPlan()
+    plan.add_all(["Holmes say Watson", "Holmes say Watson", "Watson follow Holmes"]).add("Holmes say Watson")
+    plan.run(Settings())
+    assert calls == [["Holmes say Watson", "Watson follow Holmes"]]
+    assert plan.get("Holmes say Watson") == [17.0]
+    assert len(plan) == 2
+
+def test_embed_names_and_profiles_fans_out_vectors(monkeypatch):
+    from neuro_noir.core import plan as plan_module
+    from neuro_noir.core.config import Settings
+    from neuro_noir.models.chunk import embed_names_and_profiles
+    from neuro_noir.models.statement import Statement
+    calls = []
+
+    def fake_embed_document(cfg, contents):
+        calls.append(list(contents))
+        return [[float(i)] for i, _ in enumerate(contents)]
+
+    monkeypatch.setattr(plan_module, "embed_document", fake_embed_document)
+    statements = [
+        Statement(subject="Holmes", predicate="say", object="Watson", sentence="Holmes said to Watson."),
+        Statement(subject="Holmes", predicate="say", object="Watson", sentence="Holmes said it again."),
+    ]
+    embed_names_and_profiles(Settings(), statements)
+    assert len(calls) == 1
+    assert len(calls[0]) == 3
+    assert statements[0].name_embedding == statements[1].name_embedding
+    assert statements[0].profile_embedding != statements[1].profile_embedding
@@ -0,0 +1,48 @@
+class Throttled(Exception):
+    code = 429
+
+
+def test_rate_limiter_retries_throttled_requests(monkeypatch):
+    from neuro_noir.core import ratelimit
+    monkeypatch.setattr(ratelimit.time, "sleep", lambda seconds: None)
+    limiter = ratelimit.RateLimiter(requests_per_minute=60, max_retries=3, base_delay=0.01, max_delay=0.1)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Throttled("429 RESOURCE_EXHAUSTED")
+        return "ok"
+
+    assert limiter.call(flaky, texts=5) == "ok"
+    stats = limiter.stats()
+    assert stats["throttled"] == 2
+    assert stats["retries"] == 2
+    assert stats["texts"] == 15
+
+def test_rate_limiter_gives_up_after_max_retries(monkeypatch):
+    import pytest
+    from neuro_noir.core import ratelimit
+    monkeypatch.setattr(ratelimit.time, "sleep", lambda seconds: None)
+    limiter = ratelimit.RateLimiter(max_retries=2, base_delay=0.01)
+
+    def throttled():
+        raise Throttled("429")
+
+    with pytest.raises(Throttled):
+        limiter.call(throttled)
+    assert limiter.stats()["failures"] == 1
+
+def test_rate_limiter_does_not_retry_other_errors():
+    import pytest
+    from neuro_noir.core.ratelimit import RateLimiter
+    limiter = RateLimiter(max_retries=5)
+    with pytest.raises(ValueError):
+        limiter.call(lambda: (_ for _ in ()).throw(ValueError("bad input")))
+    assert limiter.stats()["retries"] == 0
+
+def test_token_bucket_asks_to_wait_when_budget_is_spent():
+    from neuro_noir.core.ratelimit import TokenBucket
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert 0.9 < bucket.reserve(1) <= 1.0
@@ -0,0 +1,24 @@
+def test_vector_is_compact_float32():
+    from neuro_noir.core.vectors import Vector
+    vector = Vector([0.5] * 1536)
+    assert len(vector) == 1536
+    assert vector.numpy().dtype.name == "float32"
+    assert vector.numpy().nbytes == 1536 * 4
+    assert vector[0] == 0.5
+    assert vector == [0.5] * 1536
+    assert not Vector()
+
+def test_vector_fields_validate_and_serialize():
+    from pydantic import TypeAdapter
+    from neuro_noir.core.vectors import Vector, to_list
+    from neuro_noir.models.statement import Statement
+    statement = Statement(subject="Holmes", name_embedding=[0.25, 0.5], profile_embedding=None)
+    assert isinstance(statement.name_embedding, Vector)
+    assert TypeAdapter(Vector).dump_json(statement.name_embedding) == b"[0.25,0.5]"
+    assert to_list(statement.name_embedding) == [0.25, 0.5]
+    assert to_list(statement.profile_embedding) is None
+
+def test_vector_fields_keep_json_schema():
+    from neuro_noir.models.entity import Entity
+    schema = Entity.model_json_schema()
+    assert "name_embedding" in schema["properties"]